@@ -15,9 +15,9 @@ fi
 mkdir -p reports
 echo "📁 Reports directory created/verified at: $(pwd)/reports"
 
-# 🧪 Ejecutar tests con coverage
+# 🧪 Ejecutar tests con coverage, en paralelo (un worker por CPU, cada uno con su base de datos)
 echo "🧪 Running tests with coverage..."
-poetry run coverage run -m pytest src/tests -s -v --lf --junitxml=reports/unittest_report.xml
+poetry run pytest src/tests -n auto -v --lf --cov=src --cov-report= --junitxml=reports/unittest_report.xml
 
 # 📄 Generar reportes de cobertura
 echo "📊 Generating coverage reports..."
@@ -1,8 +1,52 @@
+from typing import Any
+
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from shared.background import background_tasks
+from shared.metrics import metrics
+from shared.middlewares.load_shedding import load_shedder
+from shared.middlewares.loop_monitor import loop_monitor
+from shared.middlewares.memory import memory_tracker
+from db.posgresql.connection import postgres_circuit_breaker
+from db.mongo.connection import mongo_circuit_breaker
+from db.redis import redis_circuit_breaker
 
 
 index_router = APIRouter(tags=["Index"])
 
 @index_router.get("/")
 async def index() -> dict[str, str]:
-    return {"message": "Books API 📚"}
\ No newline at end of file
+    return {"message": "Books API 📚"}
+
+
+@index_router.get("/health/load-shedding")
+async def load_shedding_stats() -> dict[str, float | int]:
+    return load_shedder.stats()
+
+
+@index_router.get("/health/circuit-breakers")
+async def circuit_breakers_stats() -> dict[str, dict[str, str | int]]:
+    return {
+        breaker.name: breaker.stats()
+        for breaker in (postgres_circuit_breaker, mongo_circuit_breaker, redis_circuit_breaker)
+    }
+
+
+@index_router.get("/health/background")
+async def background_stats() -> dict[str, int | str]:
+    return background_tasks.stats()
+
+
+@index_router.get("/health/memory")
+async def memory_stats() -> dict[str, Any]:
+    return memory_tracker.stats()
+
+
+@index_router.get("/health/event-loop")
+async def event_loop_stats() -> dict[str, Any]:
+    return loop_monitor.stats()
+
+
+@index_router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
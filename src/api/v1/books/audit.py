@@ -0,0 +1,20 @@
+from typing import Any
+
+from db.mongo import BaseMongoDocument, MongoAbstractRepository
+from shared.background import background_task
+
+
+class BookAuditDocument(BaseMongoDocument):
+    book_id: str | None
+    action: str
+    data: dict[str, Any] | None = None
+
+
+class BookAuditRepository(MongoAbstractRepository):
+    collection_name = "book_audit"
+    document_model = BookAuditDocument
+
+
+@background_task("books.audit")
+def record_book_audit(action: str, book_id: str | None, data: dict[str, Any] | None = None) -> None:
+    BookAuditRepository().add(BookAuditDocument(book_id=book_id, action=action, data=data))
@@ -0,0 +1,202 @@
+import sys
+import threading
+import time
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+from typing import Any, TypeVar
+from uuid import UUID
+
+from loguru import logger
+
+from api.v1.books.repositories import BookRepository
+from api.v1.books.schema import BOOK_FIELDS
+from db.posgresql.models.public import BookType
+
+CATALOG_FIELDS = (*BOOK_FIELDS, "created_at")
+
+K = TypeVar("K")
+
+
+def naive_utc(value: datetime) -> datetime:
+    # created_at comes back naive in the session TimeZone, pinned to UTC in db.posgresql.connection
+    return value.astimezone(UTC).replace(tzinfo=None) if value.tzinfo else value
+
+
+class CatalogBook:
+    """One live book; replaced, never mutated, so readers need no lock."""
+
+    __slots__ = CATALOG_FIELDS
+    id: UUID
+    title: str
+    author: str
+    year: int
+    type: BookType
+    view_count: int
+    download_count: int
+    created_at: datetime
+
+    def __init__(self, row: dict[str, Any]) -> None:
+        for name in CATALOG_FIELDS:
+            setattr(self, name, row[name])
+        # Authors repeat across many books, share one string per author
+        self.author = sys.intern(row["author"])
+
+    def project(self, fields: tuple[str, ...]) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in fields}
+
+
+class BookCatalog:
+    """
+    Read-only in-process copy of the live books, indexed by id, author and
+    type. Loaded once per container and then refreshed incrementally: rows
+    whose updated_at moved past the watermark (soft deletes included) and
+    books touched by counter flushes. Each refresh re-reads the last
+    `overlap_seconds`, so transactions that commit a little after their
+    updated_at are not missed. A full reload every `full_reload_seconds`
+    picks up purged or dropped rows.
+    """
+
+    def __init__(self, overlap_seconds: float, full_reload_seconds: float, load_batch_size: int) -> None:
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.full_reload_seconds = full_reload_seconds
+        self.load_batch_size = load_batch_size
+        self.watermark: datetime | None = None
+        self.counters_watermark: datetime | None = None
+        self.loaded_at: float | None = None
+        self.refreshed_at: float | None = None
+        self._books: dict[UUID, CatalogBook] = {}
+        self._by_author: dict[str, set[UUID]] = {}
+        self._by_type: dict[BookType, set[UUID]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def ensure_fresh(self, max_staleness_seconds: float) -> None:
+        """Loads or refreshes the catalog when the last refresh is older than the bound."""
+        if self._fresh(max_staleness_seconds):
+            return
+        with self._lock:
+            if self._fresh(max_staleness_seconds):
+                return
+            if self.loaded_at is None or time.monotonic() - self.loaded_at > self.full_reload_seconds:
+                self.load()
+            else:
+                self.refresh()
+
+    def invalidate(self) -> None:
+        """Makes the next read refresh first (this container just wrote)."""
+        self.refreshed_at = None
+
+    def load(self) -> int:
+        started = time.monotonic()
+        # Counter flushes from before the load are already in the rows
+        _, counters_watermark = BookRepository.get_counters_flushed_since(datetime.min)
+        batches = BookRepository.iter_live((*CATALOG_FIELDS, "updated_at"), self.load_batch_size)
+        self.replace(row for rows in batches for row in rows)
+        self.counters_watermark = counters_watermark
+        self.loaded_at = self.refreshed_at = started
+        logger.info(f"Book catalog loaded: {len(self)} books in {time.monotonic() - started:.2f}s")
+        return len(self)
+
+    def replace(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Builds the catalog from `rows` (CATALOG_FIELDS plus updated_at) and swaps it in."""
+        books: dict[UUID, CatalogBook] = {}
+        by_author: dict[str, set[UUID]] = {}
+        by_type: dict[BookType, set[UUID]] = {}
+        watermark = None
+        for row in rows:
+            book = books[row["id"]] = CatalogBook(row)
+            by_author.setdefault(book.author, set()).add(book.id)
+            by_type.setdefault(book.type, set()).add(book.id)
+            if row["updated_at"] is not None and (watermark is None or row["updated_at"] > watermark):
+                watermark = row["updated_at"]
+        # Swapped in one go, readers see either the old or the new catalog
+        self._books, self._by_author, self._by_type = books, by_author, by_type
+        self.watermark = watermark
+
+    def refresh(self) -> int:
+        """Applies the changes since the watermarks; returns how many books changed."""
+        started = time.monotonic()
+        since = self.watermark - self.overlap if self.watermark else datetime.min
+        changed = BookRepository.get_changed_since(since, CATALOG_FIELDS)
+        for row in changed:
+            if row["deleted_at"] is None:
+                self._put(CatalogBook(row))
+            else:
+                self._remove(row["id"])
+            if self.watermark is None or row["updated_at"] > self.watermark:
+                self.watermark = row["updated_at"]
+
+        since = self.counters_watermark - self.overlap if self.counters_watermark else datetime.min
+        counters, latest = BookRepository.get_counters_flushed_since(since)
+        for row in counters:
+            book = self._books.get(row["id"])
+            if book is not None:
+                self._put(CatalogBook({**book.project(CATALOG_FIELDS), **row}))
+        if latest is not None:
+            self.counters_watermark = latest
+        self.refreshed_at = started
+        return len(changed) + len(counters)
+
+    def get(self, book_id: UUID) -> CatalogBook | None:
+        return self._books.get(book_id)
+
+    def find(
+        self,
+        author: str | None = None,
+        book_type: BookType | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> list[CatalogBook]:
+        candidates: set[UUID] | None = None
+        if author is not None:
+            candidates = set(self._by_author.get(author, ()))
+        if book_type is not None:
+            of_type = self._by_type.get(book_type, set())
+            candidates = of_type.copy() if candidates is None else candidates & of_type
+        books = list(self._books.values()) if candidates is None else [
+            book for book_id in candidates if (book := self._books.get(book_id)) is not None
+        ]
+        if created_after is not None:
+            books = [book for book in books if book.created_at >= naive_utc(created_after)]
+        if created_before is not None:
+            books = [book for book in books if book.created_at < naive_utc(created_before)]
+        return books
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "books": len(self._books),
+            "authors": len(self._by_author),
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "age_seconds": round(now - self.refreshed_at, 3) if self.refreshed_at is not None else None,
+        }
+
+    def _fresh(self, max_staleness_seconds: float) -> bool:
+        return self.refreshed_at is not None and time.monotonic() - self.refreshed_at <= max_staleness_seconds
+
+    def _put(self, book: CatalogBook) -> None:
+        previous = self._books.get(book.id)
+        if previous is not None and (previous.author, previous.type) != (book.author, book.type):
+            self._unindex(previous)
+        self._books[book.id] = book
+        self._by_author.setdefault(book.author, set()).add(book.id)
+        self._by_type.setdefault(book.type, set()).add(book.id)
+
+    def _remove(self, book_id: UUID) -> None:
+        book = self._books.pop(book_id, None)
+        if book is not None:
+            self._unindex(book)
+
+    def _unindex(self, book: CatalogBook) -> None:
+        _discard(self._by_author, book.author, book.id)
+        _discard(self._by_type, book.type, book.id)
+
+
+def _discard(index: dict[K, set[UUID]], key: K, book_id: UUID) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(book_id)
+        if not ids:
+            index.pop(key, None)
@@ -0,0 +1,60 @@
+from typing import Any
+
+from loguru import logger
+from pydantic import ValidationError
+
+from api.v1.books.schema import BookWriteMessage
+from api.v1.books.services import BookBatchWriteService
+from core.settings import settings
+from shared.deadline import reset_deadline, set_deadline
+
+
+def _failures(message_ids: list[str]) -> dict[str, list[dict[str, str]]]:
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in message_ids]}
+
+
+def handle_book_writes_batch(event: dict[str, Any], context: Any) -> dict[str, list[dict[str, str]]]:
+    """
+    Consumes an SQS batch of book writes and reports the failed messages in
+    the partial batch response format (requires ReportBatchItemFailures).
+    On FIFO queues nothing after the first failure is applied, so SQS
+    redelivers the rest in order.
+    """
+    records = event.get("Records", [])
+    fifo = any(record.get("eventSourceARN", "").endswith(".fifo") for record in records)
+
+    failed: list[str] = []
+    accepted: list[tuple[str, BookWriteMessage]] = []
+    for record in records:
+        if fifo and failed:
+            failed.append(record["messageId"])
+            continue
+        try:
+            accepted.append((record["messageId"], BookWriteMessage.model_validate_json(record["body"])))
+        except ValidationError as exc:
+            logger.warning(f"Invalid book write message {record['messageId']}: {exc.errors()}")
+            failed.append(record["messageId"])
+
+    if not accepted:
+        return _failures(failed)
+
+    token = None
+    if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+        token = set_deadline(context.get_remaining_time_in_millis() - settings.TIMEOUTS.LAMBDA_SAFETY_MARGIN_MS)
+    try:
+        errors = BookBatchWriteService.apply([write for _, write in accepted], stop_on_error=fifo)
+    except Exception:  # noqa: BLE001
+        # The transaction did not commit, every accepted message is retried
+        logger.exception(f"Book write batch of {len(accepted)} messages failed")
+        return _failures(failed + [message_id for message_id, _ in accepted])
+    finally:
+        if token is not None:
+            reset_deadline(token)
+
+    for (message_id, write), error in zip(accepted, errors):
+        if error is not None:
+            logger.warning(f"Book write {write.action} {message_id} failed: {error}")
+            failed.append(message_id)
+    # Keep the original batch order, FIFO redelivery depends on it
+    order = {record["messageId"]: index for index, record in enumerate(records)}
+    return _failures(sorted(failed, key=order.__getitem__))
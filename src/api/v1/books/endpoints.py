@@ -1,45 +1,108 @@
-from api.v1.books.schema import BookCreateSchema
+from api.v1.books.schema import BookCounter, BookCreateSchema
+from db.posgresql.models.public import BookType
 from loguru import logger
 from shared.base_responses import create_response_for_fast_api, EnvelopeResponse
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from datetime import datetime
 from uuid import UUID
 from api.v1.books.services import (
+    BookFieldsService,
     BooksListService,
     BookCreateService,
     BookRetrieveService,
     BookUpdateService,
     BookDeleteService,
+    BookStatsService,
+    BookCountersService,
+    BookChangesService,
+    BookExportService,
 )
+from core.settings import settings
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
+FIELDS_QUERY_DESCRIPTION = "Comma-separated list of book fields to return, e.g. `id,title`"
+CREATED_RANGE_DESCRIPTION = "Bounds on `created_at`; on a partitioned table only the matching partitions are read"
+# Live book count, up to BOOK_STATS.TOTAL_CACHE_SECONDS old; only sent on unfiltered lists
+TOTAL_ESTIMATE_HEADER = "X-Total-Count-Estimate"
+
 
 @router.get("", response_model=EnvelopeResponse)
-async def get_books() -> EnvelopeResponse:
+async def get_books(
+    fields: str | None = Query(default=None, description=FIELDS_QUERY_DESCRIPTION),
+    created_after: datetime | None = Query(default=None, description=CREATED_RANGE_DESCRIPTION),
+    created_before: datetime | None = Query(default=None, description=CREATED_RANGE_DESCRIPTION),
+    author: str | None = Query(default=None),
+    book_type: BookType | None = Query(default=None, alias="type"),
+) -> EnvelopeResponse:
     logger.info("Retrieving all books")
-    books = BooksListService.list()
-    return create_response_for_fast_api(data=books)
+    books = await run_in_threadpool(
+        BooksListService.list, BookFieldsService.parse(fields), created_after, created_before, author, book_type
+    )
+    response = create_response_for_fast_api(data=books)
+    if created_after is None and created_before is None and author is None and book_type is None:
+        response.headers[TOTAL_ESTIMATE_HEADER] = str(await run_in_threadpool(BookStatsService.live_total))
+    return response
+
+
+# Declared before /{book_id} so "stats" is not parsed as an id
+@router.get("/stats", response_model=EnvelopeResponse)
+async def get_book_stats(
+    authors_limit: int = Query(default=settings.BOOK_STATS.AUTHORS_LIMIT, ge=1, le=1000),
+) -> EnvelopeResponse:
+    logger.info("Retrieving book statistics")
+    stats = await run_in_threadpool(BookStatsService.summary, authors_limit)
+    return create_response_for_fast_api(data=stats)
+
+
+# Declared before /{book_id} so "changes" is not parsed as an id
+@router.get("/changes", response_class=StreamingResponse)
+async def stream_book_changes(
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    logger.info(f"Streaming book changes after {last_event_id}")
+    return StreamingResponse(
+        BookChangesService.events(last_event_id),
+        media_type="text/event-stream",
+        # Proxies must not buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Declared before /{book_id} so "export" is not parsed as an id
+@router.get("/export", response_class=StreamingResponse)
+async def export_books(
+    fields: str | None = Query(default=None, description=FIELDS_QUERY_DESCRIPTION),
+) -> StreamingResponse:
+    logger.info("Exporting books")
+    # A sync iterator: Starlette pulls each page in the threadpool
+    return StreamingResponse(BookExportService.ndjson(BookFieldsService.parse(fields)), media_type="application/x-ndjson")
 
 
 @router.post("", response_model=EnvelopeResponse)
 async def create_book(book: BookCreateSchema) -> EnvelopeResponse:
     logger.info("Creating new book")
-    new_book = BookCreateService.create(book)
+    new_book = await run_in_threadpool(BookCreateService.create, book)
     logger.info(f"Book created with ID: {new_book.id}")
     return create_response_for_fast_api(data=new_book, status_code_http=201)
 
 
 @router.get("/{book_id}", response_model=EnvelopeResponse)
-async def get_book(book_id: UUID) -> EnvelopeResponse:
+async def get_book(
+    book_id: UUID,
+    fields: str | None = Query(default=None, description=FIELDS_QUERY_DESCRIPTION),
+) -> EnvelopeResponse:
     logger.info(f"Retrieving book with ID: {book_id}")
-    book = BookRetrieveService.retrieve(book_id)
+    book = await run_in_threadpool(BookRetrieveService.retrieve, book_id, BookFieldsService.parse(fields))
     return create_response_for_fast_api(data=book)
 
 
 @router.put("/{book_id}", response_model=EnvelopeResponse)
 async def update_book(book_id: UUID, updated: BookCreateSchema) -> EnvelopeResponse:
     logger.info(f"Updating book with ID: {book_id}")
-    updated_book = BookUpdateService.update(book_id, updated)
+    updated_book = await run_in_threadpool(BookUpdateService.update, book_id, updated)
     logger.info(f"Successfully updated book with ID: {book_id}")
     return create_response_for_fast_api(data=updated_book)
 
@@ -47,6 +110,13 @@ async def update_book(book_id: UUID, updated: BookCreateSchema) -> EnvelopeRespo
 @router.delete("/{book_id}", status_code=204)
 async def delete_book(book_id: UUID) -> None:
     logger.info(f"Attempting to delete book with ID: {book_id}")
-    BookDeleteService.delete(book_id)
+    await run_in_threadpool(BookDeleteService.delete, book_id)
     logger.info(f"Successfully deleted book with ID: {book_id}")
     return Response(status_code=204)
+
+
+@router.post("/{book_id}/counters/{counter}", status_code=202, response_model=EnvelopeResponse)
+async def increment_book_counter(book_id: UUID, counter: BookCounter) -> EnvelopeResponse:
+    # Buffered in process and flushed to Postgres later, see BookCountersService
+    BookCountersService.record(book_id, counter)
+    return create_response_for_fast_api(data=None, status_code_http=202)
@@ -0,0 +1,23 @@
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from db.mongo.models.public import BookDocument, BookMongoRepository
+from db.posgresql.models.public import Book
+from shared.batch_jobs import batch_job
+
+BOOK_DOCUMENT_COLUMNS = ("id", "title", "author", "year", "type", "created_at", "updated_at", "deleted_at")
+
+
+def create_book_indexes() -> None:
+    BookMongoRepository().ensure_indexes()
+
+
+@batch_job("books.copy_to_mongo", table=Book.__table__, columns=BOOK_DOCUMENT_COLUMNS, setup=create_book_indexes)
+def copy_books_to_mongo(session: Session, rows: list[dict[str, Any]]) -> None:
+    """Upserts each page of public.books into the Mongo `books` collection (tombstones included)."""
+    BookMongoRepository().upsert_many([
+        # Missing timestamps fall back to the document defaults
+        BookDocument.model_validate({"_id": row["id"], **{key: value for key, value in row.items() if value is not None}})
+        for row in rows
+    ])
@@ -1,37 +1,303 @@
+import random
+from collections import Counter
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+from core.settings import settings
 from db.posgresql import get_db_context
-from db.posgresql.models.public import Book
-from api.v1.books.schema import BookCreateSchema
-from sqlalchemy import select
+from db.posgresql.models.public import Book, BookArchive, BookCounterFlush, BookStat, BookType
+from api.v1.books.schema import BookCreateSchema, BookWriteAction, BookWriteMessage
+from shared.utils_dates import get_app_current_time
+from shared.uuid7 import uuid7_datetime
+from sqlalchemy import BigInteger, Uuid, column, delete, func, insert, literal, select, text, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+ARCHIVED_COLUMNS = (
+    "id", "title", "author", "year", "type", "view_count", "download_count", "created_at", "updated_at", "deleted_at",
+)
+STAT_DIMENSIONS = ("type", "year", "author")
+
+
+def stat_keys(book: Any) -> list[tuple[str, str]]:
+    """book_stats counters a live book contributes to (`book` has type, year and author)."""
+    return [("total", ""), ("type", BookType(book.type).value), ("year", str(book.year)), ("author", book.author)]
+
+
+def stat_changes(old: Any | None, new: Any | None) -> Counter[tuple[str, str]]:
+    changes: Counter[tuple[str, str]] = Counter()
+    for key in stat_keys(old) if old is not None else []:
+        changes[key] -= 1
+    for key in stat_keys(new) if new is not None else []:
+        changes[key] += 1
+    return changes
+
+
+class BookStatsRepository:
+
+    @staticmethod
+    def apply(session: Any, changes: Counter[tuple[str, str]]) -> None:
+        """Adds `changes` to the counters inside the caller's transaction."""
+        shard = random.randrange(settings.BOOK_STATS.SHARDS)
+        # Sorted so concurrent writers lock the rows in the same order
+        rows = [
+            {"dimension": dimension, "value": value, "shard": shard, "count": count}
+            for (dimension, value), count in sorted(changes.items())
+            if count
+        ]
+        if not rows:
+            return
+        statement = pg_insert(BookStat).values(rows)
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["dimension", "value", "shard"],
+                set_={"count": BookStat.count + statement.excluded.count},
+            )
+        )
+
+    @staticmethod
+    def summary(authors_limit: int) -> dict[str, Any]:
+        total = func.sum(BookStat.count)
+        with get_db_context() as session:
+            rows = session.execute(
+                select(BookStat.dimension, BookStat.value, total)
+                .where(BookStat.dimension.in_(("total", "type", "year")))
+                .group_by(BookStat.dimension, BookStat.value)
+                .having(total > 0)
+            ).all()
+            authors = session.execute(
+                select(BookStat.value, total)
+                .where(BookStat.dimension == "author")
+                .group_by(BookStat.value)
+                .having(total > 0)
+                .order_by(total.desc(), BookStat.value)
+                .limit(authors_limit)
+            ).all()
+        summary: dict[str, Any] = {"total": 0, "by_type": {}, "by_year": {}, "by_author": dict(authors)}
+        for dimension, value, count in rows:
+            if dimension == "total":
+                summary["total"] = count
+            else:
+                summary[f"by_{dimension}"][value] = count
+        summary["by_year"] = dict(sorted(summary["by_year"].items()))
+        return summary
+
+    @staticmethod
+    def total() -> int:
+        """Live book count, summed over the shards of the total counter."""
+        with get_db_context() as session:
+            total: int = session.scalar(
+                select(func.coalesce(func.sum(BookStat.count), 0)).where(BookStat.dimension == "total")
+            )
+            return total
+
+    @staticmethod
+    def estimate_total() -> int:
+        """Row estimate of public.books (and its partitions) from planner statistics."""
+        with get_db_context() as session:
+            return int(
+                session.execute(
+                    text(
+                        "SELECT COALESCE(SUM(GREATEST(reltuples, 0)), 0) FROM pg_class "
+                        "WHERE oid = 'public.books'::regclass "
+                        "OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'public.books'::regclass)"
+                    )
+                ).scalar()
+            )
+
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Recomputes every counter from public.books, for the initial backfill
+        or after bulk loads that bypass the repository. Blocks writes to
+        books while it runs. Returns the live book count.
+        """
+        with get_db_context() as session:
+            session.execute(text("SET LOCAL statement_timeout = 0"))
+            session.execute(text("LOCK TABLE public.books IN SHARE MODE"))
+            session.execute(delete(BookStat))
+            live = "FROM public.books WHERE deleted_at IS NULL"
+            session.execute(
+                text(
+                    "INSERT INTO public.book_stats (dimension, value, shard, count) "
+                    f"SELECT 'total', '', 0, count(*) {live} "
+                    f"UNION ALL SELECT 'type', lower(type::text), 0, count(*) {live} GROUP BY type "
+                    f"UNION ALL SELECT 'year', year::text, 0, count(*) {live} GROUP BY year "
+                    f"UNION ALL SELECT 'author', author, 0, count(*) {live} GROUP BY author"
+                )
+            )
+            total: int = session.execute(
+                select(BookStat.count).where(BookStat.dimension == "total")
+            ).scalar_one()
+            session.commit()
+            return total
+
 
 class BookRepository:
 
+    @staticmethod
+    def _columns(fields: tuple[str, ...]) -> list[Any]:
+        return [Book.__table__.c[name] for name in fields]
+
+    @staticmethod
+    def _by_id(book_id: UUID) -> list[Any]:
+        """
+        Id condition plus, on a partitioned table, a created_at window taken
+        from the UUIDv7 timestamp so only one partition is scanned.
+        """
+        conditions = [Book.id == book_id]
+        created = uuid7_datetime(book_id) if settings.PARTITIONING.ENABLED and isinstance(book_id, UUID) else None
+        if created is not None:
+            # Naive UTC (the session TimeZone) so the planner prunes, an aware value only prunes at run time
+            created = created.replace(tzinfo=None)
+            slack = timedelta(seconds=settings.PARTITIONING.ID_TIME_SLACK_SECONDS)
+            conditions.append(Book.created_at.between(created - slack, created + slack))
+        return conditions
+
+    @staticmethod
+    def _created_range(created_after: datetime | None, created_before: datetime | None) -> list[Any]:
+        conditions = []
+        if created_after is not None:
+            conditions.append(Book.created_at >= created_after)
+        if created_before is not None:
+            conditions.append(Book.created_at < created_before)
+        return conditions
+
+    @staticmethod
+    def _live(session: Any, book_id: UUID) -> Book | None:
+        book: Book | None = session.scalars(
+            select(Book).where(*BookRepository._by_id(book_id), Book.deleted_at.is_(None))
+        ).first()
+        return book
+
     @staticmethod
     def get_all() -> tuple[bool, list[Book]]:
         with get_db_context() as session:
-            books = session.scalars(select(Book)).all()
+            books = session.scalars(select(Book).where(Book.deleted_at.is_(None))).all()
             return True, books
 
     @staticmethod
-    def get_by_id(book_id: int) -> tuple[bool, Book | None]:
+    def get_all_projected(
+        fields: tuple[str, ...],
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        author: str | None = None,
+        book_type: BookType | None = None,
+    ) -> tuple[bool, list[dict[str, Any]]]:
+        with get_db_context() as session:
+            query = select(*BookRepository._columns(fields)).where(
+                Book.deleted_at.is_(None), *BookRepository._created_range(created_after, created_before)
+            )
+            if author is not None:
+                query = query.where(Book.author == author)
+            if book_type is not None:
+                query = query.where(Book.type == book_type)
+            rows = session.execute(query).mappings().all()
+            return True, [dict(row) for row in rows]
+
+    @staticmethod
+    def get_by_id(book_id: UUID) -> tuple[bool, Book | None]:
         with get_db_context() as session:
-            book = session.get(Book, book_id)
+            book = BookRepository._live(session, book_id)
             return (True, book) if book else (False, None)
 
+    @staticmethod
+    def get_by_id_projected(book_id: UUID, fields: tuple[str, ...]) -> tuple[bool, dict[str, Any] | None]:
+        with get_db_context() as session:
+            query = select(*BookRepository._columns(fields)).where(
+                *BookRepository._by_id(book_id), Book.deleted_at.is_(None)
+            )
+            row = session.execute(query).mappings().first()
+            return (True, dict(row)) if row else (False, None)
+
+    @staticmethod
+    def get_recently_updated(limit: int, fields: tuple[str, ...]) -> tuple[bool, list[dict[str, Any]]]:
+        with get_db_context() as session:
+            query = (
+                select(*BookRepository._columns(fields))
+                .where(Book.deleted_at.is_(None))
+                .order_by(Book.updated_at.desc())
+                .limit(limit)
+            )
+            rows = session.execute(query).mappings().all()
+            return True, [dict(row) for row in rows]
+
+    @staticmethod
+    def iter_live(fields: tuple[str, ...], batch_size: int) -> Iterator[list[dict[str, Any]]]:
+        """Every live book in id order, `batch_size` rows per keyset page."""
+        columns = BookRepository._columns(tuple(dict.fromkeys(("id", *fields))))
+        last_id = None
+        while True:
+            with get_db_context() as session:
+                query = select(*columns).where(Book.deleted_at.is_(None)).order_by(Book.id).limit(batch_size)
+                if last_id is not None:
+                    query = query.where(Book.id > last_id)
+                rows = [dict(row) for row in session.execute(query).mappings()]
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    def get_changed_since(since: datetime, fields: tuple[str, ...]) -> list[dict[str, Any]]:
+        """Books (deleted ones included) with updated_at >= `since`, oldest change first."""
+        columns = BookRepository._columns(tuple(dict.fromkeys((*fields, "id", "updated_at", "deleted_at"))))
+        with get_db_context() as session:
+            query = select(*columns).where(Book.updated_at >= since).order_by(Book.updated_at)
+            return [dict(row) for row in session.execute(query).mappings()]
+
+    @staticmethod
+    def get_counters_flushed_since(since: datetime) -> tuple[list[dict[str, Any]], datetime | None]:
+        """
+        Current counters of the books touched by counter flushes recorded at
+        or after `since` (flushes leave updated_at alone), plus the latest
+        flush time seen.
+        """
+        recent = select(BookCounterFlush).where(BookCounterFlush.flushed_at >= since).subquery()
+        with get_db_context() as session:
+            latest = session.scalar(select(func.max(recent.c.flushed_at)))
+            if latest is None:
+                return [], None
+            book_ids = select(func.unnest(recent.c.book_ids)).scalar_subquery()
+            rows = session.execute(
+                select(Book.id, Book.view_count, Book.download_count).where(Book.id.in_(book_ids))
+            ).mappings()
+            return [dict(row) for row in rows], latest
+
     @staticmethod
     def create(book_create: BookCreateSchema) -> tuple[bool, Book]:
         with get_db_context() as session:
             new_book = Book(**book_create.model_dump())
             session.add(new_book)
+            BookStatsRepository.apply(session, stat_changes(None, book_create))
             session.commit()
             session.refresh(new_book)
             return True, new_book
 
     @staticmethod
-    def update(book_id: int, book_update: BookCreateSchema) -> tuple[bool, Book | None]:
+    def create_many(books_create: list[BookCreateSchema]) -> list[Book]:
+        """Inserts the books with one multi-row INSERT ... RETURNING and one commit, in input order."""
+        with get_db_context() as session:
+            new_books = session.scalars(
+                insert(Book).returning(Book, sort_by_parameter_order=True),
+                [book.model_dump() for book in books_create],
+            ).all()
+            changes: Counter[tuple[str, str]] = Counter()
+            for book in books_create:
+                changes.update(stat_changes(None, book))
+            BookStatsRepository.apply(session, changes)
+            # The RETURNING values are complete, no need to reload them after the commit
+            session.expire_on_commit = False
+            session.commit()
+            return list(new_books)
+
+    @staticmethod
+    def update(book_id: UUID, book_update: BookCreateSchema) -> tuple[bool, Book | None]:
         with get_db_context() as session:
-            book = session.get(Book, book_id)
+            book = BookRepository._live(session, book_id)
             if not book:
                 return False, None
+            BookStatsRepository.apply(session, stat_changes(book, book_update))
             for key, value in book_update.model_dump().items():
                 setattr(book, key, value)
             session.commit()
@@ -39,11 +305,146 @@ class BookRepository:
             return True, book
 
     @staticmethod
-    def delete(book_id: int) -> tuple[bool, None]:
+    def delete(book_id: UUID) -> tuple[bool, None]:
+        """Soft delete: the row stays as a tombstone until `purge_deleted` archives it."""
         with get_db_context() as session:
-            book = session.get(Book, book_id)
-            if not book:
+            deleted = session.execute(
+                update(Book)
+                .where(*BookRepository._by_id(book_id), Book.deleted_at.is_(None))
+                .values(deleted_at=get_app_current_time())
+                .returning(Book.type, Book.year, Book.author)
+            ).first()
+            if deleted is None:
                 return False, None
-            session.delete(book)
+            BookStatsRepository.apply(session, stat_changes(deleted, None))
             session.commit()
             return True, None
+
+    @staticmethod
+    def purge_deleted(deleted_before: datetime, batch_size: int, archive: bool = True) -> int:  # noqa: FBT001, FBT002
+        """
+        Removes up to `batch_size` books soft-deleted before `deleted_before`
+        in one short transaction, copying them to `books_archive` first when
+        `archive`. Returns how many rows were removed.
+        """
+        with get_db_context() as session:
+            # Materialized so the locking LIMIT runs once; as an IN subquery the planner
+            # may rescan it per row and, skipping the rows already deleted, remove more
+            batch = (
+                select(Book.id)
+                .where(Book.deleted_at.is_not(None), Book.deleted_at < deleted_before)
+                .order_by(Book.deleted_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .cte("batch")
+                .prefix_with("MATERIALIZED")
+            )
+            removed = delete(Book).where(Book.id.in_(select(batch.c.id)))
+            count: int
+            if not archive:
+                count = session.execute(removed).rowcount
+            else:
+                moved = removed.returning(*(Book.__table__.c[name] for name in ARCHIVED_COLUMNS)).cte("moved")
+                copy = insert(BookArchive).from_select(
+                    [*ARCHIVED_COLUMNS, "archived_at"],
+                    select(*(moved.c[name] for name in ARCHIVED_COLUMNS), literal(get_app_current_time())),
+                )
+                count = session.execute(copy).rowcount
+            session.commit()
+            return count
+
+    @staticmethod
+    def apply_counter_deltas(batch_id: str, deltas: dict[UUID, dict[str, int]], chunk_size: int) -> bool:
+        """
+        Adds a flushed counter batch to books with one `UPDATE ... FROM
+        (VALUES ...)` per `chunk_size` books, leaving updated_at alone.
+        The batch id is recorded in the same transaction; returns False if
+        it was already applied (a flusher retrying after a crash).
+        """
+        with get_db_context() as session:
+            recorded = session.execute(
+                pg_insert(BookCounterFlush)
+                .values(batch_id=batch_id, flushed_at=get_app_current_time(), book_ids=sorted(deltas))
+                .on_conflict_do_nothing()
+                .returning(BookCounterFlush.batch_id)
+            ).first()
+            if recorded is None:
+                session.rollback()
+                return False
+            # Sorted so concurrent flushers lock the rows in the same order
+            rows = [
+                (book_id, counts.get("view_count", 0), counts.get("download_count", 0))
+                for book_id, counts in sorted(deltas.items())
+            ]
+            for start in range(0, len(rows), chunk_size):
+                batch = values(
+                    column("id", Uuid), column("view_count", BigInteger), column("download_count", BigInteger),
+                    name="deltas",
+                ).data(rows[start:start + chunk_size])
+                session.execute(
+                    update(Book)
+                    .where(Book.id == batch.c.id)
+                    .values(
+                        view_count=Book.view_count + batch.c.view_count,
+                        download_count=Book.download_count + batch.c.download_count,
+                        updated_at=Book.updated_at,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            session.execute(
+                delete(BookCounterFlush).where(
+                    BookCounterFlush.flushed_at < get_app_current_time() - timedelta(days=1)
+                )
+            )
+            session.commit()
+            return True
+
+    @staticmethod
+    def apply_writes(writes: list[BookWriteMessage], stop_on_error: bool = False) -> list[Exception | None]:  # noqa: FBT001, FBT002
+        """
+        Applies all writes in one transaction with a SAVEPOINT per write, so
+        a failing write is rolled back alone. Returns the error per write;
+        with `stop_on_error` the writes after the first failure are skipped.
+        Redelivered creates with a known `book_id` (even if deleted since)
+        and deletes of missing books are treated as already applied.
+        """
+        errors: list[Exception | None] = []
+        with get_db_context() as session:
+            for write in writes:
+                if stop_on_error and any(errors):
+                    errors.append(RuntimeError("Skipped after a previous failure"))
+                    continue
+                try:
+                    with session.begin_nested():
+                        BookRepository._apply_write(session, write)
+                    errors.append(None)
+                except Exception as exc:  # noqa: BLE001
+                    errors.append(exc)
+            session.commit()
+        return errors
+
+    @staticmethod
+    def _apply_write(session: Any, write: BookWriteMessage) -> None:
+        book = (
+            session.scalars(select(Book).where(*BookRepository._by_id(write.book_id))).first()
+            if write.book_id else None
+        )
+        if write.action == BookWriteAction.CREATE:
+            if book is None:
+                extra: dict[str, Any] = {"id": write.book_id} if write.book_id else {}
+                created = uuid7_datetime(write.book_id) if write.book_id else None
+                if created is not None:
+                    # Keeps the id-derived partition window valid for producer-made ids
+                    extra["created_at"] = created
+                session.add(Book(**extra, **write.data.model_dump()))
+                BookStatsRepository.apply(session, stat_changes(None, write.data))
+        elif write.action == BookWriteAction.UPDATE:
+            if book is None or book.deleted_at is not None:
+                raise LookupError(f"Book with ID {write.book_id} not found for update")
+            BookStatsRepository.apply(session, stat_changes(book, write.data))
+            for key, value in write.data.model_dump().items():
+                setattr(book, key, value)
+        elif book is not None and book.deleted_at is None:
+            BookStatsRepository.apply(session, stat_changes(book, None))
+            book.deleted_at = get_app_current_time()
+        session.flush()
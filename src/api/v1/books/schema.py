@@ -1,4 +1,7 @@
-from pydantic import BaseModel, ConfigDict, field_serializer
+from enum import StrEnum
+from functools import lru_cache
+from typing import Any
+from pydantic import BaseModel, ConfigDict, create_model, field_serializer, model_validator
 from db.posgresql.models.public import BookType
 from uuid import UUID
 
@@ -9,6 +12,9 @@ class BookSchema(BaseModel):
     author: str
     year: int
     type: BookType
+    # Flushed values plus the pending delta from Redis
+    view_count: int = 0
+    download_count: int = 0
 
     model_config = ConfigDict(validate_by_name=False)
 
@@ -21,4 +27,71 @@ class BookCreateSchema(BaseModel):
     title: str
     author: str
     year: int
-    type: BookType
\ No newline at end of file
+    type: BookType
+
+
+# Precomputed statistics
+class BookStatsSchema(BaseModel):
+    total: int
+    # Planner estimate of public.books rows (tombstones included), no scan
+    total_estimate: int
+    by_type: dict[str, int]
+    by_year: dict[str, int]
+    # Top authors by book count, up to `authors_limit`
+    by_author: dict[str, int]
+
+
+# Write-behind counters
+class BookCounter(StrEnum):
+    VIEWS = "views"
+    DOWNLOADS = "downloads"
+
+    @property
+    def column(self) -> str:
+        return {BookCounter.VIEWS: "view_count", BookCounter.DOWNLOADS: "download_count"}[self]
+
+
+# Queued writes (SQS)
+class BookWriteAction(StrEnum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class BookWriteMessage(BaseModel):
+    action: BookWriteAction
+    # Optional on create: a client-chosen id makes redelivered creates no-ops
+    book_id: UUID | None = None
+    data: BookCreateSchema | None = None
+
+    @model_validator(mode="after")
+    def check_action_fields(self) -> "BookWriteMessage":
+        if self.action != BookWriteAction.DELETE and self.data is None:
+            raise ValueError(f"'data' is required for {self.action}")
+        if self.action != BookWriteAction.CREATE and self.book_id is None:
+            raise ValueError(f"'book_id' is required for {self.action}")
+        return self
+
+
+# Sparse fieldsets
+BOOK_FIELDS: tuple[str, ...] = tuple(BookSchema.model_fields)
+
+
+@lru_cache(maxsize=64)
+def get_book_projection_schema(fields: tuple[str, ...]) -> type[BaseModel]:
+    """
+    Returns a BookSchema variant with only `fields`, built once per field set.
+    `fields` must be a normalized tuple (see BookFieldsService.parse).
+    """
+    if fields == BOOK_FIELDS:
+        return BookSchema
+    definitions: dict[str, Any] = {
+        name: (BookSchema.model_fields[name].annotation, ...)
+        for name in fields
+    }
+    projection: type[BaseModel] = create_model(
+        f"BookSchema[{','.join(fields)}]",
+        __config__=ConfigDict(validate_by_name=False),
+        **definitions,
+    )
+    return projection
@@ -1,37 +1,360 @@
-from api.v1.books.repositories import BookRepository
-from api.v1.books.schema import BookSchema, BookCreateSchema
+import json
+import re
+import time
+from collections.abc import AsyncIterator, Callable, Hashable, Iterator
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, TypeVar
+from pydantic import BaseModel
+from api.v1.books.audit import record_book_audit
+from api.v1.books.catalog import BookCatalog
+from api.v1.books.repositories import BookRepository, BookStatsRepository
+from api.v1.books.schema import (
+    BOOK_FIELDS,
+    BookCounter,
+    BookSchema,
+    BookCreateSchema,
+    BookStatsSchema,
+    BookWriteMessage,
+    get_book_projection_schema,
+)
 from core.exceptions import BookException
+from db.posgresql.models.public import Book, BookType
+from core.internal_codes import InternalCodesApiBook
+from core.settings import settings
+from shared.background import background_tasks
+from shared.change_feed import ChangeFeed
+from shared.counters import WriteBehindCounters
+from shared.group_commit import GroupCommitter
+from shared.single_flight import SingleFlight, RedisSingleFlight
+from shared.ttl_cache import TTLCache
+from shared.utils_dates import get_app_current_time
 from uuid import UUID
 
+T = TypeVar("T")
+
+# Redis Stream ids, "<milliseconds>-<sequence>"
+LAST_EVENT_ID = re.compile(r"\d+-\d+")
+
+book_reads_flight = SingleFlight()
+book_reads_redis_flight = RedisSingleFlight(
+    namespace="books",
+    lock_ttl_ms=settings.SINGLE_FLIGHT.REDIS_LOCK_TTL_MS,
+    result_ttl_ms=settings.SINGLE_FLIGHT.REDIS_RESULT_TTL_MS,
+    wait_timeout_ms=settings.SINGLE_FLIGHT.REDIS_WAIT_TIMEOUT_MS,
+    poll_interval_ms=settings.SINGLE_FLIGHT.REDIS_POLL_INTERVAL_MS,
+)
+
+book_cache: TTLCache[BookSchema] = TTLCache(
+    name="books",
+    maxsize=settings.BOOK_CACHE.MAX_ENTRIES,
+    ttl_seconds=settings.BOOK_CACHE.TTL_SECONDS,
+)
+
+book_totals: TTLCache[int] = TTLCache(
+    name="book_totals",
+    maxsize=1,
+    ttl_seconds=settings.BOOK_STATS.TOTAL_CACHE_SECONDS,
+)
+
+book_counters = WriteBehindCounters(
+    key=settings.BOOK_COUNTERS.REDIS_KEY,
+    push_interval_ms=settings.BOOK_COUNTERS.PUSH_INTERVAL_MS,
+    max_buffered=settings.BOOK_COUNTERS.MAX_BUFFERED,
+)
+
+book_creates: GroupCommitter[BookCreateSchema, Book] = GroupCommitter(
+    name="books",
+    execute_batch=BookRepository.create_many,
+    window_ms=settings.GROUP_COMMIT.WINDOW_MS,
+    max_batch=settings.GROUP_COMMIT.MAX_BATCH,
+)
+
+book_catalog = BookCatalog(
+    overlap_seconds=settings.BOOK_CATALOG.REFRESH_OVERLAP_SECONDS,
+    full_reload_seconds=settings.BOOK_CATALOG.FULL_RELOAD_SECONDS,
+    load_batch_size=settings.BOOK_CATALOG.LOAD_BATCH_SIZE,
+)
+
+book_changes = ChangeFeed(
+    stream=settings.CHANGE_FEED.STREAM,
+    channel=settings.CHANGE_FEED.CHANNEL,
+    maxlen=settings.CHANGE_FEED.STREAM_MAXLEN,
+    buffer_size=settings.CHANGE_FEED.BUFFER_SIZE,
+    replay_batch=settings.CHANGE_FEED.REPLAY_BATCH,
+)
+
+
+def coalesce_book_read(
+    key: tuple[Hashable, ...],
+    fn: Callable[[], T],
+    dumps: Callable[[T], str],
+    loads: Callable[[str], T],
+) -> T:
+    """Shares one in-flight read between concurrent identical lookups."""
+    def fetch() -> T:
+        if settings.SINGLE_FLIGHT.REDIS_ENABLED:
+            redis_key = ":".join(str(part) for part in key)
+            return book_reads_redis_flight.do(redis_key, fn, dumps, loads)
+        return fn()
+
+    if not settings.SINGLE_FLIGHT.ENABLED:
+        return fetch()
+    return book_reads_flight.do(key, fetch)
+
+
+def audit_book_write(action: str, book_id: UUID | None, data: dict[str, Any] | None = None) -> None:
+    """Queues the audit record; it is written after the response."""
+    if settings.BACKGROUND.AUDIT_ENABLED:
+        background_tasks.enqueue(
+            record_book_audit,
+            action=action,
+            book_id=str(book_id) if book_id else None,
+            data=data,
+        )
+
+
+def publish_book_change(action: str, book_id: UUID | None, data: dict[str, Any] | None = None) -> None:
+    """Announces the write on GET /v1/books/changes; published inline so events keep the write order."""
+    if settings.CHANGE_FEED.ENABLED:
+        book_changes.publish({"action": action, "book_id": str(book_id) if book_id else None, "data": data})
+
+
+def invalidate_book_reads(book_id: UUID | None = None) -> None:
+    if book_id is not None:
+        book_cache.pop(book_id)
+    book_catalog.invalidate()
+    if settings.SINGLE_FLIGHT.REDIS_ENABLED:
+        book_reads_redis_flight.invalidate()
+
+
+class BookFieldsService:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def parse(fields: str | None) -> tuple[str, ...]:
+        """
+        Normalizes a `?fields=` value into a tuple ordered like BookSchema,
+        so `title,id` and `id,title` share the same projection schema.
+        """
+        if not fields:
+            return BOOK_FIELDS
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        invalid = sorted(requested.difference(BOOK_FIELDS))
+        if invalid or not requested:
+            raise BookException(
+                message="Invalid fields requested",
+                error_code=InternalCodesApiBook.BOOK_INVALID_FIELDS,
+                data={"payload": {"invalid_fields": invalid, "allowed_fields": list(BOOK_FIELDS)}}
+            )
+        return tuple(name for name in BOOK_FIELDS if name in requested)
+
 
 class BooksListService:
     @staticmethod
-    def list() -> list[BookSchema]:
-        success, list_books = BookRepository.get_all()
-        if not success:
-            raise BookException(message="Failed to retrieve books")
-        return [BookSchema(**book.to_dict()) for book in list_books]
+    def list(
+        fields: tuple[str, ...] = BOOK_FIELDS,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        author: str | None = None,
+        book_type: BookType | None = None,
+    ) -> list[BaseModel]:
+        schema = get_book_projection_schema(fields)
+        if settings.BOOK_CATALOG.ENABLED:
+            book_catalog.ensure_fresh(settings.BOOK_CATALOG.MAX_STALENESS_SECONDS)
+            found = book_catalog.find(author, book_type, created_after, created_before)
+            return BookCountersService.merge_pending([schema(**book.project(fields)) for book in found])
+
+        def fetch() -> list[BaseModel]:
+            success, list_books = BookRepository.get_all_projected(
+                fields, created_after, created_before, author, book_type
+            )
+            if not success:
+                raise BookException(message="Failed to retrieve books")
+            return [schema(**book) for book in list_books]
+
+        books = coalesce_book_read(
+            key=("list", ",".join(fields), str(created_after), str(created_before), str(author), str(book_type)),
+            fn=fetch,
+            dumps=lambda books: json.dumps([book.model_dump(mode="json") for book in books]),
+            loads=lambda raw: [schema.model_validate(book) for book in json.loads(raw)],
+        )
+        return BookCountersService.merge_pending(books)
+
+
+class BookExportService:
+    @staticmethod
+    def ndjson(fields: tuple[str, ...] = BOOK_FIELDS) -> Iterator[bytes]:
+        """
+        Live books as NDJSON in id order, one keyset page per chunk, so memory
+        stays bounded by BOOK_EXPORT.PAGE_SIZE however large the table is.
+        The route is exempt from the request deadline (see DeadlineMiddleware).
+        """
+        schema = get_book_projection_schema(fields)
+        for rows in BookRepository.iter_live(fields, settings.BOOK_EXPORT.PAGE_SIZE):
+            books = BookCountersService.merge_pending([schema(**row) for row in rows])
+            yield "".join(f"{book.model_dump_json()}\n" for book in books).encode()
+
+
+class BookStatsService:
+    @staticmethod
+    def summary(authors_limit: int) -> BookStatsSchema:
+        return BookStatsSchema(
+            **BookStatsRepository.summary(authors_limit),
+            total_estimate=BookStatsRepository.estimate_total(),
+        )
+
+    @staticmethod
+    def live_total() -> int:
+        """Live book count for list headers: the catalog size, else book_stats cached per process."""
+        if settings.BOOK_CATALOG.ENABLED:
+            return len(book_catalog)
+        total = book_totals.get("total")
+        if total is None:
+            total = BookStatsRepository.total()
+            book_totals.set("total", total)
+        return total
+
+
+class BookCountersService:
+    @staticmethod
+    def _field(book_id: UUID, counter: BookCounter) -> str:
+        return f"{book_id}:{counter.value}"
+
+    @staticmethod
+    def record(book_id: UUID, counter: BookCounter, amount: int = 1) -> None:
+        """Buffers an increment in process; no database work on the request path."""
+        if not settings.BOOK_COUNTERS.ENABLED:
+            raise BookException(message="Book counters are disabled")
+        book_counters.increment(BookCountersService._field(book_id, counter), amount)
+
+    @staticmethod
+    def merge_pending(books: list[BaseModel]) -> list[BaseModel]:
+        """Adds the not-yet-flushed deltas to the counters present in `books` (copies, never mutates)."""
+        if not settings.BOOK_COUNTERS.ENABLED:
+            return books
+        counters = [counter for counter in BookCounter if books and counter.column in type(books[0]).model_fields]
+        if not counters or "id" not in type(books[0]).model_fields:
+            return books
+        book_ids: list[UUID] = [getattr(book, "id") for book in books]
+        fields = [BookCountersService._field(book_id, counter) for book_id in book_ids for counter in counters]
+        pending = book_counters.pending(fields)
+        merged = []
+        for book, book_id in zip(books, book_ids):
+            update = {
+                counter.column: getattr(book, counter.column) + delta
+                for counter in counters
+                if (delta := pending[BookCountersService._field(book_id, counter)])
+            }
+            merged.append(book.model_copy(update=update) if update else book)
+        return merged
+
+    @staticmethod
+    def flush() -> int:
+        """
+        Moves the pending Redis counters into Postgres, one batch per call.
+        Returns the number of books updated (0 when there was nothing to do).
+        """
+        book_counters.push()
+        batch = book_counters.take_batch()
+        if batch is None:
+            return 0
+        batch_id, values = batch
+        deltas: dict[UUID, dict[str, int]] = {}
+        for field, amount in values.items():
+            raw_id, counter = field.rsplit(":", 1)
+            column = BookCounter(counter).column
+            deltas.setdefault(UUID(raw_id), {}).setdefault(column, 0)
+            deltas[UUID(raw_id)][column] += amount
+        BookRepository.apply_counter_deltas(batch_id, deltas, settings.BOOK_COUNTERS.FLUSH_CHUNK_SIZE)
+        # Only after the commit: a crash before this retries the batch, which the flush record makes a no-op
+        book_counters.complete_batch(batch_id)
+        for book_id in deltas:
+            book_cache.pop(book_id)
+        return len(deltas)
+
+
+class BookChangesService:
+    @staticmethod
+    def events(last_event_id: str | None) -> AsyncIterator[str]:
+        if not settings.CHANGE_FEED.ENABLED:
+            raise BookException(message="The book change feed is disabled")
+        if last_event_id is not None and not LAST_EVENT_ID.fullmatch(last_event_id):
+            raise BookException(
+                message="Invalid Last-Event-ID",
+                data={"payload": {"last_event_id": last_event_id}}
+            )
+        return book_changes.events(last_event_id, settings.CHANGE_FEED.HEARTBEAT_SECONDS)
 
 
 class BookCreateService:
     @staticmethod
     def create(book_data: BookCreateSchema) -> BookSchema:
-        success, new_book = BookRepository.create(book_data)
-        if not success:
-            raise BookException(message="Failed to create book")
-        return BookSchema(**new_book.to_dict())
+        if settings.GROUP_COMMIT.ENABLED:
+            new_book = book_creates.submit(book_data)
+        else:
+            success, new_book = BookRepository.create(book_data)
+            if not success:
+                raise BookException(message="Failed to create book")
+        invalidate_book_reads()
+        audit_book_write("create", new_book.id, book_data.model_dump(mode="json"))
+        created = BookSchema(**new_book.to_dict())
+        publish_book_change("create", created.id, created.model_dump(mode="json"))
+        return created
 
 
 class BookRetrieveService:
     @staticmethod
-    def retrieve(book_id: UUID) -> BookSchema:
-        success, book = BookRepository.get_by_id(book_id)
-        if not success:
+    def retrieve(book_id: UUID, fields: tuple[str, ...] = BOOK_FIELDS) -> BaseModel:
+        schema = get_book_projection_schema(fields)
+        if settings.BOOK_CATALOG.ENABLED:
+            book_catalog.ensure_fresh(settings.BOOK_CATALOG.MAX_STALENESS_SECONDS)
+            found = book_catalog.get(book_id)
+            # A miss falls through: the book may be newer than the last refresh
+            if found is not None:
+                return BookRetrieveService._counted(book_id, schema(**found.project(fields)))
+        if settings.BOOK_CACHE.ENABLED:
+            cached = book_cache.get(book_id)
+            if cached is not None:
+                hit = cached if fields == BOOK_FIELDS else schema(**cached.model_dump(include=set(fields)))
+                return BookRetrieveService._counted(book_id, hit)
+
+        def fetch() -> BaseModel | None:
+            _, book = BookRepository.get_by_id_projected(book_id, fields)
+            return schema(**book) if book is not None else None
+
+        book = coalesce_book_read(
+            key=("retrieve", str(book_id), ",".join(fields)),
+            fn=fetch,
+            dumps=lambda found: found.model_dump_json() if found else "null",
+            loads=lambda raw: None if raw == "null" else schema.model_validate_json(raw),
+        )
+        if book is None:
             raise BookException(
                 message=f"Book with ID {book_id} not found",
                 data={"payload": {"book_id": str(book_id)}}
             )
-        return BookSchema(**book.to_dict())
+        # Only full books are cached (projections are built from them)
+        if settings.BOOK_CACHE.ENABLED and isinstance(book, BookSchema):
+            book_cache.set(book_id, book)
+        return BookRetrieveService._counted(book_id, book)
+
+    @staticmethod
+    def _counted(book_id: UUID, book: BaseModel) -> BaseModel:
+        # `book` may be a projection without `id`
+        if settings.BOOK_COUNTERS.ENABLED and settings.BOOK_COUNTERS.COUNT_VIEWS_ON_READ:
+            BookCountersService.record(book_id, BookCounter.VIEWS)
+        [book] = BookCountersService.merge_pending([book])
+        return book
+
+    @staticmethod
+    def preload(limit: int) -> int:
+        """Loads the most recently updated books into the in-process cache."""
+        success, books = BookRepository.get_recently_updated(limit, BOOK_FIELDS)
+        if not success:
+            return 0
+        for book in books:
+            book_cache.set(book["id"], BookSchema(**book))
+        return len(books)
 
 
 class BookUpdateService:
@@ -43,7 +366,11 @@ class BookUpdateService:
                 message=f"Book with ID {book_id} not found for update",
                 data={"payload": {"book_id": str(book_id)}}
             )
-        return BookSchema(**updated_book.to_dict())
+        invalidate_book_reads(book_id)
+        audit_book_write("update", book_id, book_data.model_dump(mode="json"))
+        updated = BookSchema(**updated_book.to_dict())
+        publish_book_change("update", book_id, updated.model_dump(mode="json"))
+        return updated
 
 
 class BookDeleteService:
@@ -55,3 +382,47 @@ class BookDeleteService:
                 message=f"Book with ID {book_id} not found for deletion",
                 data={"payload": {"book_id": str(book_id)}}
             )
+        invalidate_book_reads(book_id)
+        audit_book_write("delete", book_id)
+        publish_book_change("delete", book_id)
+
+
+class BookBatchWriteService:
+    @staticmethod
+    def apply(writes: list[BookWriteMessage], stop_on_error: bool = False) -> list[Exception | None]:  # noqa: FBT001, FBT002
+        errors = BookRepository.apply_writes(writes, stop_on_error)
+        for write, error in zip(writes, errors):
+            if error is None:
+                if write.book_id is not None:
+                    book_cache.pop(write.book_id)
+                data = write.data.model_dump(mode="json") if write.data else None
+                audit_book_write(write.action.value, write.book_id, data)
+                publish_book_change(write.action.value, write.book_id, data)
+        invalidate_book_reads()
+        return errors
+
+
+class BookPurgeService:
+    @staticmethod
+    def purge(
+        retention_days: float,
+        batch_size: int,
+        archive: bool = True,  # noqa: FBT001, FBT002
+        pause_ms: int = 0,
+        max_batches: int | None = None,
+    ) -> int:
+        """
+        Archives tombstones older than `retention_days` in batches of
+        `batch_size`, pausing between batches so replication and autovacuum
+        keep up. Returns the number of books removed from `books`.
+        """
+        deleted_before = get_app_current_time() - timedelta(days=retention_days)
+        total = batches = 0
+        while max_batches is None or batches < max_batches:
+            removed = BookRepository.purge_deleted(deleted_before, batch_size, archive)
+            total += removed
+            batches += 1
+            if removed < batch_size:
+                break
+            time.sleep(pause_ms / 1000)
+        return total
@@ -0,0 +1,185 @@
+"""
+Books API benchmark.
+
+Drives `main.app` in-process through the ASGI transport and through the
+Mangum `handler` with synthetic API Gateway events, then compares the
+results with a stored JSON baseline.
+
+Usage (from src/):
+    python -m benchmarks.books_api --dataset 1k
+    python -m benchmarks.books_api --dataset 100k --transport mangum --update-baseline
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from benchmarks.common import (
+    BASELINES_DIR,
+    EndpointResult,
+    LatencyRecorder,
+    find_regressions,
+    load_results,
+    print_results,
+    save_results,
+)
+from benchmarks.events import LambdaContext, http_api_v2_event
+from benchmarks.seed import DATASETS, check_seedable, sample_book_ids, seed_books
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[list[str]], str]
+    query: str = ""
+    body: Callable[[], dict[str, Any]] | None = None
+    # Reads the whole table, only meaningful on the small dataset
+    unbounded: bool = False
+
+
+def _new_book() -> dict[str, Any]:
+    return {"title": "Benchmark", "author": "Benchmark", "year": 2024, "type": "online"}
+
+
+# Seeded rows are spread over SEED_MONTHS, the last hour holds a few hundred of 10m
+RECENT = (datetime.datetime.now(datetime.UTC) - datetime.timedelta(hours=1)).replace(tzinfo=None).isoformat()
+
+SCENARIOS = [
+    Scenario("GET /v1/books", "GET", lambda ids: "/v1/books", unbounded=True),
+    Scenario("GET /v1/books?created_after", "GET", lambda ids: "/v1/books", query=f"fields=id,title&created_after={RECENT}"),
+    Scenario("GET /v1/books?fields", "GET", lambda ids: "/v1/books", query="fields=id,title", unbounded=True),
+    Scenario("GET /v1/books/{id}", "GET", lambda ids: f"/v1/books/{random.choice(ids)}"),
+    Scenario("POST /v1/books", "POST", lambda ids: "/v1/books", body=_new_book),
+]
+
+
+async def _run_asgi(scenario: Scenario, ids: list[str], requests: int, concurrency: int) -> EndpointResult:
+    from main import app
+
+    recorder = LatencyRecorder(scenario.name)
+    remaining = iter(range(requests))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+
+        async def worker() -> None:
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.request(
+                    scenario.method,
+                    scenario.path(ids),
+                    params=scenario.query or None,
+                    json=scenario.body() if scenario.body else None,
+                )
+                recorder.record((time.perf_counter() - started) * 1000, ok=response.status_code < 400)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return recorder.result()
+
+
+def _run_mangum(scenario: Scenario, ids: list[str], requests: int) -> EndpointResult:
+    # Lambda serves one event per execution environment, so this runs sequentially
+    from main import handler
+
+    recorder = LatencyRecorder(scenario.name)
+    for _ in range(requests):
+        event = http_api_v2_event(
+            scenario.method,
+            scenario.path(ids),
+            query_string=scenario.query,
+            body=scenario.body() if scenario.body else None,
+        )
+        started = time.perf_counter()
+        response = handler(event, LambdaContext())
+        recorder.record((time.perf_counter() - started) * 1000, ok=response["statusCode"] < 400)
+    return recorder.result()
+
+
+def run(args: argparse.Namespace) -> list[EndpointResult]:
+    if not args.skip_seed:
+        check_seedable(args.allow_any_environment)
+        print(f"Seeding {DATASETS[args.dataset]} books...")
+        seed_books(DATASETS[args.dataset])
+    ids = sample_book_ids(1000)
+    if not ids:
+        raise SystemExit("public.books is empty, run without --skip-seed")
+
+    scenarios = [
+        s for s in SCENARIOS
+        if (not args.only or s.name in args.only) and (args.dataset == "1k" or not s.unbounded)
+    ]
+
+    results = []
+    for scenario in scenarios:
+        for _ in range(args.warmup):
+            if args.transport == "asgi":
+                asyncio.run(_run_asgi(scenario, ids, 1, 1))
+            else:
+                _run_mangum(scenario, ids, 1)
+        if args.transport == "asgi":
+            results.append(asyncio.run(_run_asgi(scenario, ids, args.requests, args.concurrency)))
+        else:
+            results.append(_run_mangum(scenario, ids, args.requests))
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="1k")
+    parser.add_argument("--transport", choices=["asgi", "mangum"], default="asgi")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (asgi only)")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per endpoint")
+    parser.add_argument("--only", nargs="*", help="Scenario names to run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Tolerated relative regression (0.2 = 20%%)")
+    parser.add_argument("--baseline-dir", type=Path, default=BASELINES_DIR)
+    parser.add_argument("--output", type=Path, help="Also write the results to this file")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the rows already in public.books")
+    parser.add_argument("--allow-any-environment", action="store_true", help="Allow truncating outside local/testing")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    # Per-request INFO logs would dominate the measured latency
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    results = run(args)
+    print_results(f"{args.transport} / {args.dataset}", results)
+
+    metadata = {"dataset": args.dataset, "transport": args.transport, "requests": args.requests}
+    if args.transport == "asgi":
+        metadata["concurrency"] = args.concurrency
+    baseline_path = args.baseline_dir / f"books_api.{args.transport}.{args.dataset}.json"
+    if args.output:
+        save_results(args.output, results, metadata)
+    if args.update_baseline or not baseline_path.exists():
+        save_results(baseline_path, results, metadata)
+        print(f"\nBaseline written to {baseline_path}")
+        return 0
+
+    current = {result.name: result.to_dict() for result in results}
+    regressions = find_regressions(current, load_results(baseline_path), args.threshold)
+    if regressions:
+        print(f"\nRegressions above {args.threshold:.0%} against {baseline_path}:")
+        print(json.dumps(regressions, indent=2))
+        return 1
+    print(f"\nNo regressions above {args.threshold:.0%} against {baseline_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
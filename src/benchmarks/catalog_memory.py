@@ -0,0 +1,105 @@
+"""
+Book catalog memory benchmark.
+
+Fills a BookCatalog (api.v1.books.catalog) with synthetic books shaped
+like benchmarks.seed (1000 authors, 3 types) or, with --from-db, loads
+public.books, and reports the memory it retains per book using
+tracemalloc, plus the time for a full load and for indexed lookups.
+
+Usage (from src/):
+    python -m benchmarks.catalog_memory --books 100000
+    python -m benchmarks.catalog_memory --from-db
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+from typing import Any
+
+from loguru import logger
+
+from api.v1.books.catalog import BookCatalog
+from db.posgresql.models.public import BookType
+from shared.memory import MB
+from shared.uuid7 import uuid7
+
+TYPES = list(BookType)
+
+
+def synthetic_rows(count: int) -> Iterator[dict[str, Any]]:
+    now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+    for n in range(count):
+        created = now - datetime.timedelta(minutes=n)
+        yield {
+            "id": uuid7(),
+            "title": f"Book {n}",
+            "author": f"Author {n % 1000}",
+            "year": 1900 + n % 125,
+            "type": TYPES[n % 3],
+            "view_count": 0,
+            "download_count": 0,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+def measure(args: argparse.Namespace) -> dict[str, Any]:
+    catalog = BookCatalog(overlap_seconds=5, full_reload_seconds=3600, load_batch_size=args.batch_size)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    if args.from_db:
+        catalog.load()
+    else:
+        catalog.replace(synthetic_rows(args.books))
+    load_seconds = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    books = len(catalog)
+    ids = random.sample(list(catalog._books), min(books, 10_000))
+    started = time.perf_counter()
+    for book_id in ids:
+        catalog.get(book_id)
+    get_us = (time.perf_counter() - started) / max(len(ids), 1) * 1e6
+    started = time.perf_counter()
+    by_author = catalog.find(author="Author 7")
+    find_ms = (time.perf_counter() - started) * 1000
+    return {
+        "books": books,
+        "retained_mb": round(retained / MB, 1),
+        "bytes_per_book": round(retained / books) if books else 0,
+        "mb_per_100k_books": round(retained / books * 100_000 / MB, 1) if books else 0,
+        "load_seconds": round(load_seconds, 2),
+        "get_us": round(get_us, 2),
+        "find_by_author_ms": round(find_ms, 3),
+        "find_by_author_books": len(by_author),
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=100_000, help="Synthetic books to load")
+    parser.add_argument("--from-db", action="store_true", help="Load public.books instead of synthetic rows")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    print(json.dumps(measure(args), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
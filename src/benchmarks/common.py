@@ -0,0 +1,108 @@
+import json
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `samples` (pct in 0..100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@dataclass
+class EndpointResult:
+    name: str
+    requests: int
+    errors: int
+    duration_seconds: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+
+    @property
+    def throughput_rps(self) -> float:
+        return self.requests / self.duration_seconds if self.duration_seconds else 0.0
+
+    def to_dict(self) -> dict[str, float | int | str]:
+        return {**asdict(self), "throughput_rps": round(self.throughput_rps, 2)}
+
+
+@dataclass
+class LatencyRecorder:
+    name: str
+    samples_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def record(self, elapsed_ms: float, ok: bool = True) -> None:  # noqa: FBT001, FBT002
+        self.samples_ms.append(elapsed_ms)
+        if not ok:
+            self.errors += 1
+
+    def result(self) -> EndpointResult:
+        duration = time.perf_counter() - self.started
+        count = len(self.samples_ms)
+        return EndpointResult(
+            name=self.name,
+            requests=count,
+            errors=self.errors,
+            duration_seconds=round(duration, 4),
+            p50_ms=round(percentile(self.samples_ms, 50), 3),
+            p95_ms=round(percentile(self.samples_ms, 95), 3),
+            p99_ms=round(percentile(self.samples_ms, 99), 3),
+            mean_ms=round(sum(self.samples_ms) / count, 3) if count else 0.0,
+        )
+
+
+def save_results(path: Path, results: list[EndpointResult], metadata: dict[str, object]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"metadata": metadata, "endpoints": {result.name: result.to_dict() for result in results}}
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+
+
+def load_results(path: Path) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = json.loads(path.read_text())["endpoints"]
+    return results
+
+
+def find_regressions(
+    current: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float,
+) -> list[str]:
+    """
+    Compares latency percentiles (higher is worse) and throughput (lower is
+    worse) per endpoint; `threshold` is the tolerated relative change.
+    """
+    regressions = []
+    for name, base in baseline.items():
+        if name not in current:
+            continue
+        now = current[name]
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if base[metric] and now[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{name} {metric}: {base[metric]} -> {now[metric]}")
+        if base["throughput_rps"] and now["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{name} throughput_rps: {base['throughput_rps']} -> {now['throughput_rps']}")
+        if now["errors"] > base["errors"]:
+            regressions.append(f"{name} errors: {base['errors']} -> {now['errors']}")
+    return regressions
+
+
+def print_results(title: str, results: list[EndpointResult]) -> None:
+    print(f"\n{title}")
+    print(f"{'endpoint':<28}{'req':>8}{'err':>6}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for result in results:
+        print(
+            f"{result.name:<28}{result.requests:>8}{result.errors:>6}{result.throughput_rps:>10.1f}"
+            f"{result.p50_ms:>10.2f}{result.p95_ms:>10.2f}{result.p99_ms:>10.2f}"
+        )
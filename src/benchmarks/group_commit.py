@@ -0,0 +1,104 @@
+"""
+Group-commit benchmark.
+
+Creates books through BookCreateService from N threads (the way the
+threadpool runs concurrent POST /v1/books) with GROUP_COMMIT disabled and
+enabled, and reports inserts/sec and latency per concurrency level. The
+rows are written to public.books and deleted afterwards.
+
+Usage (from src/):
+    python -m benchmarks.group_commit
+    python -m benchmarks.group_commit --concurrency 1 8 32 128 --inserts 4000 --window-ms 5
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import delete
+
+from api.v1.books.repositories import BookStatsRepository
+from api.v1.books.schema import BookCreateSchema
+from api.v1.books.services import BookCreateService, book_creates
+from benchmarks.common import EndpointResult, LatencyRecorder, print_results, save_results
+from benchmarks.seed import check_seedable
+from core.settings import settings
+from db.posgresql import get_db_context
+from db.posgresql.models.public import Book, BookType
+
+TITLE = "Benchmark group commit"
+
+
+def measure(name: str, concurrency: int, inserts: int) -> EndpointResult:
+    book = BookCreateSchema(title=TITLE, author="Benchmark", year=2024, type=BookType.ONLINE)
+    recorder = LatencyRecorder(name)
+
+    def create(_: int) -> None:
+        started = time.perf_counter()
+        try:
+            BookCreateService.create(book)
+            ok = True
+        except Exception:  # noqa: BLE001
+            ok = False
+        recorder.record((time.perf_counter() - started) * 1000, ok)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        recorder.started = time.perf_counter()
+        list(pool.map(create, range(inserts)))
+    return recorder.result()
+
+
+def run(args: argparse.Namespace) -> list[EndpointResult]:
+    book_creates.window = args.window_ms / 1000
+    book_creates.max_batch = args.max_batch
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            for enabled in (False, True):
+                settings.GROUP_COMMIT.ENABLED = enabled
+                batches, items = book_creates.batches, book_creates.items
+                mode = "group" if enabled else "single"
+                result = measure(f"{mode} x{concurrency}", concurrency, args.inserts)
+                results.append(result)
+                if enabled:
+                    batch_size = (book_creates.items - items) / max(book_creates.batches - batches, 1)
+                    print(f"{result.name}: mean batch size {batch_size:.1f}")
+    finally:
+        settings.GROUP_COMMIT.ENABLED = False
+        with get_db_context() as session:
+            session.execute(delete(Book).where(Book.title == TITLE))
+            session.commit()
+        BookStatsRepository.rebuild()
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--inserts", type=int, default=2000, help="Creates per concurrency level and mode")
+    parser.add_argument("--window-ms", type=float, default=settings.GROUP_COMMIT.WINDOW_MS)
+    parser.add_argument("--max-batch", type=int, default=settings.GROUP_COMMIT.MAX_BATCH)
+    parser.add_argument("--output", type=Path, help="Write the results to this file")
+    parser.add_argument("--allow-any-environment", action="store_true", help="Allow running outside local/testing")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    check_seedable(args.allow_any_environment)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    results = run(args)
+    print_results(f"group commit / window {args.window_ms}ms, max batch {args.max_batch}", results)
+    if args.output:
+        save_results(args.output, results, {"window_ms": args.window_ms, "max_batch": args.max_batch})
+        print(json.dumps({"output": str(args.output)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
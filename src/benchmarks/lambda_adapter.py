@@ -0,0 +1,91 @@
+"""
+Per-invocation overhead of shared.lambda_adapter against Mangum.
+
+Replays the recorded events in benchmarks/samples against a bare ASGI app
+(adapter cost only) and against `main.app` (full stack).
+
+Usage (from src/):
+    python -m benchmarks.lambda_adapter --invocations 5000
+"""
+
+import argparse
+import copy
+import json
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from mangum import Mangum
+from starlette.types import Receive, Scope, Send
+
+from benchmarks.common import EndpointResult, LatencyRecorder, print_results, save_results
+from benchmarks.events import LambdaContext
+from shared.lambda_adapter import LambdaAdapter
+
+SAMPLES_DIR = Path(__file__).resolve().parent / "samples"
+
+
+async def bare_app(scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] != "http":
+        return
+    await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b'{"ok":true}'})
+
+
+def load_samples() -> dict[str, dict[str, Any]]:
+    return {path.stem: json.loads(path.read_text()) for path in sorted(SAMPLES_DIR.glob("*.json"))}
+
+
+def measure(name: str, handler: Callable[..., Any], event: dict[str, Any], invocations: int) -> EndpointResult:
+    recorder = LatencyRecorder(name)
+    for _ in range(invocations):
+        payload = copy.deepcopy(event)
+        started = time.perf_counter()
+        response = handler(payload, LambdaContext())
+        recorder.record((time.perf_counter() - started) * 1000, ok=response["statusCode"] < 500)
+    return recorder.result()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invocations", type=int, default=2000)
+    parser.add_argument("--full-stack", action="store_true", help="Also replay the index sample against main.app")
+    parser.add_argument("--output", type=Path, help="Write the results to this file")
+    args = parser.parse_args(argv)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    handlers: dict[str, Callable[..., Any]] = {
+        "mangum": Mangum(bare_app, lifespan="off"),
+        "adapter": LambdaAdapter(bare_app, fallback=Mangum(bare_app, lifespan="off")),
+    }
+    results = []
+    for sample, event in load_samples().items():
+        for handler_name, handler in handlers.items():
+            measure(sample, handler, event, 50)
+            results.append(measure(f"{handler_name}:{sample}", handler, event, args.invocations))
+
+    if args.full_stack:
+        from main import app
+
+        event = load_samples()["http_api_v2_get_index"]
+        full: dict[str, Callable[..., Any]] = {
+            "mangum": Mangum(app, lifespan="off"),
+            "adapter": LambdaAdapter(app, fallback=Mangum(app, lifespan="off")),
+        }
+        for handler_name, handler in full.items():
+            measure("app", handler, event, 50)
+            results.append(measure(f"{handler_name}:app:index", handler, event, args.invocations))
+
+    print_results("Lambda adapter overhead (ms per invocation)", results)
+    if args.output:
+        save_results(args.output, results, {"invocations": args.invocations})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
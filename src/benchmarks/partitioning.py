@@ -0,0 +1,202 @@
+"""
+Partitioning benchmark.
+
+Loads the same synthetic books into a plain table and a monthly
+RANGE-partitioned one (in the `benchmarks` schema, public.books is left
+alone) and measures the queries BookRepository issues: a created_at
+window list, a lookup by UUIDv7 id with its derived created_at bounds,
+and single-row inserts.
+
+Usage (from src/):
+    python -m benchmarks.partitioning --rows 10000000
+    python -m benchmarks.partitioning --skip-seed --requests 2000
+"""
+
+import argparse
+import datetime
+import json
+import random
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import Connection, text
+
+from benchmarks.common import EndpointResult, LatencyRecorder, print_results, save_results
+from benchmarks.seed import books_insert_sql, check_seedable
+from db.posgresql.connection import engine
+from db.posgresql.partitions import add_months, create_default_partition, create_partitions, month_start
+from shared.uuid7 import uuid7_datetime
+
+SCHEMA = "benchmarks"
+TABLES = {"plain": f"{SCHEMA}.books_plain", "partitioned": f"{SCHEMA}.books_partitioned"}
+COLUMNS = """
+    id uuid NOT NULL,
+    title varchar NOT NULL,
+    author varchar NOT NULL,
+    year integer NOT NULL,
+    type booktype NOT NULL,
+    created_at timestamp NOT NULL,
+    updated_at timestamp,
+    deleted_at timestamp
+"""
+ID_SLACK = datetime.timedelta(minutes=5)
+
+
+def create_tables(connection: Connection, months: int) -> None:
+    connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}"))
+    for table in TABLES.values():
+        connection.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+
+    connection.execute(text(f"CREATE TABLE {TABLES['plain']} ({COLUMNS}, PRIMARY KEY (id))"))
+    connection.execute(
+        text(f"CREATE TABLE {TABLES['partitioned']} ({COLUMNS}, PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)")
+    )
+    first_month = add_months(month_start(datetime.date.today()), -months)
+    create_partitions(connection, first_month, months + 2, parent=TABLES["partitioned"])
+    create_default_partition(connection, parent=TABLES["partitioned"])
+    for name, table in TABLES.items():
+        connection.execute(
+            text(f"CREATE INDEX ix_{name}_live_created_at ON {table} (created_at) WHERE deleted_at IS NULL")
+        )
+
+
+def seed(rows: int, months: int) -> None:
+    with engine.begin() as connection:
+        connection.execute(text("SET LOCAL statement_timeout = 0"))
+        connection.execute(text("SET LOCAL TimeZone = 'UTC'"))
+        create_tables(connection, months)
+        for name, table in TABLES.items():
+            started = time.perf_counter()
+            connection.execute(text(books_insert_sql(table)), {"count": rows, "months": months})
+            print(f"Loaded {rows} rows into {name} in {time.perf_counter() - started:.1f}s")
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT")
+        for table in TABLES.values():
+            connection.execute(text(f"VACUUM ANALYZE {table}"))
+
+
+def sample_ids(connection: Connection, limit: int) -> list[Any]:
+    return list(connection.execute(
+        text(f"SELECT id FROM {TABLES['plain']} TABLESAMPLE SYSTEM (1) LIMIT :limit"), {"limit": limit}
+    ).scalars())
+
+
+def utc_now() -> datetime.datetime:
+    # Naive UTC like the session TimeZone, aware bounds would only prune at run time
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+def list_window(table: str, months: int) -> tuple[str, dict[str, Any]]:
+    end = utc_now() - datetime.timedelta(days=random.uniform(0, months * 30))
+    return (
+        f"SELECT id, title, author, year, type, created_at FROM {table} "
+        "WHERE deleted_at IS NULL AND created_at >= :start AND created_at < :end "
+        "ORDER BY created_at DESC LIMIT 50",
+        {"start": end - datetime.timedelta(days=1), "end": end},
+    )
+
+
+def get_by_id(table: str, ids: list[Any]) -> tuple[str, dict[str, Any]]:
+    book_id = random.choice(ids)
+    created = uuid7_datetime(book_id).replace(tzinfo=None)
+    return (
+        f"SELECT id, title, author, year, type, created_at FROM {table} "
+        "WHERE id = :id AND created_at BETWEEN :start AND :end AND deleted_at IS NULL",
+        {"id": book_id, "start": created - ID_SLACK, "end": created + ID_SLACK},
+    )
+
+
+def insert(table: str) -> tuple[str, dict[str, Any]]:
+    return (
+        f"INSERT INTO {table} (id, title, author, year, type, created_at, updated_at) "
+        "VALUES (gen_random_uuid(), 'Benchmark', 'Benchmark', 2024, 'ONLINE', now(), now())",
+        {},
+    )
+
+
+def scanned_partitions(connection: Connection, statement: str, params: dict[str, Any]) -> int:
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {statement}"), params).scalar_one()
+    relations: set[str] = set()
+
+    def walk(node: dict[str, Any]) -> None:
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return len(relations)
+
+
+def measure(
+    connection: Connection, name: str, build: Callable[[], tuple[str, dict[str, Any]]], requests: int, warmup: int
+) -> tuple[EndpointResult, int]:
+    for _ in range(warmup):
+        connection.execute(text(build()[0]), build()[1])
+    recorder = LatencyRecorder(name)
+    for _ in range(requests):
+        statement, params = build()
+        started = time.perf_counter()
+        connection.execute(text(statement), params)
+        connection.commit()
+        recorder.record((time.perf_counter() - started) * 1000)
+    statement, params = build()
+    return recorder.result(), scanned_partitions(connection, statement, params)
+
+
+def run(args: argparse.Namespace) -> list[EndpointResult]:
+    if not args.skip_seed:
+        check_seedable(args.allow_any_environment)
+        seed(args.rows, args.months)
+
+    results = []
+    with engine.connect() as connection:
+        connection.execute(text("SET TimeZone = 'UTC'"))
+        ids = sample_ids(connection, 1000)
+        if not ids:
+            raise SystemExit(f"{TABLES['plain']} is empty, run without --skip-seed")
+        for name, table in TABLES.items():
+            scenarios = {
+                "list 1-day window": lambda table=table: list_window(table, args.months),
+                "get by id": lambda table=table: get_by_id(table, ids),
+                "insert": lambda table=table: insert(table),
+            }
+            for scenario, build in scenarios.items():
+                result, partitions = measure(connection, f"{name}: {scenario}", build, args.requests, args.warmup)
+                results.append(result)
+                print(f"{result.name}: {partitions} relation(s) in the plan")
+            connection.execute(text(f"DELETE FROM {table} WHERE title = 'Benchmark'"))
+            connection.commit()
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--months", type=int, default=24, help="Months the rows are spread over")
+    parser.add_argument("--requests", type=int, default=1000, help="Statements per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--output", type=Path, help="Write the results to this file")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the tables from a previous run")
+    parser.add_argument("--allow-any-environment", action="store_true", help="Allow running outside local/testing")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    results = run(args)
+    print_results(f"partitioning / {args.rows} rows", results)
+    if args.output:
+        save_results(args.output, results, {"rows": args.rows, "months": args.months})
+        print(json.dumps({"output": str(args.output)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
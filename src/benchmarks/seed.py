@@ -0,0 +1,79 @@
+import datetime
+
+from sqlalchemy import text
+
+from api.v1.books.repositories import BookStatsRepository
+from core.settings import settings
+from db.posgresql import get_db_context
+from db.posgresql.partitions import add_months, create_partitions, is_partitioned, month_start
+from shared.environment import AppEnvironment
+
+# Environments where the benchmark may wipe public.books
+SEEDABLE_ENVIRONMENTS = {
+    AppEnvironment.LOCAL.value,
+    AppEnvironment.LOCAL_DOCKER.value,
+    AppEnvironment.TESTING.value,
+    AppEnvironment.TESTING_DOCKER.value,
+}
+
+DATASETS = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Rows are spread backwards from now() over this many months
+SEED_MONTHS = 24
+
+# UUIDv7 built from `created` (timestamptz) and the row number, as shared.uuid7 does
+UUID7_SQL = """
+    CAST(
+        lpad(to_hex(floor(extract(epoch FROM created) * 1000)::bigint), 12, '0')
+        || '7' || substr(md5(n::text), 1, 3)
+        || substr('89ab', 1 + n % 4, 1) || substr(md5(n::text), 4, 15)
+    AS uuid)
+"""
+
+
+def books_insert_sql(table: str) -> str:
+    """INSERT ... SELECT of `:count` synthetic books created over the last `:months` months."""
+    return f"""
+        INSERT INTO {table} (id, title, author, year, type, created_at, updated_at)
+        SELECT {UUID7_SQL}, 'Book ' || n, 'Author ' || (n % 1000), 1900 + n % 125,
+               (ARRAY['ONLINE', 'FISICAL', 'BOTH'])[1 + n % 3]::booktype, created, created
+        FROM (
+            SELECT n, now() - make_interval(secs => n * (:months * 30 * 86400.0 / :count)) AS created
+            FROM generate_series(1, :count) AS n
+        ) AS generated
+    """
+
+
+def check_seedable(allow_any_environment: bool = False) -> None:  # noqa: FBT001, FBT002
+    if not allow_any_environment and settings.ENVIRONMENT not in SEEDABLE_ENVIRONMENTS:
+        raise SystemExit(
+            f"Refusing to truncate public.books in '{settings.ENVIRONMENT}', "
+            "pass --allow-any-environment to force it"
+        )
+
+
+def seed_books(count: int, months: int = SEED_MONTHS) -> None:
+    """Replaces public.books with `count` synthetic rows generated server-side."""
+    with get_db_context() as session:
+        session.execute(text("SET LOCAL statement_timeout = 0"))
+        session.execute(text("TRUNCATE TABLE public.books RESTART IDENTITY CASCADE"))
+        connection = session.connection()
+        if is_partitioned(connection):
+            first_month = add_months(month_start(datetime.date.today()), -months)
+            create_partitions(connection, first_month, months + 1)
+        session.execute(text(books_insert_sql("public.books")), {"count": count, "months": months})
+        session.commit()
+    BookStatsRepository.rebuild()
+    with get_db_context() as session:
+        session.execute(text("ANALYZE public.books"))
+        session.commit()
+
+
+def sample_book_ids(limit: int) -> list[str]:
+    with get_db_context() as session:
+        rows = session.execute(
+            text("SELECT id FROM public.books TABLESAMPLE SYSTEM (10) LIMIT :limit"), {"limit": limit}
+        ).scalars().all()
+        if not rows:
+            rows = session.execute(text("SELECT id FROM public.books LIMIT :limit"), {"limit": limit}).scalars().all()
+        return [str(book_id) for book_id in rows]
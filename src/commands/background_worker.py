@@ -0,0 +1,70 @@
+"""
+Consumes background tasks pushed to the Redis Stream (BACKGROUND__MODE=redis).
+
+Usage (from src/):
+    python -m commands.background_worker --consumer worker-1
+"""
+
+import argparse
+import signal
+import socket
+import sys
+import time
+
+from loguru import logger
+from redis import Redis
+from redis.exceptions import RedisError
+
+import api.v1.books.audit  # noqa: F401  registers the book tasks
+from core.settings import settings
+from shared.background import background_tasks
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--consumer", default=socket.gethostname())
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--block-ms", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    stream = background_tasks.stream
+    if stream is None:
+        parser.error("background tasks have no Redis stream configured")
+    # Blocking reads need a longer socket timeout than the shared client
+    client = Redis.from_url(
+        settings.REDIS_URL.unicode_string(),
+        decode_responses=True,
+        socket_connect_timeout=settings.TIMEOUTS.REDIS_CONNECT_TIMEOUT_SECONDS,
+        socket_timeout=args.block_ms / 1000 + settings.TIMEOUTS.REDIS_SOCKET_TIMEOUT_SECONDS,
+    )
+    stream.ensure_group(client)
+
+    running = True
+
+    def stop(signum: int, _frame: object) -> None:
+        nonlocal running
+        logger.info(f"Received signal {signum}, stopping after the current batch")
+        running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info(f"Consuming {stream.stream} as {stream.group}/{args.consumer}")
+    while running:
+        try:
+            stream.consume(
+                client,
+                args.consumer,
+                count=args.batch_size,
+                block_ms=args.block_ms,
+                claim_idle_ms=settings.BACKGROUND.STREAM_CLAIM_IDLE_MS,
+            )
+        except RedisError as exc:
+            logger.warning(f"Redis error while consuming: {exc}")
+            time.sleep(1)
+    logger.info(f"Stopped, {background_tasks.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Writes the OpenAPI document served at /openapi.json so containers don't
+build it from the routes on their first docs request.
+
+Usage (from src/):
+    python -m commands.build_openapi
+    python -m commands.build_openapi --check
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from shared.openapi import encode_schema
+from shared.path import OPENAPI_SCHEMA_PATH
+
+
+def build(output: Path) -> bytes:
+    from main import generate_openapi
+
+    body = encode_schema(generate_openapi())
+    output.write_bytes(body)
+    return body
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=OPENAPI_SCHEMA_PATH)
+    parser.add_argument("--check", action="store_true", help="Fail if the file differs from the live app")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        from main import generate_openapi
+
+        current = args.output.read_bytes() if args.output.exists() else b""
+        if current != encode_schema(generate_openapi()):
+            print(f"{args.output} is out of date, run python -m commands.build_openapi")
+            return 1
+        print(f"{args.output} is up to date")
+        return 0
+
+    body = build(args.output)
+    print(f"Wrote {len(body)} bytes to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Moves the write-behind view/download counters from Redis into
+public.books, one batched UPDATE per interval. A batch interrupted by a
+crash is retried on the next run and applied at most once.
+
+Usage (from src/):
+    python -m commands.flush_book_counters
+    python -m commands.flush_book_counters --once
+    python -m commands.flush_book_counters --interval 10
+"""
+
+import argparse
+import sys
+import time
+
+from loguru import logger
+
+from api.v1.books.services import BookCountersService
+from core.settings import settings
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=float, default=settings.BOOK_COUNTERS.FLUSH_INTERVAL_SECONDS)
+    parser.add_argument("--once", action="store_true", help="Flush a single batch and exit")
+    args = parser.parse_args(argv)
+
+    while True:
+        started = time.monotonic()
+        try:
+            flushed = BookCountersService.flush()
+            if flushed:
+                logger.info(f"Flushed counters for {flushed} books")
+        except Exception as exc:  # noqa: BLE001
+            if args.once:
+                raise
+            logger.exception(f"Counter flush failed, retrying next interval: {exc}")
+        if args.once:
+            return 0
+        time.sleep(max(args.interval - (time.monotonic() - started), 0))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Creates the upcoming monthly partitions of public.books and retires the
+ones older than the retention period (moved to an archive schema or
+dropped). Run it daily from a scheduler; it is idempotent.
+
+Usage (from src/):
+    python -m commands.maintain_partitions
+    python -m commands.maintain_partitions --premake-months 6 --retention-months 24 --retire-mode drop
+"""
+
+import argparse
+import sys
+
+from loguru import logger
+
+from core.settings import settings
+from db.posgresql.connection import engine
+from db.posgresql.partitions import is_partitioned, maintain_partitions
+from shared.utils_dates import get_app_current_time
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--premake-months", type=int, default=settings.PARTITIONING.PREMAKE_MONTHS)
+    parser.add_argument("--retention-months", type=int, default=settings.PARTITIONING.RETENTION_MONTHS)
+    parser.add_argument("--retire-mode", choices=["archive", "drop"], default=settings.PARTITIONING.RETIRE_MODE)
+    parser.add_argument("--archive-schema", default=settings.PARTITIONING.ARCHIVE_SCHEMA)
+    args = parser.parse_args(argv)
+
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            logger.error("public.books is not partitioned (create it with PARTITIONING__ENABLED=true)")
+            return 1
+        # Keeps concurrent runs from racing on the same partitions
+        connection.exec_driver_sql("LOCK TABLE public.books IN SHARE UPDATE EXCLUSIVE MODE")
+        result = maintain_partitions(
+            connection,
+            today=get_app_current_time().date(),
+            premake_months=args.premake_months,
+            retention_months=args.retention_months,
+            retire_mode=args.retire_mode,
+            archive_schema=args.archive_schema,
+        )
+    logger.info(f"Partitions created: {result['created'] or 'none'}, retired: {result['retired'] or 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
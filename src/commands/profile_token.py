@@ -0,0 +1,29 @@
+"""
+Prints an X-Profile-Token for profiling one path (needs LOG__PROFILE_SECRET).
+
+Usage (from src/):
+    python -m commands.profile_token /v1/books --ttl 300
+"""
+
+import argparse
+import sys
+
+from core.settings import settings
+from shared.profiler import sign_profile_token
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Request path as the app sees it, e.g. /v1/books")
+    parser.add_argument("--ttl", type=int, default=300, help="Seconds the token stays valid")
+    args = parser.parse_args(argv)
+
+    if not settings.LOG.PROFILE_SECRET:
+        print("LOG__PROFILE_SECRET is not set", file=sys.stderr)
+        return 1
+    print(sign_profile_token(settings.LOG.PROFILE_SECRET, args.path, args.ttl))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Moves soft-deleted books older than the retention period from `books` to
+`books_archive` in small batches, so the hot table and its indexes stay
+small. Safe to run concurrently (rows are locked with SKIP LOCKED).
+
+Usage (from src/):
+    python -m commands.purge_deleted_books
+    python -m commands.purge_deleted_books --retention-days 7 --batch-size 1000 --no-archive
+"""
+
+import argparse
+import sys
+
+from loguru import logger
+
+from api.v1.books.services import BookPurgeService
+from core.settings import settings
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retention-days", type=float, default=settings.BOOK_PURGE.RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.BOOK_PURGE.BATCH_SIZE)
+    parser.add_argument("--pause-ms", type=int, default=settings.BOOK_PURGE.PAUSE_MS)
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument(
+        "--archive", action=argparse.BooleanOptionalAction, default=settings.BOOK_PURGE.ARCHIVE,
+        help="Copy purged rows to books_archive (default from BOOK_PURGE.ARCHIVE)",
+    )
+    args = parser.parse_args(argv)
+
+    removed = BookPurgeService.purge(
+        retention_days=args.retention_days,
+        batch_size=args.batch_size,
+        archive=args.archive,
+        pause_ms=args.pause_ms,
+        max_batches=args.max_batches,
+    )
+    logger.info(f"Purged {removed} soft-deleted books (archive={args.archive})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+Recomputes public.book_stats from public.books. Run once after deploying
+the stats table and after bulk loads that bypass BookRepository; writes
+to books wait while it runs.
+
+Usage (from src/):
+    python -m commands.rebuild_book_stats
+"""
+
+import argparse
+import sys
+
+from loguru import logger
+
+from api.v1.books.repositories import BookStatsRepository
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args(argv)
+    total = BookStatsRepository.rebuild()
+    logger.info(f"book_stats rebuilt, {total} live books")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Runs a registered batch job over public.books: the table is split into
+keyset id ranges, processed on a pool of worker processes and
+checkpointed per chunk in public.batch_job_chunks. Re-running with the
+same --run-id resumes after a crash or a failed chunk.
+
+Usage (from src/):
+    python -m commands.run_batch_job books.copy_to_mongo
+    python -m commands.run_batch_job books.copy_to_mongo --run-id backfill-1 --workers 8 --max-rows-per-second 5000
+    python -m commands.run_batch_job books.copy_to_mongo --run-id backfill-1 --status
+"""
+
+import argparse
+import json
+import sys
+
+from loguru import logger
+
+import api.v1.books.jobs  # noqa: F401  registers the book jobs
+from core.settings import settings
+from shared.batch_jobs import BatchJobRunner, Throttle, get_batch_job, registered_batch_jobs
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("job", choices=registered_batch_jobs())
+    parser.add_argument("--run-id", help="Checkpoint namespace, defaults to the job name")
+    parser.add_argument("--workers", type=int, default=settings.BATCH_JOBS.WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=settings.BATCH_JOBS.CHUNK_SIZE)
+    parser.add_argument("--page-size", type=int, default=settings.BATCH_JOBS.PAGE_SIZE)
+    parser.add_argument("--max-rows-per-second", type=float, default=settings.BATCH_JOBS.MAX_ROWS_PER_SECOND)
+    parser.add_argument(
+        "--max-replication-lag", type=float, default=settings.BATCH_JOBS.MAX_REPLICATION_LAG_SECONDS,
+        help="Pause while a replica is further behind than this many seconds",
+    )
+    parser.add_argument("--progress-interval", type=float, default=settings.BATCH_JOBS.PROGRESS_INTERVAL_SECONDS)
+    parser.add_argument("--restart", action="store_true", help="Drop the checkpoints of --run-id and start over")
+    parser.add_argument("--status", action="store_true", help="Print the progress of --run-id and exit")
+    args = parser.parse_args(argv)
+
+    runner = BatchJobRunner(
+        job=get_batch_job(args.job),
+        run_id=args.run_id or args.job,
+        chunk_size=args.chunk_size,
+        page_size=args.page_size,
+        workers=args.workers,
+        throttle=Throttle(args.max_rows_per_second, args.max_replication_lag),
+        progress_interval_seconds=args.progress_interval,
+    )
+    if args.status:
+        print(json.dumps(runner.progress()))
+        return 0
+    if args.restart:
+        runner.reset()
+    progress = runner.run()
+    logger.info(f"Batch job {args.job} finished: {progress}")
+    return 1 if progress["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Production HTTP server (the container entry point outside Lambda):
+uvicorn with one worker process per available CPU, uvloop/httptools
+when installed and keep-alive/backlog tuned for a load balancer, all
+from settings.SERVER.
+
+SIGTERM stops accepting connections, lets in-flight requests finish
+(up to GRACEFUL_SHUTDOWN_SECONDS) and then runs the lifespan shutdown,
+which drains background tasks and disposes the database clients.
+SIGHUP restarts the workers one at a time, each after its requests
+finished, while the others keep serving.
+
+Usage (from src/):
+    python -m commands.serve
+    python -m commands.serve --workers 2 --port 8000
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import uvicorn
+
+from core.settings import settings
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and the cgroup v2 quota of the container."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(int(quota) // int(period), 1))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def main(argv: list[str] | None = None) -> int:
+    server = settings.SERVER
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="main:app", help="ASGI application import string")
+    parser.add_argument("--host", default=server.HOST)
+    parser.add_argument("--port", type=int, default=server.PORT)
+    parser.add_argument("--workers", type=int, default=server.WORKERS)
+    args = parser.parse_args(argv)
+
+    uvicorn.run(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers or available_cpus(),
+        loop=server.LOOP,
+        http=server.HTTP,
+        backlog=server.BACKLOG,
+        timeout_keep_alive=server.KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=server.GRACEFUL_SHUTDOWN_SECONDS,
+        limit_concurrency=server.LIMIT_CONCURRENCY,
+        proxy_headers=server.PROXY_HEADERS,
+        forwarded_allow_ips=server.FORWARDED_ALLOW_IPS,
+        lifespan="on",
+        # Request logs come from the app (loguru + metrics)
+        access_log=False,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,5 +3,6 @@ from shared.base_internal_codes import InternalCodeBase
 class InternalCodesApiBook(InternalCodeBase):
     BOOK_API_ERROR = 1000, "Book API error"
     BOOK_NOT_FOUND = 1001, "Book not found"
+    BOOK_INVALID_FIELDS = 1002, "Invalid book fields requested"
 
     
\ No newline at end of file
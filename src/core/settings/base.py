@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, PostgresDsn, RedisDsn, MongoDsn
@@ -16,6 +18,220 @@ class LogSettings(BaseModel):
     COLORIZE: bool = False  
     SERIALIZE: bool = False
     ENQUEUE: bool = False
+    # Request profiling: fraction of requests profiled, and/or a secret to
+    # sign X-Profile-Token headers (see shared.profiler). Off when both unset.
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_SECRET: str | None = None
+    PROFILE_DIR: str = "/tmp/profiles"
+    PROFILE_INTERVAL_MS: float = 5
+    PROFILE_MAX_SECONDS: float = 30
+    PROFILE_MAX_SAMPLES: int = 5000
+    PROFILE_MAX_FILES: int = 20
+
+class SingleFlightSettings(BaseModel):
+    ENABLED: bool = True
+    # Cross-container coalescing of cache misses through a Redis lock.
+    # Writes invalidate published results; a read racing a write may
+    # still see a result up to REDIS_RESULT_TTL_MS old.
+    REDIS_ENABLED: bool = False
+    REDIS_LOCK_TTL_MS: int = 5000
+    REDIS_RESULT_TTL_MS: int = 500
+    REDIS_WAIT_TIMEOUT_MS: int = 2000
+    REDIS_POLL_INTERVAL_MS: int = 10
+
+class IdempotencySettings(BaseModel):
+    ENABLED: bool = True
+    METHODS: list[str] = ["POST", "PUT"]
+    TTL_SECONDS: int = 24 * 60 * 60
+    LOCK_TTL_SECONDS: int = 30
+    WAIT_TIMEOUT_SECONDS: float = 10
+    POLL_INTERVAL_MS: int = 50
+
+class LoadSheddingSettings(BaseModel):
+    ENABLED: bool = True
+    # Only requests under these prefixes reach the databases
+    PATH_PREFIXES: list[str] = ["/v1/"]
+    # Long-lived streams would hold an in-flight slot for their whole life
+    EXCLUDED_PATHS: list[str] = ["/v1/books/changes", "/v1/books/export"]
+    MAX_IN_FLIGHT: int = 16
+    MAX_QUEUE: int = 64
+    MAX_QUEUE_WAIT_MS: int = 1000
+    TARGET_QUEUE_WAIT_MS: int = 100
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_PER_SECOND: float = 20
+    RATE_LIMIT_BURST: int = 40
+
+class TimeoutSettings(BaseModel):
+    POSTGRES_CONNECT_TIMEOUT_SECONDS: int = 5
+    POSTGRES_STATEMENT_TIMEOUT_MS: int = 10000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_SOCKET_TIMEOUT_MS: int = 10000
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 1
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 1
+    # Request deadline: the Lambda remaining time minus a safety margin,
+    # or a budget per path prefix (longest match) under uvicorn.
+    LAMBDA_SAFETY_MARGIN_MS: int = 500
+    REQUEST_BUDGET_MS: int = 30000
+    ROUTE_BUDGETS_MS: dict[str, int] = {}
+    # Streams that page through the database get no request deadline; each
+    # statement is still bounded by POSTGRES_STATEMENT_TIMEOUT_MS
+    DEADLINE_EXEMPT_PATHS: list[str] = ["/v1/books/export"]
+
+class CircuitBreakerSettings(BaseModel):
+    ENABLED: bool = True
+    FAILURE_THRESHOLD: int = 5
+    RECOVERY_TIMEOUT_SECONDS: float = 30
+
+class BookCacheSettings(BaseModel):
+    # In-process cache for single book reads; entries can be stale up to the TTL
+    ENABLED: bool = False
+    TTL_SECONDS: float = 30
+    MAX_ENTRIES: int = 1024
+
+class WarmupSettings(BaseModel):
+    ENABLED: bool = True
+    TIMEOUT_MS: int = 2000
+    # Most recently updated books loaded into the book cache (when enabled)
+    PRELOAD_BOOKS: int = 100
+
+class BookPurgeSettings(BaseModel):
+    # Soft-deleted books older than this are moved to books_archive
+    RETENTION_DAYS: float = 30
+    BATCH_SIZE: int = 500
+    PAUSE_MS: int = 200
+    ARCHIVE: bool = True
+
+class BookStatsSettings(BaseModel):
+    # Rows each book_stats counter is striped over to spread write contention
+    SHARDS: int = 8
+    AUTHORS_LIMIT: int = 100
+    # Per-process cache of the live total sent with unfiltered book lists
+    TOTAL_CACHE_SECONDS: float = 5
+
+class BookCatalogSettings(BaseModel):
+    # In-process read-only copy of the live books, refreshed by an updated_at watermark
+    ENABLED: bool = False
+    MAX_STALENESS_SECONDS: float = 5
+    REFRESH_OVERLAP_SECONDS: float = 5
+    FULL_RELOAD_SECONDS: float = 3600
+    LOAD_BATCH_SIZE: int = 10000
+
+class BookExportSettings(BaseModel):
+    # GET /v1/books/export streams NDJSON, one keyset page per chunk
+    PAGE_SIZE: int = 1000
+
+class BatchJobSettings(BaseModel):
+    # commands.run_batch_job: keyset chunks of public.books over a process pool
+    WORKERS: int = 4
+    CHUNK_SIZE: int = 50000
+    PAGE_SIZE: int = 1000
+    # Per worker; None disables the budget
+    MAX_ROWS_PER_SECOND: float | None = None
+    MAX_REPLICATION_LAG_SECONDS: float | None = 5
+    PROGRESS_INTERVAL_SECONDS: float = 10
+
+class ChangeFeedSettings(BaseModel):
+    # GET /v1/books/changes (SSE): Redis Stream for resume + pub/sub for live fan-out
+    ENABLED: bool = False
+    STREAM: str = "books:changes"
+    CHANNEL: str = "books:changes"
+    # Approximate number of events kept for Last-Event-ID resume
+    STREAM_MAXLEN: int = 10000
+    # Events buffered per connection before it falls back to reading the stream
+    BUFFER_SIZE: int = 100
+    REPLAY_BATCH: int = 100
+    HEARTBEAT_SECONDS: float = 15
+
+class GroupCommitSettings(BaseModel):
+    # Concurrent POST /v1/books are merged into one INSERT ... RETURNING and one commit
+    ENABLED: bool = False
+    WINDOW_MS: float = 2
+    MAX_BATCH: int = 100
+
+class BookCountersSettings(BaseModel):
+    # Write-behind view/download counters: process buffer -> Redis hash -> Postgres.
+    # When disabled, reads skip the Redis lookup of unflushed deltas
+    ENABLED: bool = False
+    REDIS_KEY: str = "books:counters"
+    PUSH_INTERVAL_MS: int = 200
+    MAX_BUFFERED: int = 100000
+    FLUSH_INTERVAL_SECONDS: float = 5
+    # Rows per UPDATE ... FROM (VALUES ...) statement
+    FLUSH_CHUNK_SIZE: int = 1000
+    COUNT_VIEWS_ON_READ: bool = False
+
+class PartitioningSettings(BaseModel):
+    # Declares public.books RANGE-partitioned by month on created_at (new databases only)
+    ENABLED: bool = False
+    PREMAKE_MONTHS: int = 3
+    # Partitions entirely older than this are detached; None keeps them all
+    RETENTION_MONTHS: int | None = None
+    RETIRE_MODE: Literal["archive", "drop"] = "archive"
+    ARCHIVE_SCHEMA: str = "books_partitions_archive"
+    # Window around the UUIDv7 timestamp used as created_at bound in id lookups
+    ID_TIME_SLACK_SECONDS: int = 300
+
+class BackgroundSettings(BaseModel):
+    # "thread": in-process worker threads; "redis": Redis Stream + commands.background_worker
+    MODE: Literal["thread", "redis"] = "thread"
+    WORKERS: int = 2
+    MAX_QUEUE: int = 1000
+    MAX_RETRIES: int = 3
+    RETRY_BACKOFF_MS: int = 100
+    STREAM_NAME: str = "background:tasks"
+    STREAM_GROUP: str = "workers"
+    STREAM_MAXLEN: int = 100000
+    STREAM_CLAIM_IDLE_MS: int = 60000
+    # Write an audit document to MongoDB after each book write
+    AUDIT_ENABLED: bool = False
+
+class MetricsSettings(BaseModel):
+    # Lambda handlers print the metrics of each invocation as EMF log lines
+    EMF_ENABLED: bool = True
+    EMF_NAMESPACE: str = "BooksApi"
+
+class MemorySettings(BaseModel):
+    # RSS + tracemalloc tracking per request; tracemalloc slows allocations down
+    TRACKING_ENABLED: bool = False
+    TRACEMALLOC_FRAMES: int = 1
+    DIFF_EVERY: int = 500
+    TOP_N: int = 10
+    GROWTH_WARNING_MB: float = 64
+
+class LoopMonitorSettings(BaseModel):
+    # Event-loop lag sampling and blocked-callback reports
+    ENABLED: bool = False
+    INTERVAL_MS: int = 50
+    BLOCK_THRESHOLD_MS: int = 100
+    # Raise BlockingCallError when a DB session is opened on the event loop thread
+    STRICT: bool = False
+
+class ServerSettings(BaseModel):
+    # commands.serve (uvicorn outside Lambda)
+    HOST: str = "0.0.0.0"
+    PORT: int = 9000
+    # None: one worker per CPU available to the container
+    WORKERS: int | None = None
+    # "auto" picks uvloop / httptools when installed
+    LOOP: Literal["none", "auto", "asyncio", "uvloop"] = "auto"
+    HTTP: Literal["auto", "h11", "httptools"] = "auto"
+    BACKLOG: int = 2048
+    # Above the load balancer idle timeout (60s on ALB) so it never reuses a closed connection
+    KEEP_ALIVE_SECONDS: int = 65
+    # In-flight requests get this long to finish on SIGTERM
+    GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    # Background tasks get this long to drain before connections are disposed
+    SHUTDOWN_DRAIN_SECONDS: float = 10
+    LIMIT_CONCURRENCY: int | None = None
+    PROXY_HEADERS: bool = True
+    # Only these peers may set X-Forwarded-For; "*" lets any caller spoof its address
+    # (and with it rate limits and idempotency scope). Set it to the load balancer's CIDR.
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+class LambdaSettings(BaseModel):
+    # Use shared.lambda_adapter for HTTP v2 / Function URL events instead of Mangum
+    LIGHTWEIGHT_ADAPTER: bool = False
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -69,3 +285,64 @@ class Settings(BaseSettings):
     MONGO_URL: MongoDsn
     REDIS_URL: RedisDsn
 
+    # Single-flight settings
+    # ----------------------------------------------------------------
+
+    SINGLE_FLIGHT: SingleFlightSettings = SingleFlightSettings()
+
+    # Idempotency settings
+    # ----------------------------------------------------------------
+
+    IDEMPOTENCY: IdempotencySettings = IdempotencySettings()
+
+    # Load shedding settings
+    # ----------------------------------------------------------------
+
+    LOAD_SHEDDING: LoadSheddingSettings = LoadSheddingSettings()
+
+    # Timeouts and circuit breaker settings
+    # ----------------------------------------------------------------
+
+    TIMEOUTS: TimeoutSettings = TimeoutSettings()
+    CIRCUIT_BREAKER: CircuitBreakerSettings = CircuitBreakerSettings()
+
+    # Lambda entry point settings
+    # ----------------------------------------------------------------
+
+    LAMBDA: LambdaSettings = LambdaSettings()
+
+    # Warm-up and in-process cache settings
+    # ----------------------------------------------------------------
+
+    WARMUP: WarmupSettings = WarmupSettings()
+    SERVER: ServerSettings = ServerSettings()
+    BOOK_CACHE: BookCacheSettings = BookCacheSettings()
+    BOOK_PURGE: BookPurgeSettings = BookPurgeSettings()
+    PARTITIONING: PartitioningSettings = PartitioningSettings()
+    BOOK_STATS: BookStatsSettings = BookStatsSettings()
+    BOOK_COUNTERS: BookCountersSettings = BookCountersSettings()
+    GROUP_COMMIT: GroupCommitSettings = GroupCommitSettings()
+    BOOK_CATALOG: BookCatalogSettings = BookCatalogSettings()
+    BOOK_EXPORT: BookExportSettings = BookExportSettings()
+    CHANGE_FEED: ChangeFeedSettings = ChangeFeedSettings()
+    BATCH_JOBS: BatchJobSettings = BatchJobSettings()
+
+    # Background task settings
+    # ----------------------------------------------------------------
+
+    BACKGROUND: BackgroundSettings = BackgroundSettings()
+
+    # Metrics settings
+    # ----------------------------------------------------------------
+
+    METRICS: MetricsSettings = MetricsSettings()
+
+    # Memory tracking settings
+    # ----------------------------------------------------------------
+
+    MEMORY: MemorySettings = MemorySettings()
+
+    # Event loop monitor settings
+    # ----------------------------------------------------------------
+
+    LOOP_MONITOR: LoopMonitorSettings = LoopMonitorSettings()
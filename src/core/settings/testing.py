@@ -1,5 +1,5 @@
 from core.settings.base import Settings
-from core.settings.base import ProjectSettings
+from core.settings.base import LoopMonitorSettings, ProjectSettings
 from pydantic import Field
 
 class TestingSettings(Settings):
@@ -12,4 +12,6 @@ class TestingSettings(Settings):
             AUTHORS="R2"
         ),
         validate_default=True
-    )
\ No newline at end of file
+    )
+    # Fail tests that run sync DB I/O on the event loop
+    LOOP_MONITOR: LoopMonitorSettings = LoopMonitorSettings(STRICT=True)
@@ -0,0 +1,43 @@
+import time
+from collections.abc import Callable
+
+from loguru import logger
+
+from api.v1.books.services import book_counters
+from core.settings import settings
+from db.mongo import MongoDBConnection
+from db.posgresql.connection import engine
+from db.redis import RedisConnection
+from shared.background import background_tasks
+
+
+def _drain_background_tasks() -> None:
+    if not background_tasks.drain(settings.SERVER.SHUTDOWN_DRAIN_SECONDS):
+        logger.warning(f"Background tasks still pending at shutdown: {background_tasks.stats()}")
+
+
+def shut_down() -> dict[str, str]:
+    """
+    Counterpart of warm_up for the uvicorn lifespan: runs once in-flight
+    requests are done, finishes the work queued in process and closes the
+    database clients. Each step fails independently.
+    """
+    steps: dict[str, Callable[[], object]] = {
+        "background": _drain_background_tasks,
+        # Before Redis closes, the buffered increments live only in this process
+        "book_counters": book_counters.push,
+        "postgresql": engine.dispose,
+        "mongodb": MongoDBConnection.close,
+        "redis": RedisConnection.close,
+    }
+    results = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        try:
+            step()
+            results[name] = f"ok ({(time.perf_counter() - started) * 1000:.1f}ms)"
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Shutdown step {name} failed: {exc}")
+            results[name] = f"error: {type(exc).__name__}"
+    logger.info(f"Shutdown finished: {results}")
+    return results
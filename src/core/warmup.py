@@ -0,0 +1,101 @@
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import FastAPI
+from loguru import logger
+from sqlalchemy import text
+
+from api.v1.books.schema import BOOK_FIELDS, BookSchema, get_book_projection_schema
+from api.v1.books.services import BookFieldsService, BookRetrieveService, book_catalog
+from core.settings import settings
+from db.mongo import MongoDBConnection, mongo_operation
+from db.posgresql import get_db_context
+from shared.deadline import reset_deadline, set_deadline
+
+# Sources used by EventBridge schedules and the serverless warm-up plugin
+WARMUP_SOURCES = {"aws.events", "serverless-plugin-warmup"}
+
+
+def is_warmup_event(event: Any) -> bool:
+    """Scheduled keep-alive pings, or any event carrying `"warmup": true`."""
+    if not isinstance(event, dict):
+        return False
+    if event.get("warmup") is True:
+        return True
+    return event.get("source") in WARMUP_SOURCES and event.get("detail-type", "Scheduled Event") == "Scheduled Event"
+
+
+def _ping_postgres() -> None:
+    # The first connection also runs the dialect initialization
+    with get_db_context() as session:
+        session.execute(text("SELECT 1"))
+
+
+def _ping_mongo() -> None:
+    with mongo_operation():
+        MongoDBConnection.get_db().command("ping")
+
+
+def _prime_schemas(app: FastAPI) -> None:
+    app.openapi()
+    BookFieldsService.parse(None)
+    get_book_projection_schema(BOOK_FIELDS)
+    # Exercise validation and JSON serialization once so later calls take the warm path
+    sample = BookSchema.model_validate(
+        {
+            "id": "00000000-0000-0000-0000-000000000000",
+            "title": "warmup",
+            "author": "warmup",
+            "year": 2000,
+            "type": "online",
+        }
+    )
+    sample.model_dump_json()
+
+
+def _build_middleware_stack(app: FastAPI) -> None:
+    # Starlette builds it lazily on the first request otherwise
+    if app.middleware_stack is None:
+        app.middleware_stack = app.build_middleware_stack()
+
+
+def _preload_books() -> None:
+    if settings.BOOK_CACHE.ENABLED and settings.WARMUP.PRELOAD_BOOKS > 0:
+        BookRetrieveService.preload(settings.WARMUP.PRELOAD_BOOKS)
+
+
+def _load_book_catalog() -> None:
+    if settings.BOOK_CATALOG.ENABLED:
+        book_catalog.ensure_fresh(settings.BOOK_CATALOG.MAX_STALENESS_SECONDS)
+
+
+def warm_up(app: FastAPI) -> dict[str, str]:
+    """
+    Opens the database connections and builds the lazily created objects the
+    first request would otherwise pay for. Each step fails independently so a
+    missing dependency never prevents the function from starting.
+    """
+    steps: dict[str, Callable[[], None]] = {
+        "postgresql": _ping_postgres,
+        "mongodb": _ping_mongo,
+        "schemas": lambda: _prime_schemas(app),
+        "middleware": lambda: _build_middleware_stack(app),
+        "book_cache": _preload_books,
+        "book_catalog": _load_book_catalog,
+    }
+    results = {}
+    for name, step in steps.items():
+        # Bounds the database pings through the same path requests use
+        token = set_deadline(settings.WARMUP.TIMEOUT_MS)
+        started = time.perf_counter()
+        try:
+            step()
+            results[name] = f"ok ({(time.perf_counter() - started) * 1000:.1f}ms)"
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(f"Warm-up step {name} failed: {exc}")
+            results[name] = f"error: {type(exc).__name__}"
+        finally:
+            reset_deadline(token)
+    logger.info(f"Warm-up finished: {results}")
+    return results
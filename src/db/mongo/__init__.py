@@ -1,4 +1,4 @@
 from .base import BaseMongoDocument, MongoAbstractRepository
-from .connection import MongoDBConnection
+from .connection import MongoDBConnection, mongo_operation
 
-__all__ = ["MongoDBConnection", "BaseMongoDocument", "MongoAbstractRepository"]
+__all__ = ["MongoDBConnection", "BaseMongoDocument", "MongoAbstractRepository", "mongo_operation"]
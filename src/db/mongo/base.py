@@ -7,7 +7,7 @@ from pydantic import BaseModel, Field, ConfigDict, field_serializer
 
 from shared.utils_dates import get_app_current_time
 
-from .connection import MongoDBConnection
+from .connection import MongoDBConnection, mongo_operation
 
 
 def default_mongodb_id():
@@ -52,4 +52,5 @@ class MongoAbstractRepository(ABC):
     def add(self, data: BaseMongoDocument) -> BaseMongoDocument:
         if not isinstance(data, self.document_model):
             raise TypeError(f"Expected {self.document_model}, got {type(data)}")
-        self.collection.insert_one(data.model_dump(mode="json"))
+        with mongo_operation():
+            self.collection.insert_one(data.model_dump(mode="json"))
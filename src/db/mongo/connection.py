@@ -1,8 +1,23 @@
+from contextlib import contextmanager
+from typing import Any
+
 import certifi
+import pymongo
 from pymongo import MongoClient
+from pymongo.errors import AutoReconnect, ServerSelectionTimeoutError
 
 from core.settings import settings
-from shared.environment import Environment
+from shared.circuit_breaker import CircuitBreaker
+from shared.deadline import check_deadline, remaining_seconds
+from shared.environment import AppEnvironment
+from shared.loop_monitor import ensure_not_on_event_loop
+
+# Only failures to reach the server (NetworkTimeout is an AutoReconnect); slow
+# queries (ExecutionTimeout) and write concern timeouts must not open the circuit.
+mongo_circuit_breaker = CircuitBreaker(
+    name="mongodb",
+    failure_exceptions=(AutoReconnect, ServerSelectionTimeoutError),
+)
 
 
 class MongoDBConnection:
@@ -19,8 +34,7 @@ class MongoDBConnection:
         """
 
         if mongo_url is None:
-            # mongo_url = settings.MONGO_URL.unicode_string()
-            mongo_url = settings.MONGO_URL
+            mongo_url = settings.MONGO_URL.unicode_string()
         if MongoDBConnection._db is None or force_update:
             # Create MongoDB client
             MongoDBConnection._client = MongoDBConnection.get_mongo_client(mongo_url)
@@ -28,6 +42,12 @@ class MongoDBConnection:
             MongoDBConnection._db = MongoDBConnection._client.get_database()
         return MongoDBConnection._db
 
+    @staticmethod
+    def close() -> None:
+        if MongoDBConnection._client is not None:
+            MongoDBConnection._client.close()
+        MongoDBConnection._client = MongoDBConnection._db = None
+
     @staticmethod
     def get_collection(collection_name: str):
         db = MongoDBConnection.get_db()
@@ -35,9 +55,27 @@ class MongoDBConnection:
 
     @staticmethod
     def get_mongo_client(mongo_url: str):
-        if settings.ENVIRONMENT != Environment.LOCAL:
+        timeouts: dict[str, Any] = {
+            "connectTimeoutMS": settings.TIMEOUTS.MONGO_CONNECT_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": settings.TIMEOUTS.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "socketTimeoutMS": settings.TIMEOUTS.MONGO_SOCKET_TIMEOUT_MS,
+        }
+        if settings.ENVIRONMENT != AppEnvironment.LOCAL:
             ca = certifi.where()
-            client = MongoClient(mongo_url, tlsCAFile=ca)
+            client = MongoClient(mongo_url, tlsCAFile=ca, **timeouts)
         else:
-            client = MongoClient(mongo_url)
+            client = MongoClient(mongo_url, **timeouts)
         return client
+
+
+@contextmanager
+def mongo_operation():
+    """
+    Guards MongoDB calls with the circuit breaker and bounds them by the
+    request deadline; pymongo turns the timeout into maxTimeMS.
+    """
+    if settings.LOOP_MONITOR.STRICT:
+        ensure_not_on_event_loop("MongoDB operation")
+    check_deadline()
+    with mongo_circuit_breaker, pymongo.timeout(remaining_seconds()):
+        yield
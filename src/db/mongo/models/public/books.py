@@ -1,3 +1,6 @@
+from pymongo import ReplaceOne
+
+from db.mongo import mongo_operation
 from db.mongo.base import MongoAbstractRepository
 
 from .schemas import (
@@ -9,3 +12,20 @@ class BookMongoRepository(MongoAbstractRepository):
     collection_name = "books"
     document_model = BookDocument
 
+    def ensure_indexes(self) -> None:
+        """Makes the `id` lookups of upsert_many an index hit; a no-op once the index exists."""
+        with mongo_operation():
+            self.collection.create_index("id", unique=True)
+
+    def upsert_many(self, documents: list[BookDocument]) -> int:
+        """Replaces (or inserts) the documents by `id` in one unordered bulk write; returns the upserted count."""
+        if not documents:
+            return 0
+        requests = []
+        for document in documents:
+            data = document.model_dump(mode="json")
+            requests.append(ReplaceOne({"id": data["id"]}, data, upsert=True))
+        with mongo_operation():
+            result = self.collection.bulk_write(requests, ordered=False)
+        upserted: int = result.upserted_count
+        return upserted
@@ -3,8 +3,8 @@ from sqlalchemy import Column, DateTime
 
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declared_attr
-import uuid
 from shared.utils_dates import get_app_current_time
+from shared.uuid7 import uuid7
 
 Base = declarative_base()
 
@@ -12,7 +12,7 @@ Base = declarative_base()
 class BaseModel:
     @declared_attr
     def id(cls):
-        return Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+        return Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
 
     @declared_attr
     def created_at(cls):
@@ -1,23 +1,91 @@
+import time
 from contextlib import contextmanager
+from typing import Any
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Connection, ExceptionContext, create_engine, event
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
 from sqlalchemy.pool import NullPool
 
 from core.settings import settings
+from shared.circuit_breaker import CircuitBreaker
+from shared.deadline import check_deadline, remaining_ms
+from shared.loop_monitor import ensure_not_on_event_loop
+from shared.metrics import db_statement_duration
 
 
 application_name = settings.PROJECT.NAME.replace(" ", "-").lower()
 engine = create_engine(
-    settings.POSTGRESQL_URL.unicode_string(), connect_args={"application_name": application_name}, poolclass=NullPool
+    settings.POSTGRESQL_URL.unicode_string(),
+    connect_args={
+        "application_name": application_name,
+        "connect_timeout": settings.TIMEOUTS.POSTGRES_CONNECT_TIMEOUT_SECONDS,
+        # Naive timestamps (created_at, partition bounds, the catalog) are UTC
+        "options": f"-c statement_timeout={settings.TIMEOUTS.POSTGRES_STATEMENT_TIMEOUT_MS} -c TimeZone=UTC",
+    },
+    poolclass=NullPool,
 )
 SessionLocal = sessionmaker(autocommit=False, bind=engine)
 
 
+def is_connection_failure(exc: BaseException) -> bool:
+    """
+    psycopg2 raises statement timeouts, deadlocks and serialization
+    failures as OperationalError too; only failures to reach or keep the
+    server (no SQLSTATE, class 08, or 57P0x shutdowns) count against it.
+    """
+    if isinstance(exc, PoolTimeoutError) or getattr(exc, "connection_invalidated", False):
+        return True
+    pgcode = getattr(getattr(exc, "orig", None), "pgcode", None)
+    return pgcode is None or pgcode.startswith(("08", "57P0"))
+
+
+postgres_circuit_breaker = CircuitBreaker(
+    name="postgresql",
+    failure_exceptions=(OperationalError, PoolTimeoutError),
+    is_failure=is_connection_failure,
+)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_statement_timer(
+    conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool,  # noqa: FBT001
+) -> None:
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _record_statement_time(
+    conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool,  # noqa: FBT001
+) -> None:
+    started = conn.info["statement_started"].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+    db_statement_duration.observe(time.perf_counter() - started, operation)
+
+
+@event.listens_for(engine, "handle_error")
+def _discard_statement_timer(exception_context: ExceptionContext) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("statement_started"):
+        connection.info["statement_started"].pop()
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _apply_request_deadline(session: Session, transaction: SessionTransaction, connection: Connection) -> None:
+    # Only tighten the connection default when the request has less time left
+    remaining = remaining_ms()
+    if remaining is not None and remaining < settings.TIMEOUTS.POSTGRES_STATEMENT_TIMEOUT_MS:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(int(remaining), 1)}")
+
+
 @contextmanager
 def get_db_context():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    if settings.LOOP_MONITOR.STRICT:
+        ensure_not_on_event_loop("PostgreSQL session")
+    check_deadline()
+    with postgres_circuit_breaker:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
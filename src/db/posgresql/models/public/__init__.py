@@ -1,4 +1,7 @@
-from .books import Book
+from .batch_jobs import BatchJobChunk
+from .book_counters import BookCounterFlush
+from .book_stats import BookStat
+from .books import Book, BookArchive
 from .constants import BookType
 
-__all__ = ["Book", "BookType"]
\ No newline at end of file
+__all__ = ["BatchJobChunk", "Book", "BookArchive", "BookCounterFlush", "BookStat", "BookType"]
@@ -0,0 +1,31 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, PrimaryKeyConstraint, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+
+from db.posgresql.base import Base
+
+
+class BatchJobChunk(Base):
+    """
+    Checkpoint of one keyset range of a batch job run. `last_id` is the
+    last key processed, so an interrupted chunk resumes where it stopped.
+    """
+
+    __tablename__ = "batch_job_chunks"
+    __table_args__ = (
+        PrimaryKeyConstraint("run_id", "chunk"),
+        {"schema": "public"},
+    )
+
+    run_id = Column(String, nullable=False)
+    chunk = Column(Integer, nullable=False)
+    job = Column(String, nullable=False)
+    # [start_id, end_id); NULL means unbounded on that side
+    start_id = Column(UUID(as_uuid=True), nullable=True)
+    end_id = Column(UUID(as_uuid=True), nullable=True)
+    last_id = Column(UUID(as_uuid=True), nullable=True)
+    status = Column(String, nullable=False, default="pending")
+    rows = Column(BigInteger, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,19 @@
+import uuid
+
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+from db.posgresql.base import Base
+from shared.utils_dates import get_app_current_time
+
+
+class BookCounterFlush(Base):
+    """Counter batches already added to books, so a retried flush is not applied twice."""
+
+    __tablename__ = "book_counter_flushes"
+    __table_args__ = {"schema": "public"}
+
+    batch_id = Column(String, primary_key=True)
+    flushed_at = Column(DateTime, nullable=False, default=get_app_current_time)
+    # Books whose counters changed, so readers holding copies can refresh just those
+    book_ids: Column[list[uuid.UUID]] = Column(ARRAY(UUID(as_uuid=True)), nullable=False, server_default="{}")
@@ -0,0 +1,23 @@
+from sqlalchemy import BigInteger, Column, PrimaryKeyConstraint, SmallInteger, String
+
+from db.posgresql.base import Base
+
+
+class BookStat(Base):
+    """
+    Live-book counters per dimension ("total", "type", "year", "author")
+    and value, kept current by the BookRepository write transactions. Each
+    counter is striped over `shard` rows so concurrent writers rarely wait
+    on the same row lock; readers sum the shards.
+    """
+
+    __tablename__ = "book_stats"
+    __table_args__ = (
+        PrimaryKeyConstraint("dimension", "value", "shard"),
+        {"schema": "public"},
+    )
+
+    dimension = Column(String, nullable=False)
+    value = Column(String, nullable=False)
+    shard = Column(SmallInteger, nullable=False)
+    count = Column(BigInteger, nullable=False, default=0)
@@ -1,13 +1,60 @@
-from sqlalchemy import Column, Integer, String, Enum
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, Enum, event, text
 from .constants import BookType
 
+from core.settings import settings
 from db.posgresql.base import Base, BaseModel
+from db.posgresql.partitions import maintain_partitions
+from shared.utils_dates import get_app_current_time
+
+LIVE_BOOKS = text("deleted_at IS NULL")
+PARTITIONED = settings.PARTITIONING.ENABLED
+
 
 class Book(Base, BaseModel):
     __tablename__ = "books"
+    __table_args__ = (
+        # Partial indexes: hot reads only see live rows, the purge only tombstones
+        Index("ix_books_live_updated_at", "updated_at", postgresql_where=LIVE_BOOKS),
+        Index("ix_books_tombstones_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+        {"schema": "public", **({"postgresql_partition_by": "RANGE (created_at)"} if PARTITIONED else {})},
+    )
+
+    if PARTITIONED:
+        # PostgreSQL requires the partition key in the primary key
+        created_at = Column(DateTime, primary_key=True, default=get_app_current_time)
+
+    title: str = Column(String, nullable=False)
+    author: str = Column(String, nullable=False)
+    year: int = Column(Integer, nullable=False)
+    type: BookType = Column(Enum(BookType), nullable=False)
+    # Write-behind counters, flushed from Redis in batches (see BookCountersService)
+    view_count: int = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    download_count: int = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+
+
+@event.listens_for(Book.__table__, "after_create")
+def _create_initial_partitions(table, connection, **kwargs) -> None:
+    if PARTITIONED:
+        maintain_partitions(
+            connection,
+            today=get_app_current_time().date(),
+            premake_months=settings.PARTITIONING.PREMAKE_MONTHS,
+            retention_months=None,
+            retire_mode=settings.PARTITIONING.RETIRE_MODE,
+            archive_schema=settings.PARTITIONING.ARCHIVE_SCHEMA,
+        )
+
+
+class BookArchive(Base, BaseModel):
+    """Soft-deleted books moved out of `books` by the purge command."""
+
+    __tablename__ = "books_archive"
     __table_args__ = {"schema": "public"}
 
     title: str = Column(String, nullable=False)
     author: str = Column(String, nullable=False)
     year: int = Column(Integer, nullable=False)
-    type: BookType = Column(Enum(BookType), nullable=False)
\ No newline at end of file
+    type: BookType = Column(Enum(BookType), nullable=False)
+    view_count: int = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    download_count: int = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    archived_at = Column(DateTime, nullable=False)
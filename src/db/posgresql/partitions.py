@@ -0,0 +1,132 @@
+import datetime
+import re
+from dataclasses import dataclass
+
+from loguru import logger
+from sqlalchemy import Connection, text
+
+PARENT_TABLE = "public.books"
+
+
+@dataclass(frozen=True)
+class MonthPartition:
+    parent: str
+    start: datetime.date
+
+    @property
+    def schema(self) -> str:
+        return self.parent.split(".")[0]
+
+    @property
+    def name(self) -> str:
+        return f"{self.parent.split('.')[1]}_p{self.start.year:04d}_{self.start.month:02d}"
+
+    @property
+    def end(self) -> datetime.date:
+        return add_months(self.start, 1)
+
+
+def month_start(value: datetime.date) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(value: datetime.date, months: int) -> datetime.date:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def is_partitioned(connection: Connection, parent: str = PARENT_TABLE) -> bool:
+    return bool(
+        connection.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": parent},
+        ).scalar()
+    )
+
+
+def list_partitions(connection: Connection, parent: str = PARENT_TABLE) -> list[MonthPartition]:
+    """Monthly partitions of `parent` (the default partition is not included)."""
+    names = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": parent},
+    ).scalars()
+    pattern = re.compile(rf"^{re.escape(parent.split('.')[1])}_p(\d{{4}})_(\d{{2}})$")
+    partitions = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            partitions.append(MonthPartition(parent, datetime.date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def create_partitions(
+    connection: Connection, first_month: datetime.date, months: int, parent: str = PARENT_TABLE
+) -> list[str]:
+    """Creates the missing monthly partitions from `first_month`; returns their names."""
+    existing = {partition.name for partition in list_partitions(connection, parent)}
+    created = []
+    for offset in range(months):
+        partition = MonthPartition(parent, add_months(month_start(first_month), offset))
+        if partition.name in existing:
+            continue
+        connection.execute(
+            text(
+                f"CREATE TABLE {partition.schema}.{partition.name} PARTITION OF {parent} "
+                f"FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+            )
+        )
+        created.append(partition.name)
+    return created
+
+
+def create_default_partition(connection: Connection, parent: str = PARENT_TABLE) -> None:
+    # Catches rows outside the premade months so inserts never fail
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {parent}_default PARTITION OF {parent} DEFAULT"))
+
+
+def retire_partitions(
+    connection: Connection, before: datetime.date, mode: str, archive_schema: str, parent: str = PARENT_TABLE
+) -> list[str]:
+    """
+    Detaches the partitions ending on or before `before`. In "archive" mode
+    they are moved to `archive_schema` as plain tables, in "drop" mode
+    they are dropped.
+    """
+    retired = []
+    for partition in list_partitions(connection, parent):
+        if partition.end > before:
+            continue
+        qualified = f"{partition.schema}.{partition.name}"
+        connection.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {qualified}"))
+        if mode == "drop":
+            connection.execute(text(f"DROP TABLE {qualified}"))
+        else:
+            connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+            connection.execute(text(f'ALTER TABLE {qualified} SET SCHEMA "{archive_schema}"'))
+        logger.info(f"Retired partition {qualified} ({mode})")
+        retired.append(partition.name)
+    return retired
+
+
+def maintain_partitions(
+    connection: Connection,
+    today: datetime.date,
+    premake_months: int,
+    retention_months: int | None,
+    retire_mode: str,
+    archive_schema: str,
+    parent: str = PARENT_TABLE,
+) -> dict[str, list[str]]:
+    """Ensures the current and next `premake_months` partitions exist and retires expired ones."""
+    create_default_partition(connection, parent)
+    created = create_partitions(connection, today, premake_months + 1, parent)
+    retired = []
+    if retention_months is not None:
+        retired = retire_partitions(
+            connection, add_months(month_start(today), -retention_months), retire_mode, archive_schema, parent
+        )
+    return {"created": created, "retired": retired}
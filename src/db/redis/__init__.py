@@ -0,0 +1,3 @@
+from .connection import RedisConnection, RedisCircuitOpenError, redis_circuit_breaker
+
+__all__ = ["RedisConnection", "RedisCircuitOpenError", "redis_circuit_breaker"]
@@ -0,0 +1,84 @@
+from typing import Any
+
+from redis import Redis
+from redis.client import Pipeline
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+from core.settings import settings
+from shared.circuit_breaker import CircuitBreaker
+
+
+class RedisCircuitOpenError(RedisConnectionError):
+    """Raised while the breaker is open; callers already treat RedisError as fail-open."""
+
+
+redis_circuit_breaker = CircuitBreaker(
+    name="redis",
+    failure_exceptions=(RedisConnectionError, RedisTimeoutError),
+    open_exception=lambda name: RedisCircuitOpenError(f"{name} is unavailable, failing fast"),
+)
+
+
+class GuardedPipeline(Pipeline):
+    def execute(self, raise_on_error: bool = True) -> list[Any]:  # noqa: FBT001, FBT002
+        with redis_circuit_breaker:
+            return super().execute(raise_on_error)
+
+
+class GuardedRedis(Redis):
+    """Redis client whose commands and pipelines go through the circuit breaker."""
+
+    def execute_command(self, *args: Any, **options: Any) -> Any:
+        with redis_circuit_breaker:
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:  # noqa: FBT001, FBT002
+        return GuardedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class RedisConnection:
+    _client: Redis | None = None
+    _blocking_client: Redis | None = None
+
+    @staticmethod
+    def get_client(redis_url: str | None = None, force_update: bool = False) -> Redis:  # noqa: FBT001, FBT002
+        """
+        Returns the single instance of the Redis client.
+        Parameters:
+          - redis_url: Connection URL, defaults to settings.REDIS_URL.
+          - force_update: If True, forces the creation of a new client.
+        """
+        if redis_url is None:
+            redis_url = settings.REDIS_URL.unicode_string()
+        if RedisConnection._client is None or force_update:
+            RedisConnection._client = GuardedRedis.from_url(
+                redis_url,
+                decode_responses=True,
+                socket_connect_timeout=settings.TIMEOUTS.REDIS_CONNECT_TIMEOUT_SECONDS,
+                socket_timeout=settings.TIMEOUTS.REDIS_SOCKET_TIMEOUT_SECONDS,
+            )
+        return RedisConnection._client
+
+    @staticmethod
+    def get_blocking_client() -> Redis:
+        """
+        Separate client for long blocking reads (pub/sub listeners): no
+        socket timeout and no circuit breaker, so an idle wait is neither an
+        error nor a failure, and it never holds a connection of `get_client`.
+        """
+        if RedisConnection._blocking_client is None:
+            RedisConnection._blocking_client = Redis.from_url(
+                settings.REDIS_URL.unicode_string(),
+                decode_responses=True,
+                socket_connect_timeout=settings.TIMEOUTS.REDIS_CONNECT_TIMEOUT_SECONDS,
+                socket_keepalive=True,
+                health_check_interval=30,
+            )
+        return RedisConnection._blocking_client
+
+    @staticmethod
+    def close() -> None:
+        for client in (RedisConnection._client, RedisConnection._blocking_client):
+            if client is not None:
+                client.close()
+        RedisConnection._client = RedisConnection._blocking_client = None
@@ -1,32 +1,73 @@
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from core.settings import settings
+from core.shutdown import shut_down
+from core.warmup import is_warmup_event, warm_up
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from mangum import Mangum
 from fastapi.openapi.utils import get_openapi
 import os
+from loguru import logger
 from api.routers import api_v1_router
 from api.endpoints import index_router
+from api.v1.books.consumers import handle_book_writes_batch
+from api.v1.books.services import BookCountersService, book_counters
 from typing import Any
 from core.settings import settings
 from shared.middlewares import (
+    CallerMiddleware,
     CatcherExceptions,
-    CatcherExceptionsPydantic
+    CatcherExceptionsPydantic,
+    DeadlineMiddleware,
+    IdempotencyMiddleware,
+    LoadSheddingMiddleware,
+    LoopMonitorMiddleware,
+    MemoryMiddleware,
+    MetricsMiddleware,
+    ProfilerMiddleware,
+    profiling_enabled,
 )
 from fastapi.middleware import Middleware
+from shared.background import background_tasks
+from shared.lambda_adapter import LambdaAdapter
+from shared.metrics import metrics
+from shared.openapi import ROUTE_TABLE_KEY, OpenAPIDocument, create_docs_router, route_table_hash
+from shared.path import OPENAPI_SCHEMA_PATH
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # uvicorn startup; under Lambda the same work runs at import (see below)
+    if settings.WARMUP.ENABLED:
+        await run_in_threadpool(warm_up, app)
+    yield
+    # uvicorn shutdown (SIGTERM), after the in-flight requests finished
+    await run_in_threadpool(shut_down)
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT.NAME,
     version=settings.PROJECT.VERSION,
     description=settings.PROJECT.DESCRIPTION,
     root_path=settings.ROOT_PATH,
+    # Served by create_docs_router from pre-encoded bytes
+    openapi_url=None,
     middleware=[
-        Middleware(CatcherExceptions)
+        *([Middleware(ProfilerMiddleware)] if profiling_enabled() else []),
+        *([Middleware(MemoryMiddleware)] if settings.MEMORY.TRACKING_ENABLED else []),
+        *([Middleware(LoopMonitorMiddleware)] if settings.LOOP_MONITOR.ENABLED else []),
+        Middleware(MetricsMiddleware),
+        Middleware(DeadlineMiddleware),
+        Middleware(CallerMiddleware),
+        Middleware(LoadSheddingMiddleware),
+        Middleware(IdempotencyMiddleware),
+        Middleware(CatcherExceptions),
     ]
 )
 
 
-def custom_openapi() -> dict[str, Any]:
-    if app.openapi_schema:
-        return app.openapi_schema
+def generate_openapi() -> dict[str, Any]:
     openapi_schema = get_openapi(
         title=app.title,
         version=app.version,
@@ -35,11 +76,95 @@ def custom_openapi() -> dict[str, Any]:
     )
     openapi_schema["openapi"] = "3.0.3"
     openapi_schema["servers"] = [{"url": settings.ROOT_PATH}]
-    app.openapi_schema = openapi_schema
+    openapi_schema[ROUTE_TABLE_KEY] = route_table_hash(app.routes)
+    return openapi_schema
+
+
+openapi_document: OpenAPIDocument | None = None
+
+
+def get_openapi_document() -> OpenAPIDocument:
+    """
+    Prefers the file written at build time by `commands.build_openapi` and
+    only walks the routes when it is missing or stale.
+    """
+    global openapi_document
+    if openapi_document is None:
+        info = {"title": app.title, "version": app.version}
+        if app.description:
+            info["description"] = app.description
+        expected = {
+            "info": info,
+            "servers": [{"url": settings.ROOT_PATH}],
+            ROUTE_TABLE_KEY: route_table_hash(app.routes),
+        }
+        openapi_document = OpenAPIDocument.from_file(OPENAPI_SCHEMA_PATH, expected)
+        if openapi_document is None:
+            openapi_document = OpenAPIDocument.from_schema(generate_openapi())
+    return openapi_document
+
+
+def custom_openapi() -> dict[str, Any]:
+    if not app.openapi_schema:
+        app.openapi_schema = get_openapi_document().schema
     return app.openapi_schema
 
 app.openapi = custom_openapi # type: ignore
 app.include_router(api_v1_router)
 app.include_router(index_router)
+app.include_router(create_docs_router(app.title, get_openapi_document))
 CatcherExceptionsPydantic(app)
-handler = Mangum(app)
+
+# Lifespan would otherwise run on every invocation; init happens once below
+mangum_handler = Mangum(app, lifespan="off")
+adapter = LambdaAdapter(app, fallback=mangum_handler)
+http_handler: Callable[..., dict[str, Any]] = mangum_handler
+if settings.LAMBDA.LIGHTWEIGHT_ADAPTER:
+    http_handler = adapter
+
+
+def drain_background_tasks(context: Any) -> None:
+    # The execution environment is frozen once the handler returns
+    remaining_ms = 5000
+    if hasattr(context, "get_remaining_time_in_millis"):
+        remaining_ms = context.get_remaining_time_in_millis() - settings.TIMEOUTS.LAMBDA_SAFETY_MARGIN_MS
+    if not background_tasks.drain(max(remaining_ms, 0) / 1000):
+        logger.warning(f"Background tasks still pending at the end of the invocation: {background_tasks.stats()}")
+
+
+def finish_invocation(context: Any) -> None:
+    drain_background_tasks(context)
+    # The pusher thread is frozen between invocations
+    book_counters.push()
+    if settings.METRICS.EMF_ENABLED:
+        metrics.emit_emf(settings.METRICS.EMF_NAMESPACE)
+
+
+def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    if is_warmup_event(event):
+        return {"warmup": True, "steps": warm_up(app)}
+    try:
+        return http_handler(event, context)
+    finally:
+        finish_invocation(context)
+
+
+def sqs_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """Entry point for the book writes queue (CMD ["main.sqs_handler"])."""
+    try:
+        return handle_book_writes_batch(event, context)
+    finally:
+        finish_invocation(context)
+
+
+# Eager init during the Lambda init phase, before the first invocation
+if settings.WARMUP.ENABLED and "AWS_LAMBDA_FUNCTION_NAME" in os.environ:
+    warm_up(app)
+
+
+def counters_flush_handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """Scheduled entry point that folds the Redis counters into Postgres (CMD ["main.counters_flush_handler"])."""
+    try:
+        return {"flushed_books": BookCountersService.flush()}
+    finally:
+        finish_invocation(context)
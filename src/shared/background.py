@@ -0,0 +1,248 @@
+import json
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+from redis import Redis
+from redis.exceptions import RedisError, ResponseError
+
+from core.settings import settings
+from db.redis import RedisConnection
+from shared.metrics import background_task_overflow
+
+TaskFunction = Callable[..., None]
+
+_registry: dict[str, TaskFunction] = {}
+
+
+def background_task(name: str) -> Callable[[TaskFunction], TaskFunction]:
+    """
+    Registers a function as a background task. Tasks are referenced by name
+    and receive JSON-serializable keyword arguments, so they can also travel
+    through the Redis Stream to the worker process.
+    """
+    def decorator(fn: TaskFunction) -> TaskFunction:
+        _registry[name] = fn
+        fn.background_task_name = name  # type: ignore[attr-defined]
+        return fn
+    return decorator
+
+
+@dataclass
+class Task:
+    name: str
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+
+    def run(self) -> None:
+        self.attempts += 1
+        _registry[self.name](**self.kwargs)
+
+
+class RedisTaskStream:
+    """
+    Redis Stream transport: producers XADD, workers read through a consumer
+    group and XACK. Failed tasks are re-added with one more attempt until
+    `max_retries`, then moved to the dead-letter stream.
+    """
+
+    def __init__(self, stream: str, group: str, maxlen: int, max_retries: int) -> None:
+        self.stream = stream
+        self.dead_stream = f"{stream}:dead"
+        self.group = group
+        self.maxlen = maxlen
+        self.max_retries = max_retries
+
+    def add(self, task: Task, client: Redis | None = None) -> None:
+        client = client or RedisConnection.get_client()
+        fields = {"name": task.name, "kwargs": json.dumps(task.kwargs), "attempts": task.attempts}
+        client.xadd(self.stream, fields, maxlen=self.maxlen, approximate=True)
+
+    def dead_letter(self, task: Task, client: Redis | None = None) -> None:
+        client = client or RedisConnection.get_client()
+        fields = {"name": task.name, "kwargs": json.dumps(task.kwargs), "attempts": task.attempts}
+        client.xadd(self.dead_stream, fields, maxlen=self.maxlen, approximate=True)
+
+    def ensure_group(self, client: Redis) -> None:
+        try:
+            client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def consume(self, client: Redis, consumer: str, count: int = 10, block_ms: int = 1000, claim_idle_ms: int = 60000) -> int:
+        """Processes one batch (reclaimed stale entries first); returns how many were handled."""
+        claimed = client.xautoclaim(self.stream, self.group, consumer, claim_idle_ms, "0-0", count=count)[1]
+        entries = [entry for entry in claimed if entry[1]]
+        if not entries:
+            response = client.xreadgroup(self.group, consumer, {self.stream: ">"}, count=count, block=block_ms)
+            entries = response[0][1] if response else []
+
+        for entry_id, fields in entries:
+            task = Task(fields["name"], json.loads(fields["kwargs"]), int(fields["attempts"]))
+            try:
+                task.run()
+                background_tasks.count("completed")
+            except Exception:  # noqa: BLE001
+                logger.exception(f"Background task {task.name} failed (attempt {task.attempts})")
+                if task.attempts <= self.max_retries:
+                    background_tasks.count("retried")
+                    self.add(task, client)
+                else:
+                    background_tasks.count("failed")
+                    self.dead_letter(task, client)
+            client.xack(self.stream, self.group, entry_id)
+        return len(entries)
+
+
+class BackgroundTaskQueue:
+    """
+    Runs registered tasks after the caller moves on. In "thread" mode tasks
+    go to a bounded in-process queue served by worker threads; when the queue
+    is full the task goes to the dead-letter stream for replay (or is dropped
+    if Redis is down too) rather than blocking the caller. In "redis" mode
+    they are pushed to a Redis Stream for `commands.background_worker`,
+    falling back to the in-process queue if Redis is unavailable.
+    Under Lambda call `drain` before returning, the environment is frozen
+    between invocations.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        workers: int,
+        max_queue: int,
+        max_retries: int,
+        retry_backoff_ms: int,
+        stream: RedisTaskStream | None = None,
+    ) -> None:
+        self.mode = mode
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff_ms = retry_backoff_ms
+        self.stream = stream
+        self._queue: queue.Queue[Task] = queue.Queue(maxsize=max_queue)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._counters = {
+            "enqueued": 0,
+            "streamed": 0,
+            "overflow_dead_lettered": 0,
+            "overflow_dropped": 0,
+            "completed": 0,
+            "retried": 0,
+            "failed": 0,
+        }
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def enqueue(self, task_fn: str | TaskFunction, **kwargs: Any) -> None:
+        name = task_fn if isinstance(task_fn, str) else getattr(task_fn, "background_task_name", "")
+        if name not in _registry:
+            raise KeyError(f"Unknown background task {name}")
+        task = Task(name, kwargs)
+
+        if self.mode == "redis" and self.stream is not None:
+            try:
+                self.stream.add(task)
+                self.count("streamed")
+                return
+            except RedisError as exc:
+                logger.warning(f"Redis stream unavailable, running {name} in-process: {exc}")
+
+        self._start_workers()
+        try:
+            self._queue.put_nowait(task)
+            self.count("enqueued")
+        except queue.Full:
+            self._overflow(task)
+
+    def drain(self, timeout_seconds: float) -> bool:
+        """Waits until every queued task finished; False on timeout."""
+        deadline = time.monotonic() + timeout_seconds
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stats(self) -> dict[str, int | str]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "mode": self.mode,
+            "queue_depth": self._queue.qsize(),
+            "unfinished": self._queue.unfinished_tasks,
+            "workers": len(self._threads),
+            **counters,
+        }
+
+    def _start_workers(self) -> None:
+        if len(self._threads) >= self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work, name=f"background-{len(self._threads)}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            task = self._queue.get()
+            try:
+                self._execute(task)
+            finally:
+                self._queue.task_done()
+
+    def _overflow(self, task: Task) -> None:
+        if self.stream is not None:
+            try:
+                self.stream.dead_letter(task)
+                logger.warning(f"Background queue full, {task.name} sent to {self.stream.dead_stream}")
+                self.count("overflow_dead_lettered")
+                background_task_overflow.inc("dead_lettered")
+                return
+            except RedisError as exc:
+                logger.warning(f"Dead-letter stream unavailable: {exc}")
+        logger.error(f"Background queue full, dropped {task.name} with {task.kwargs}")
+        self.count("overflow_dropped")
+        background_task_overflow.inc("dropped")
+
+    def _execute(self, task: Task) -> None:
+        while True:
+            try:
+                task.run()
+                self.count("completed")
+                return
+            except Exception:  # noqa: BLE001
+                if task.attempts > self.max_retries:
+                    logger.exception(f"Background task {task.name} failed after {task.attempts} attempts")
+                    self.count("failed")
+                    return
+                self.count("retried")
+                time.sleep(self.retry_backoff_ms * 2 ** (task.attempts - 1) / 1000)
+
+
+background_tasks = BackgroundTaskQueue(
+    mode=settings.BACKGROUND.MODE,
+    workers=settings.BACKGROUND.WORKERS,
+    max_queue=settings.BACKGROUND.MAX_QUEUE,
+    max_retries=settings.BACKGROUND.MAX_RETRIES,
+    retry_backoff_ms=settings.BACKGROUND.RETRY_BACKOFF_MS,
+    stream=RedisTaskStream(
+        stream=settings.BACKGROUND.STREAM_NAME,
+        group=settings.BACKGROUND.STREAM_GROUP,
+        maxlen=settings.BACKGROUND.STREAM_MAXLEN,
+        max_retries=settings.BACKGROUND.MAX_RETRIES,
+    ),
+)
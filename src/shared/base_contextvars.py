@@ -1,4 +1,6 @@
 from contextvars import ContextVar
 
 ctx_trace_id = ContextVar("ctx_trace_id", default=None)
-ctx_caller_id = ContextVar("ctx_caller_id", default=None)
\ No newline at end of file
+ctx_caller_id: ContextVar[str | None] = ContextVar("ctx_caller_id", default=None)
+# time.monotonic() value the current request must finish by
+ctx_deadline: ContextVar[float | None] = ContextVar("ctx_deadline", default=None)
\ No newline at end of file
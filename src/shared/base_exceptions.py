@@ -21,3 +21,12 @@ class BaseApiRestException(Exception):
     def __str__(self):
         return f"[{self.status_code_http}] {self.error_code.description}: {self.message}"
 
+
+class DependencyUnavailableException(BaseApiRestException):
+    GENERAL_STATUS_CODE_HTTP = fastapi.status.HTTP_503_SERVICE_UNAVAILABLE
+    GENERAL_ERROR_CODE = CommonInternalCode.DEPENDENCY_UNAVAILABLE
+
+
+class DeadlineExceededException(BaseApiRestException):
+    GENERAL_STATUS_CODE_HTTP = fastapi.status.HTTP_504_GATEWAY_TIMEOUT
+    GENERAL_ERROR_CODE = CommonInternalCode.DEADLINE_EXCEEDED
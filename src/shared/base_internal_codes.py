@@ -28,3 +28,9 @@ class InternalCodeBase(IntEnum):
 class CommonInternalCode(InternalCodeBase):
     UNKNOWN                       = 100,  "Unknown error"
     PYDANTIC_VALIDATIONS_REQUEST  = 8001, "Failed Pydantic validations on request"
+    IDEMPOTENCY_KEY_IN_PROGRESS   = 8002, "A request with this Idempotency-Key is still in progress"
+    IDEMPOTENCY_KEY_REUSED        = 8003, "Idempotency-Key was already used with a different request"
+    SERVICE_OVERLOADED            = 8004, "Service overloaded, retry later"
+    RATE_LIMITED                  = 8005, "Too many requests for this caller"
+    DEPENDENCY_UNAVAILABLE        = 8006, "A backing service is unavailable"
+    DEADLINE_EXCEEDED             = 8007, "Request deadline exceeded"
@@ -6,6 +6,7 @@ import fastapi
 import json
 from shared.base_internal_codes import InternalCode
 from shared.base_internal_codes import CommonInternalCode as CC
+from shared.metrics import api_errors
 
 T = TypeVar("T", bound=InternalCode)
 
@@ -52,6 +53,7 @@ def create_response_for_fast_api(
         data = json.loads(data)
 
     if not success:
+        api_errors.inc(str(error_code.value), str(status_code_http))
         data = ErrorDetailResponse.from_error_code(error_code=error_code, details=data)
 
     envelope_response = EnvelopeResponse(
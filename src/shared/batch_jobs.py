@@ -0,0 +1,274 @@
+import importlib
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import Table, delete, func, select, text, update
+from sqlalchemy.orm import Session
+
+from db.mongo import MongoDBConnection
+from db.posgresql import get_db_context
+from db.posgresql.connection import engine
+from db.posgresql.models.public import BatchJobChunk
+from shared.utils_dates import get_app_current_time
+
+ChunkFunction = Callable[[Session, list[dict[str, Any]]], None]
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    name: str
+    table: Table
+    columns: tuple[str, ...]
+    fn: ChunkFunction
+    # Runs once per worker process, before its first page (indexes, clients)
+    setup: Callable[[], None] | None = None
+
+    @property
+    def key(self) -> Any:
+        return self.table.c.id
+
+
+_registry: dict[str, BatchJob] = {}
+# Jobs whose setup already ran in this process
+_set_up: set[str] = set()
+
+
+def batch_job(
+    name: str, table: Table, columns: tuple[str, ...], setup: Callable[[], None] | None = None,
+) -> Callable[[ChunkFunction], ChunkFunction]:
+    """
+    Registers a function as a batch job over `table`, walked in id order.
+    It is called with a session and each page of rows (`columns` plus id);
+    the page's checkpoint is committed in that same session, so database
+    side effects are applied exactly once, other side effects (Mongo,
+    Redis) must be idempotent. `setup` runs once per worker process.
+    """
+    def decorator(fn: ChunkFunction) -> ChunkFunction:
+        _registry[name] = BatchJob(name, table, tuple(dict.fromkeys(("id", *columns))), fn, setup)
+        return fn
+    return decorator
+
+
+def get_batch_job(name: str) -> BatchJob:
+    return _registry[name]
+
+
+def registered_batch_jobs() -> list[str]:
+    return sorted(_registry)
+
+
+@dataclass(frozen=True)
+class Throttle:
+    """Per-worker pacing: a rows/second budget and a pause while replicas lag behind."""
+
+    max_rows_per_second: float | None = None
+    max_replication_lag_seconds: float | None = None
+    lag_check_pause_seconds: float = 1
+
+    def wait(self, rows: int, elapsed: float) -> None:
+        if self.max_rows_per_second:
+            time.sleep(max(rows / self.max_rows_per_second - elapsed, 0))
+        while self.max_replication_lag_seconds is not None:
+            lag = replication_lag_seconds()
+            if lag <= self.max_replication_lag_seconds:
+                return
+            logger.info(f"Replication lag {lag:.1f}s, pausing")
+            time.sleep(self.lag_check_pause_seconds)
+
+
+def replication_lag_seconds() -> float:
+    """Worst replay lag among the primary's replicas, 0 without replicas."""
+    with get_db_context() as session:
+        return float(
+            session.execute(
+                text("SELECT COALESCE(EXTRACT(EPOCH FROM max(replay_lag)), 0) FROM pg_stat_replication")
+            ).scalar()
+        )
+
+
+def _init_worker(modules: tuple[str, ...]) -> None:
+    # Connections inherited from the parent must not be shared; each worker gets its own pool
+    engine.dispose(close=False)
+    # Not close(): the parent's client must stay usable
+    MongoDBConnection._client = MongoDBConnection._db = None
+    # Registers the jobs when the pool does not fork (spawn / forkserver)
+    for module in modules:
+        importlib.import_module(module)
+
+
+def _set_chunk(session: Session, run_id: str, chunk: int, **values: Any) -> None:
+    session.execute(
+        update(BatchJobChunk)
+        .where(BatchJobChunk.run_id == run_id, BatchJobChunk.chunk == chunk)
+        .values(**values)
+    )
+
+
+def run_chunk(job_name: str, run_id: str, chunk: int, page_size: int, throttle: Throttle) -> int:
+    """Processes one chunk from its checkpoint; returns the rows processed by this call."""
+    job = get_batch_job(job_name)
+    if job.setup is not None and job_name not in _set_up:
+        job.setup()
+        _set_up.add(job_name)
+    key = job.key
+    columns = [job.table.c[name] for name in job.columns]
+    with get_db_context() as session:
+        checkpoint = session.get(BatchJobChunk, (run_id, chunk))
+        start_id, end_id, last_id = checkpoint.start_id, checkpoint.end_id, checkpoint.last_id
+        _set_chunk(
+            session, run_id, chunk,
+            status=RUNNING, attempts=BatchJobChunk.attempts + 1, started_at=get_app_current_time(), error=None,
+        )
+        session.commit()
+
+    processed = 0
+    try:
+        while True:
+            started = time.monotonic()
+            with get_db_context() as session:
+                query = select(*columns).order_by(key).limit(page_size)
+                if last_id is not None:
+                    query = query.where(key > last_id)
+                elif start_id is not None:
+                    query = query.where(key >= start_id)
+                if end_id is not None:
+                    query = query.where(key < end_id)
+                rows = [dict(row) for row in session.execute(query).mappings()]
+                if not rows:
+                    break
+                job.fn(session, rows)
+                last_id = rows[-1]["id"]
+                _set_chunk(session, run_id, chunk, last_id=last_id, rows=BatchJobChunk.rows + len(rows))
+                session.commit()
+            processed += len(rows)
+            throttle.wait(len(rows), time.monotonic() - started)
+    except Exception as exc:
+        with get_db_context() as session:
+            _set_chunk(session, run_id, chunk, status=FAILED, error=f"{type(exc).__name__}: {exc}")
+            session.commit()
+        raise
+
+    with get_db_context() as session:
+        _set_chunk(session, run_id, chunk, status=DONE, finished_at=get_app_current_time())
+        session.commit()
+    return processed
+
+
+class BatchJobRunner:
+    """
+    Splits the job's table into keyset id ranges of about `chunk_size`
+    rows, checkpoints them in public.batch_job_chunks under `run_id` and
+    processes them on a pool of `workers` processes. Running the same
+    `run_id` again resumes: finished chunks are skipped and interrupted
+    ones continue from their last id.
+    """
+
+    def __init__(
+        self,
+        job: BatchJob,
+        run_id: str,
+        chunk_size: int,
+        page_size: int,
+        workers: int,
+        throttle: Throttle,
+        progress_interval_seconds: float = 10,
+    ) -> None:
+        self.job = job
+        self.run_id = run_id
+        self.chunk_size = chunk_size
+        self.page_size = page_size
+        self.workers = workers
+        self.throttle = throttle
+        self.progress_interval = progress_interval_seconds
+
+    def plan(self) -> int:
+        """Creates the chunk checkpoints on the first run; returns the number of chunks."""
+        with get_db_context() as session:
+            existing: int = session.scalar(
+                select(func.count()).select_from(BatchJobChunk).where(BatchJobChunk.run_id == self.run_id)
+            )
+            if existing:
+                return existing
+            session.execute(text("SET LOCAL statement_timeout = 0"))
+            key = self.job.key
+            numbered = select(key.label("id"), func.row_number().over(order_by=key).label("n")).subquery()
+            starts = session.scalars(
+                select(numbered.c.id).where((numbered.c.n - 1) % self.chunk_size == 0).order_by(numbered.c.id)
+            ).all()
+            # Open-ended first and last ranges also cover rows written while the job runs
+            bounds = [None, *starts[1:], None]
+            session.add_all(
+                BatchJobChunk(
+                    run_id=self.run_id, chunk=number, job=self.job.name,
+                    start_id=start, end_id=end, status=PENDING, rows=0, attempts=0,
+                )
+                for number, (start, end) in enumerate(zip(bounds, bounds[1:]))
+            )
+            session.commit()
+            return len(bounds) - 1
+
+    def reset(self) -> None:
+        with get_db_context() as session:
+            session.execute(delete(BatchJobChunk).where(BatchJobChunk.run_id == self.run_id))
+            session.commit()
+
+    def progress(self) -> dict[str, Any]:
+        with get_db_context() as session:
+            rows = session.execute(
+                select(BatchJobChunk.status, func.count(), func.sum(BatchJobChunk.rows))
+                .where(BatchJobChunk.run_id == self.run_id)
+                .group_by(BatchJobChunk.status)
+            ).all()
+        chunks = {status: count for status, count, _ in rows}
+        return {
+            "chunks": sum(chunks.values()),
+            **{status: chunks.get(status, 0) for status in (PENDING, RUNNING, DONE, FAILED)},
+            "rows": int(sum(total or 0 for _, _, total in rows)),
+        }
+
+    def run(self) -> dict[str, Any]:
+        total = self.plan()
+        with get_db_context() as session:
+            todo = session.scalars(
+                select(BatchJobChunk.chunk)
+                .where(BatchJobChunk.run_id == self.run_id, BatchJobChunk.status != DONE)
+                .order_by(BatchJobChunk.chunk)
+            ).all()
+        logger.info(f"Batch job {self.job.name} ({self.run_id}): {len(todo)} of {total} chunks to process")
+
+        started = time.monotonic()
+        rows_before = self.progress()["rows"]
+        modules = (self.job.fn.__module__,)
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(modules,)) as pool:
+            futures: dict[Future[int], int] = {
+                pool.submit(run_chunk, self.job.name, self.run_id, chunk, self.page_size, self.throttle): chunk
+                for chunk in todo
+            }
+            pending = set(futures)
+            last_report = started
+            while pending:
+                finished, pending = wait(pending, timeout=self.progress_interval, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future.exception() is not None:
+                        logger.error(f"Chunk {futures[future]} failed: {future.exception()}")
+                if time.monotonic() - last_report >= self.progress_interval or not pending:
+                    last_report = time.monotonic()
+                    self._report(started, rows_before, len(todo) - len(pending), len(todo))
+        return self.progress()
+
+    def _report(self, started: float, rows_before: int, finished: int, todo: int) -> None:
+        progress = self.progress()
+        elapsed = time.monotonic() - started
+        rate = (progress["rows"] - rows_before) / elapsed if elapsed else 0.0
+        eta = elapsed / finished * (todo - finished) if finished else None
+        logger.info(
+            f"Batch job {self.job.name} ({self.run_id}): {progress[DONE]}/{progress['chunks']} chunks done, "
+            f"{progress[FAILED]} failed, {progress['rows']} rows, {rate:.0f} rows/s"
+            + (f", ETA {eta:.0f}s" if eta is not None else "")
+        )
@@ -0,0 +1,25 @@
+from starlette.types import Scope
+
+
+def caller_id(scope: Scope) -> str:
+    """
+    Who is calling: the subject API Gateway authenticated (JWT or Cognito
+    `sub`, Lambda authorizer principal, IAM user, API key) when the event
+    carries one, otherwise the client address.
+    """
+    request_context = (scope.get("aws.event") or {}).get("requestContext") or {}
+    authorizer = request_context.get("authorizer") or {}
+    claims = (authorizer.get("jwt") or {}).get("claims") or authorizer.get("claims") or {}
+    identity = request_context.get("identity") or {}
+    subject = (
+        claims.get("sub")
+        or authorizer.get("principalId")
+        or (authorizer.get("iam") or {}).get("userArn")
+        or identity.get("userArn")
+        or identity.get("cognitoIdentityId")
+        or identity.get("apiKeyId")
+    )
+    if subject:
+        return f"sub:{subject}"
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "anonymous"
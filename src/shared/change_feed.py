@@ -0,0 +1,200 @@
+import asyncio
+import json
+import threading
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from redis import Redis
+from redis.exceptions import RedisError
+
+from db.redis import RedisConnection
+
+# XADD and PUBLISH in one round trip; subscribers get the stream id with the event
+PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'event', ARGV[2])
+redis.call('PUBLISH', KEYS[2], id .. ' ' .. ARGV[2])
+return id
+"""
+
+
+def stream_id(value: str) -> tuple[int, int]:
+    milliseconds, _, sequence = value.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def format_sse(event: str, data: Any, event_id: str | None = None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """Bounded buffer of one connection. When it fills up, live events are
+    dropped and the connection catches up from the stream instead."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[tuple[str, dict[str, Any]]] = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def offer(self, item: tuple[str, dict[str, Any]]) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def reset(self) -> None:
+        self.overflowed = False
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+class ChangeFeed:
+    """
+    Change events kept in a capped Redis Stream (for resuming by id) and
+    announced on a pub/sub channel. One listener thread per process, on
+    its own Redis connection since it blocks, fans the announcements out
+    to the connected subscriptions.
+    """
+
+    def __init__(self, stream: str, channel: str, maxlen: int, buffer_size: int, replay_batch: int) -> None:
+        self.stream = stream
+        self.channel = channel
+        self.maxlen = maxlen
+        self.buffer_size = buffer_size
+        self.replay_batch = replay_batch
+        self.ready = threading.Event()
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._listener: threading.Thread | None = None
+        self._script: Any = None
+
+    # Producer side
+    def publish(self, event: dict[str, Any], client: Redis | None = None) -> str | None:
+        """Appends and announces `event`; returns its id, None if Redis failed (the feed is best effort)."""
+        client = client or RedisConnection.get_client()
+        try:
+            if self._script is None:
+                self._script = client.register_script(PUBLISH_SCRIPT)
+            return self._script(keys=[self.stream, self.channel], args=[self.maxlen, json.dumps(event)], client=client)
+        except RedisError as exc:
+            logger.warning(f"Could not publish change to {self.stream}: {exc}")
+            return None
+
+    # Stream reads
+    def read_after(self, last_id: str, count: int) -> list[tuple[str, dict[str, Any]]]:
+        entries = RedisConnection.get_client().xrange(self.stream, min=f"({last_id}", count=count)
+        return [(entry_id, json.loads(fields["event"])) for entry_id, fields in entries]
+
+    def bounds(self) -> tuple[str | None, str | None]:
+        """Ids of the oldest and newest retained events."""
+        client = RedisConnection.get_client()
+        first = client.xrange(self.stream, count=1)
+        last = client.xrevrange(self.stream, count=1)
+        return (first[0][0] if first else None), (last[0][0] if last else None)
+
+    # Fan-out
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen_forever, name="change-feed", daemon=True)
+                self._listener.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _dispatch(self, item: tuple[str, dict[str, Any]] | None) -> None:
+        """Hands `item` to every subscription; None marks them all as having missed events."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                if item is None:
+                    subscription.overflowed = True
+                else:
+                    subscription.loop.call_soon_threadsafe(subscription.offer, item)
+            except RuntimeError:
+                # The connection's event loop is gone
+                self.unsubscribe(subscription)
+
+    def _listen_forever(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                pubsub = RedisConnection.get_blocking_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                pubsub.get_message(ignore_subscribe_messages=False, timeout=5)
+                self.ready.set()
+                while True:
+                    message = pubsub.get_message(timeout=1)
+                    if message is None:
+                        continue
+                    entry_id, _, payload = message["data"].partition(" ")
+                    self._dispatch((entry_id, json.loads(payload)))
+            except (RedisError, OSError) as exc:
+                self.ready.clear()
+                logger.warning(f"Change feed listener lost Redis, reconnecting: {exc}")
+                # Announcements sent meanwhile are lost; subscribers re-read the stream
+                self._dispatch(None)
+                time.sleep(1)
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
+
+    async def events(
+        self,
+        last_event_id: str | None,
+        heartbeat_seconds: float,
+        retry_ms: int = 3000,
+    ) -> AsyncIterator[str]:
+        """
+        Server-Sent Events for one connection: replays what came after
+        `last_event_id` from the stream, then follows the live feed. A
+        `reset` event means events were trimmed before the client could
+        read them and it should reload its state.
+        """
+        subscription = self.subscribe()
+        try:
+            await run_in_threadpool(self.ready.wait, 5)
+            first, newest = await run_in_threadpool(self.bounds)
+            position = last_event_id or newest or "0-0"
+            yield f"retry: {retry_ms}\n\n"
+            if last_event_id and first is not None and stream_id(first) > stream_id(last_event_id):
+                yield format_sse("reset", {"reason": "events before the oldest retained one were trimmed"})
+            if last_event_id:
+                async for chunk, position in self._replay(position):
+                    yield chunk
+
+            while True:
+                if subscription.overflowed:
+                    subscription.reset()
+                    async for chunk, position in self._replay(position):
+                        yield chunk
+                    continue
+                try:
+                    entry_id, event = await asyncio.wait_for(subscription.queue.get(), heartbeat_seconds)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if stream_id(entry_id) <= stream_id(position):
+                    continue
+                position = entry_id
+                yield format_sse(event["action"], event, entry_id)
+        finally:
+            self.unsubscribe(subscription)
+
+    async def _replay(self, position: str) -> AsyncIterator[tuple[str, str]]:
+        while True:
+            entries = await run_in_threadpool(self.read_after, position, self.replay_batch)
+            for entry_id, event in entries:
+                position = entry_id
+                yield format_sse(event["action"], event, entry_id), position
+            if len(entries) < self.replay_batch:
+                return
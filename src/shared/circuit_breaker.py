@@ -0,0 +1,115 @@
+import threading
+import time
+from collections.abc import Callable
+from enum import StrEnum
+from types import TracebackType
+
+from loguru import logger
+
+from core.settings import settings
+from shared.base_exceptions import DependencyUnavailableException
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def dependency_unavailable(name: str) -> Exception:
+    return DependencyUnavailableException(
+        message=f"{name} is unavailable, failing fast",
+        data={"dependency": name},
+    )
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive infrastructure failures
+    and fails fast for `recovery_timeout_seconds`. Then a single trial
+    call is let through (half-open): success closes the circuit, a
+    failure opens it again. Use it as a context manager around calls.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_exceptions: tuple[type[BaseException], ...],
+        failure_threshold: int = settings.CIRCUIT_BREAKER.FAILURE_THRESHOLD,
+        recovery_timeout_seconds: float = settings.CIRCUIT_BREAKER.RECOVERY_TIMEOUT_SECONDS,
+        open_exception: Callable[[str], Exception] = dependency_unavailable,
+        enabled: bool = settings.CIRCUIT_BREAKER.ENABLED,  # noqa: FBT001
+        is_failure: Callable[[BaseException], bool] | None = None,
+    ) -> None:
+        self.name = name
+        self.failure_exceptions = failure_exceptions
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_seconds = recovery_timeout_seconds
+        self.open_exception = open_exception
+        self.enabled = enabled
+        self.is_failure = is_failure
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def __enter__(self) -> "CircuitBreaker":
+        self.before_call()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc is not None and isinstance(exc, self.failure_exceptions) and (
+            self.is_failure is None or self.is_failure(exc)
+        ):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def before_call(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._state is CircuitState.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout_seconds:
+                    raise self.open_exception(self.name)
+                self._state = CircuitState.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state is CircuitState.HALF_OPEN:
+                if self._trial_in_flight:
+                    raise self.open_exception(self.name)
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._state is not CircuitState.CLOSED:
+                logger.info(f"Circuit breaker for {self.name} closed")
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state is not CircuitState.OPEN:
+                    logger.error(f"Circuit breaker for {self.name} opened after {self._failures} failures")
+                self._state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, str | int]:
+        return {"state": self._state.value, "consecutive_failures": self._failures}
@@ -0,0 +1,150 @@
+import threading
+import uuid
+from collections import Counter
+from typing import Any
+
+from loguru import logger
+from redis import Redis
+from redis.exceptions import RedisError
+
+from db.redis import RedisConnection
+
+# Moves the pending hash aside and registers it, so readers can find the batch being flushed
+TAKE_BATCH_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('RENAME', KEYS[1], KEYS[2])
+redis.call('SADD', KEYS[3], KEYS[2])
+return 1
+"""
+
+# Pending amounts of ARGV fields: the live hash plus every batch not yet completed
+PENDING_SCRIPT = """
+local totals = redis.call('HMGET', KEYS[1], unpack(ARGV))
+for i = 1, #ARGV do totals[i] = tonumber(totals[i]) or 0 end
+for _, batch in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    local values = redis.call('HMGET', batch, unpack(ARGV))
+    for i = 1, #ARGV do totals[i] = totals[i] + (tonumber(values[i]) or 0) end
+end
+return totals
+"""
+
+
+class WriteBehindCounters:
+    """
+    Counters incremented in process, pushed to a Redis hash with one
+    pipeline per `push_interval_ms` and folded into the database by a
+    flusher (`take_batch` / `complete_batch`), so a hot counter costs a
+    dict update instead of a row lock. Under Lambda call `push` before
+    returning, the pusher thread is frozen between invocations.
+
+    `pending` reads the not-yet-flushed delta: local buffer, amounts a push
+    is sending, the Redis hash and the batches being flushed. It never
+    undercounts; it may briefly count an amount twice, for one push round
+    trip or while a flushed batch is committed but not yet completed.
+    """
+
+    def __init__(self, key: str, push_interval_ms: int, max_buffered: int) -> None:
+        self.key = key
+        self.batch_prefix = f"{key}:batch:"
+        self.batches_key = f"{key}:batches"
+        self.push_interval = push_interval_ms / 1000
+        self.max_buffered = max_buffered
+        self.dropped = 0
+        self._buffer: Counter[str] = Counter()
+        # Taken from the buffer by a push and not yet confirmed by Redis
+        self._in_flight: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        # One push at a time; readers never take it
+        self._push_lock = threading.Lock()
+        self._pusher: threading.Thread | None = None
+        self._take_script: Any = None
+        self._pending_script: Any = None
+
+    def increment(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            if field not in self._buffer and len(self._buffer) >= self.max_buffered:
+                # Redis has been unreachable for a while, keep memory bounded
+                self.dropped += amount
+                return
+            self._buffer[field] += amount
+        self._start_pusher()
+
+    def push(self, client: Redis | None = None) -> int:
+        """Sends the buffered increments in one pipeline; returns how many fields were sent."""
+        with self._push_lock:
+            with self._lock:
+                buffered, self._buffer = self._buffer, Counter()
+                self._in_flight = buffered
+            if not buffered:
+                return 0
+            try:
+                pipeline = (client or RedisConnection.get_client()).pipeline(transaction=False)
+                for field, amount in buffered.items():
+                    pipeline.hincrby(self.key, field, amount)
+                pipeline.execute()
+            except RedisError as exc:
+                logger.warning(f"Could not push {len(buffered)} counters to Redis, retrying later: {exc}")
+                with self._lock:
+                    self._buffer.update(buffered)
+                    self._in_flight = Counter()
+                return 0
+            with self._lock:
+                self._in_flight = Counter()
+            return len(buffered)
+
+    def pending(self, fields: list[str], client: Redis | None = None) -> dict[str, int]:
+        with self._lock:
+            totals = {field: self._buffer.get(field, 0) + self._in_flight.get(field, 0) for field in fields}
+        if not fields:
+            return totals
+        # Redis is read with no lock held, pushes and other readers carry on
+        client = client or RedisConnection.get_client()
+        try:
+            if self._pending_script is None:
+                self._pending_script = client.register_script(PENDING_SCRIPT)
+            stored = self._pending_script(keys=[self.key, self.batches_key], args=fields, client=client)
+        except RedisError as exc:
+            logger.warning(f"Could not read pending counters from Redis: {exc}")
+            return totals
+        for field, value in zip(fields, stored):
+            totals[field] += int(value)
+        return totals
+
+    def take_batch(self, client: Redis | None = None) -> tuple[str, dict[str, int]] | None:
+        """
+        Moves the pending hash aside under a batch key (RENAME is atomic,
+        new increments start a fresh hash) and returns its id and values.
+        A batch left by a flusher that died is returned first. None when
+        there is nothing to flush.
+        """
+        client = client or RedisConnection.get_client()
+        batch_key = next(client.scan_iter(match=f"{self.batch_prefix}*", count=100), None)
+        if batch_key is None:
+            batch_key = f"{self.batch_prefix}{uuid.uuid4().hex}"
+            if self._take_script is None:
+                self._take_script = client.register_script(TAKE_BATCH_SCRIPT)
+            if not self._take_script(keys=[self.key, batch_key, self.batches_key], client=client):
+                # Nothing was incremented since the last flush
+                return None
+        values = client.hgetall(batch_key)
+        return batch_key.removeprefix(self.batch_prefix), {field: int(value) for field, value in values.items()}
+
+    def complete_batch(self, batch_id: str, client: Redis | None = None) -> None:
+        batch_key = f"{self.batch_prefix}{batch_id}"
+        pipeline = (client or RedisConnection.get_client()).pipeline(transaction=True)
+        pipeline.delete(batch_key)
+        pipeline.srem(self.batches_key, batch_key)
+        pipeline.execute()
+
+    def _start_pusher(self) -> None:
+        if self._pusher is not None:
+            return
+        with self._lock:
+            if self._pusher is None:
+                self._pusher = threading.Thread(target=self._push_forever, name="counters-pusher", daemon=True)
+                self._pusher.start()
+
+    def _push_forever(self) -> None:
+        stopped = threading.Event()
+        while not stopped.wait(self.push_interval):
+            self.push()
@@ -0,0 +1,32 @@
+import time
+from contextvars import Token
+
+from shared.base_contextvars import ctx_deadline
+from shared.base_exceptions import DeadlineExceededException
+
+
+def set_deadline(budget_ms: float) -> Token[float | None]:
+    return ctx_deadline.set(time.monotonic() + budget_ms / 1000)
+
+
+def reset_deadline(token: Token[float | None]) -> None:
+    ctx_deadline.reset(token)
+
+
+def remaining_ms() -> float | None:
+    """Milliseconds left for the current request, None outside a request."""
+    deadline = ctx_deadline.get()
+    if deadline is None:
+        return None
+    return (deadline - time.monotonic()) * 1000
+
+
+def remaining_seconds() -> float | None:
+    remaining = remaining_ms()
+    return None if remaining is None else max(remaining, 0) / 1000
+
+
+def check_deadline() -> None:
+    remaining = remaining_ms()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededException(message="Request deadline exceeded before calling a dependency")
@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Generic, TypeVar
+
+from loguru import logger
+
+from shared.base_contextvars import ctx_deadline
+from shared.base_exceptions import DeadlineExceededException
+from shared.deadline import remaining_seconds
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class GroupCommitter(Generic[T, R]):
+    """
+    Coalesces concurrent writes into one statement and one commit.
+
+    `submit` blocks the calling thread; a single writer thread takes the
+    first queued item, waits up to `window_ms` (or until `max_batch`
+    items) for more and hands the whole batch to `execute_batch`, which
+    must return one result per item in order. If a batch fails, its
+    items are retried one by one so each caller gets its own result or
+    its own error.
+
+    Callers wait no longer than their request deadline; the batch runs
+    under the latest deadline of its callers, since the writer thread
+    does not see their contextvars.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        execute_batch: Callable[[list[T]], list[R]],
+        window_ms: float,
+        max_batch: int,
+    ) -> None:
+        self.name = name
+        self.execute_batch = execute_batch
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self._queue: queue.Queue[tuple[T, Future[R], float | None]] = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: T) -> R:
+        future: Future[R] = Future()
+        self._queue.put((item, future, ctx_deadline.get()))
+        self._start_writer()
+        try:
+            return future.result(timeout=remaining_seconds())
+        except FutureTimeoutError:
+            # A write already in flight can't be withdrawn: its outcome is unknown to this caller
+            if not future.cancel() and future.done():
+                return future.result()
+            raise DeadlineExceededException(
+                message=f"Group commit '{self.name}' did not finish before the request deadline"
+            ) from None
+
+    def _start_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_forever, name=f"group-commit-{self.name}", daemon=True)
+                self._writer.start()
+
+    def _collect(self) -> list[tuple[T, Future[R], float | None]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_forever(self) -> None:
+        while True:
+            # Callers that gave up before the write started are dropped
+            running = [queued for queued in self._collect() if queued[1].set_running_or_notify_cancel()]
+            if not running:
+                continue
+            batch = [(item, future) for item, future, _ in running]
+            deadlines = [deadline for _, _, deadline in running if deadline is not None]
+            # The batch may run as long as its most patient caller, unbounded if any caller is
+            token = ctx_deadline.set(max(deadlines) if len(deadlines) == len(running) else None)
+            try:
+                self._write(batch)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception(f"Group commit '{self.name}' writer failed on a batch of {len(batch)} items")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            finally:
+                ctx_deadline.reset(token)
+
+    def _write(self, batch: list[tuple[T, Future[R]]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = self.execute_batch([item for item, _ in batch])
+        except Exception as exc:  # noqa: BLE001
+            if len(batch) == 1:
+                batch[0][1].set_exception(exc)
+                return
+            logger.warning(f"Group commit '{self.name}' of {len(batch)} items failed, retrying one by one: {exc}")
+            for item, future in batch:
+                try:
+                    [result] = self.execute_batch([item])
+                except Exception as item_exc:  # noqa: BLE001
+                    future.set_exception(item_exc)
+                else:
+                    future.set_result(result)
+            return
+        if len(results) != len(batch):
+            logger.error(f"Group commit '{self.name}' got {len(results)} results for {len(batch)} items")
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+        for _, future in batch[len(results):]:
+            future.set_exception(RuntimeError(f"Group commit '{self.name}' returned no result for this item"))
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,81 @@
+import base64
+import json
+import time
+import uuid
+from dataclasses import dataclass
+
+from db.redis import RedisConnection
+from shared.single_flight import RELEASE_LOCK_SCRIPT
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    headers: list[tuple[str, str]]
+    body: bytes
+
+    def dumps(self) -> str:
+        return json.dumps({
+            "fingerprint": self.fingerprint,
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "body": base64.b64encode(self.body).decode(),
+        })
+
+    @staticmethod
+    def loads(raw: str) -> "StoredResponse":
+        data = json.loads(raw)
+        return StoredResponse(
+            fingerprint=data["fingerprint"],
+            status_code=data["status_code"],
+            headers=[(name, value) for name, value in data["headers"]],
+            body=base64.b64decode(data["body"]),
+        )
+
+
+class IdempotencyStore:
+    """Redis storage of responses keyed by Idempotency-Key."""
+
+    def __init__(self, ttl_seconds: int, lock_ttl_seconds: int, poll_interval_ms: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.poll_interval_ms = poll_interval_ms
+
+    @staticmethod
+    def _response_key(key: str) -> str:
+        return f"idempotency:response:{key}"
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"idempotency:lock:{key}"
+
+    def get(self, key: str) -> StoredResponse | None:
+        raw = RedisConnection.get_client().get(self._response_key(key))
+        return StoredResponse.loads(raw) if raw is not None else None
+
+    def acquire(self, key: str) -> str | None:
+        token = uuid.uuid4().hex
+        acquired = RedisConnection.get_client().set(
+            self._lock_key(key), token, nx=True, ex=self.lock_ttl_seconds
+        )
+        return token if acquired else None
+
+    def release(self, key: str, token: str) -> None:
+        RedisConnection.get_client().eval(RELEASE_LOCK_SCRIPT, 1, self._lock_key(key), token)
+
+    def save(self, key: str, response: StoredResponse) -> None:
+        RedisConnection.get_client().set(self._response_key(key), response.dumps(), ex=self.ttl_seconds)
+
+    def wait(self, key: str, timeout_seconds: float) -> StoredResponse | None:
+        """Polls for the response of a concurrent duplicate that holds the lock."""
+        client = RedisConnection.get_client()
+        deadline = time.monotonic() + timeout_seconds
+        while time.monotonic() < deadline:
+            stored = self.get(key)
+            if stored is not None:
+                return stored
+            if not client.exists(self._lock_key(key)):
+                return None
+            time.sleep(self.poll_interval_ms / 1000)
+        return None
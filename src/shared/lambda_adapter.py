@@ -0,0 +1,187 @@
+import asyncio
+import base64
+import json
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import unquote
+
+from starlette.types import ASGIApp, Message
+
+TEXT_MIME_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/vnd.api+json",
+    "application/vnd.oai.openapi",
+)
+
+# Function URL streaming payloads start with a JSON prelude followed by 8 NUL bytes
+STREAMING_CONTENT_TYPE = "application/vnd.awslambda.http-integration-response"
+STREAMING_PRELUDE_DELIMITER = b"\x00" * 8
+
+LambdaHandler = Callable[[dict[str, Any], Any], dict[str, Any]]
+
+
+def is_http_v2_event(event: Any) -> bool:
+    """API Gateway HTTP API (payload 2.0) and Lambda Function URL events."""
+    return (
+        isinstance(event, dict)
+        and event.get("version") == "2.0"
+        and "http" in event.get("requestContext", {})
+    )
+
+
+def _is_text(content_type: str) -> bool:
+    return any(mime in content_type for mime in TEXT_MIME_TYPES)
+
+
+class _ResponseCollector:
+    """Accumulates the ASGI response into a payload 2.0 dict."""
+
+    def __init__(self) -> None:
+        self.status = 500
+        self.headers: list[tuple[bytes, bytes]] = []
+        self.chunks: list[bytes] = []
+
+    def start(self, status: int, headers: list[tuple[bytes, bytes]]) -> None:
+        self.status = status
+        self.headers = headers
+
+    def write(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+
+    def result(self) -> dict[str, Any]:
+        headers, cookies = split_headers(self.headers)
+        body = b"".join(self.chunks)
+        is_base64 = bool(body) and not _is_text(headers.get("content-type", ""))
+        if not is_base64:
+            try:
+                text = body.decode()
+            except UnicodeDecodeError:
+                is_base64 = True
+        return {
+            "statusCode": self.status,
+            "headers": headers,
+            "cookies": cookies,
+            "body": base64.b64encode(body).decode() if is_base64 else text,
+            "isBase64Encoded": is_base64,
+        }
+
+
+class StreamingResponseWriter:
+    """
+    Writes the response in the Lambda HTTP streaming format: JSON prelude,
+    delimiter, then body chunks as the application produces them.
+    """
+
+    def __init__(self, write: Callable[[bytes], None]) -> None:
+        self._write = write
+
+    def start(self, status: int, headers: list[tuple[bytes, bytes]]) -> None:
+        plain_headers, cookies = split_headers(headers)
+        prelude = {"statusCode": status, "headers": plain_headers, "cookies": cookies}
+        self._write(json.dumps(prelude).encode() + STREAMING_PRELUDE_DELIMITER)
+
+    def write(self, chunk: bytes) -> None:
+        if chunk:
+            self._write(chunk)
+
+
+def split_headers(raw_headers: list[tuple[bytes, bytes]]) -> tuple[dict[str, str], list[str]]:
+    """Payload 2.0 joins repeated headers with commas and moves Set-Cookie to `cookies`."""
+    headers: dict[str, str] = {}
+    cookies: list[str] = []
+    for raw_key, raw_value in raw_headers:
+        key, value = raw_key.decode().lower(), raw_value.decode()
+        if key == "set-cookie":
+            cookies.append(value)
+        elif key in headers:
+            headers[key] = f"{headers[key]},{value}"
+        else:
+            headers[key] = value
+    return headers, cookies
+
+
+class LambdaAdapter:
+    """
+    Minimal Lambda entry point for HTTP API v2 and Function URL events.
+
+    Builds the ASGI scope straight from the event and runs it on one event
+    loop kept across warm invocations; any other event type is handed to
+    `fallback` (Mangum). Lifespan is not run per invocation.
+    """
+
+    def __init__(self, app: ASGIApp, fallback: LambdaHandler) -> None:
+        self.app = app
+        self.fallback = fallback
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+        return self._loop
+
+    def __call__(self, event: dict[str, Any], context: Any) -> dict[str, Any]:
+        if not is_http_v2_event(event):
+            return self.fallback(event, context)
+        collector = _ResponseCollector()
+        self.loop.run_until_complete(self._run(event, context, collector))
+        return collector.result()
+
+    def stream(self, event: dict[str, Any], context: Any, write: Callable[[bytes], None]) -> None:
+        """Runs an HTTP v2 event writing the streaming payload through `write`."""
+        self.loop.run_until_complete(self._run(event, context, StreamingResponseWriter(write)))
+
+    async def _run(self, event: dict[str, Any], context: Any, response: Any) -> None:
+        scope = self.build_scope(event, context)
+        body = event.get("body") or ""
+        body_bytes = base64.b64decode(body) if event.get("isBase64Encoded") else body.encode()
+        request_sent = False
+        response_complete = asyncio.Event()
+
+        async def receive() -> Message:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body_bytes, "more_body": False}
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response.start(message["status"], list(message.get("headers", [])))
+            elif message["type"] == "http.response.body":
+                response.write(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_complete.set()
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def build_scope(event: dict[str, Any], context: Any) -> dict[str, Any]:
+        request_context = event["requestContext"]
+        http = request_context["http"]
+        headers = {key.lower(): value for key, value in (event.get("headers") or {}).items()}
+        if event.get("cookies"):
+            headers["cookie"] = "; ".join(event["cookies"])
+        raw_path = event.get("rawPath") or http.get("path") or "/"
+        host = headers.get("host", request_context.get("domainName", "lambda"))
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": "1.1",
+            "method": http["method"],
+            "scheme": headers.get("x-forwarded-proto", "https"),
+            "path": unquote(raw_path),
+            "raw_path": raw_path.encode(),
+            "root_path": "",
+            "query_string": (event.get("rawQueryString") or "").encode(),
+            "headers": [(key.encode(), value.encode()) for key, value in headers.items()],
+            "server": (host.split(":")[0], int(headers.get("x-forwarded-port", 443))),
+            "client": (http.get("sourceIp", ""), 0),
+            "aws.event": event,
+            "aws.context": context,
+        }
@@ -0,0 +1,126 @@
+"""
+Lambda Runtime API loop with response streaming.
+
+The managed Python runtime buffers responses, so streaming needs a custom
+runtime loop: HTTP v2 / Function URL events are written chunk by chunk in
+the HTTP integration streaming format, everything else goes through
+`main.handler` and is returned whole.
+
+Run it as the container entry point (the function URL must use
+InvokeMode RESPONSE_STREAM):
+    python -m shared.lambda_runtime
+"""
+
+import http.client
+import json
+import os
+import time
+import traceback
+from collections.abc import Callable
+from typing import Any
+
+from loguru import logger
+
+from shared.lambda_adapter import STREAMING_CONTENT_TYPE, LambdaAdapter, LambdaHandler, is_http_v2_event
+
+API_VERSION = "2018-06-01"
+
+
+class RuntimeContext:
+    """Subset of the managed runtime's context object used by the app."""
+
+    def __init__(self, headers: http.client.HTTPMessage) -> None:
+        self.aws_request_id = headers["Lambda-Runtime-Aws-Request-Id"]
+        self.invoked_function_arn = headers.get("Lambda-Runtime-Invoked-Function-Arn")
+        self.function_name = os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "")
+        self.function_version = os.environ.get("AWS_LAMBDA_FUNCTION_VERSION", "")
+        self.memory_limit_in_mb = os.environ.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", "")
+        self._deadline_ms = int(headers.get("Lambda-Runtime-Deadline-Ms", "0"))
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(self._deadline_ms - int(time.time() * 1000), 0)
+
+
+class RuntimeClient:
+    def __init__(self, runtime_api: str) -> None:
+        self.runtime_api = runtime_api
+
+    def _connection(self) -> http.client.HTTPConnection:
+        return http.client.HTTPConnection(self.runtime_api, timeout=None)
+
+    def next_invocation(self) -> tuple[Any, RuntimeContext]:
+        connection = self._connection()
+        connection.request("GET", f"/{API_VERSION}/runtime/invocation/next")
+        response = connection.getresponse()
+        event = json.loads(response.read())
+        return event, RuntimeContext(response.headers)
+
+    def post_response(self, request_id: str, payload: Any) -> None:
+        connection = self._connection()
+        connection.request(
+            "POST",
+            f"/{API_VERSION}/runtime/invocation/{request_id}/response",
+            body=json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
+        connection.getresponse().read()
+
+    def post_error(self, request_id: str, error: BaseException) -> None:
+        payload = {
+            "errorMessage": str(error),
+            "errorType": type(error).__name__,
+            "stackTrace": traceback.format_exception(error),
+        }
+        connection = self._connection()
+        connection.request(
+            "POST",
+            f"/{API_VERSION}/runtime/invocation/{request_id}/error",
+            body=json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
+        connection.getresponse().read()
+
+    def stream_response(self, request_id: str, adapter: LambdaAdapter, event: Any, context: RuntimeContext) -> None:
+        connection = self._connection()
+        connection.putrequest("POST", f"/{API_VERSION}/runtime/invocation/{request_id}/response")
+        connection.putheader("Lambda-Runtime-Function-Response-Mode", "streaming")
+        connection.putheader("Transfer-Encoding", "chunked")
+        connection.putheader("Content-Type", STREAMING_CONTENT_TYPE)
+        connection.endheaders()
+
+        def write(chunk: bytes) -> None:
+            connection.send(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+
+        adapter.stream(event, context, write)
+        connection.send(b"0\r\n\r\n")
+        connection.getresponse().read()
+
+
+def run(
+    adapter: LambdaAdapter,
+    handler: LambdaHandler,
+    finish: Callable[[Any], None],
+    runtime_api: str | None = None,
+) -> None:
+    """`finish` is the end-of-invocation hook `handler` already runs; streamed responses run it here."""
+    client = RuntimeClient(runtime_api or os.environ["AWS_LAMBDA_RUNTIME_API"])
+    while True:
+        event, context = client.next_invocation()
+        try:
+            if is_http_v2_event(event):
+                try:
+                    client.stream_response(context.aws_request_id, adapter, event, context)
+                finally:
+                    # Before the next /next call, which freezes the environment
+                    finish(context)
+            else:
+                client.post_response(context.aws_request_id, handler(event, context))
+        except Exception as error:  # noqa: BLE001
+            logger.exception("Invocation {} failed", context.aws_request_id)
+            client.post_error(context.aws_request_id, error)
+
+
+if __name__ == "__main__":
+    from main import adapter, finish_invocation, handler
+
+    run(adapter, handler, finish_invocation)
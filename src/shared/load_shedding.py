@@ -0,0 +1,157 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from enum import StrEnum
+
+from db.redis import RedisConnection
+
+# Token bucket per caller, refilled from the Redis server clock
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call("TIME")
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+local retry_after_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after_ms = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return retry_after_ms
+"""
+
+
+class Admission(StrEnum):
+    ADMITTED = "admitted"
+    QUEUE_FULL = "queue_full"
+    QUEUE_TIMEOUT = "queue_timeout"
+    LATENCY_TARGET = "latency_target"
+
+
+class LoadShedder:
+    """
+    Caps in-flight requests and queues the excess for a bounded wait.
+    Arrivals that would have to queue are rejected right away while the
+    recent average queue wait (EWMA) is above `target_queue_wait_ms`.
+
+    Waiters are plain futures resumed with `call_soon_threadsafe`, so one
+    instance can be shared by requests running on different event loops.
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        max_queue_wait_ms: int,
+        target_queue_wait_ms: int,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_queue_wait_ms = max_queue_wait_ms
+        self.target_queue_wait_ms = target_queue_wait_ms
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = deque()
+        self._queue_wait_ewma_ms = 0.0
+        self._counters: dict[str, int] = {admission.value: 0 for admission in Admission}
+        self._counters["queued"] = 0
+        self._counters["rate_limited"] = 0
+
+    async def acquire(self) -> Admission:
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._in_flight += 1
+                return self._count(Admission.ADMITTED)
+            if len(self._waiters) >= self.max_queue:
+                return self._count(Admission.QUEUE_FULL)
+            if self._queue_wait_ewma_ms > self.target_queue_wait_ms:
+                # Decay the average so the shedder probes again once idle
+                self._queue_wait_ewma_ms *= 1 - self.EWMA_ALPHA
+                return self._count(Admission.LATENCY_TARGET)
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self._counters["queued"] += 1
+
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter[1], timeout=self.max_queue_wait_ms / 1000)
+        except TimeoutError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self._observe_wait(self.max_queue_wait_ms)
+                    return self._count(Admission.QUEUE_TIMEOUT)
+            # The slot was handed over while the timeout fired
+        except asyncio.CancelledError:
+            with self._lock:
+                handed_over = waiter not in self._waiters
+                if not handed_over:
+                    self._waiters.remove(waiter)
+            if handed_over:
+                self.release()
+            raise
+        with self._lock:
+            self._observe_wait((time.monotonic() - started) * 1000)
+            return self._count(Admission.ADMITTED)
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                # Hand the slot over without decrementing in-flight
+                loop, future = self._waiters.popleft()
+                loop.call_soon_threadsafe(self._wake, future)
+                return
+            self._in_flight -= 1
+
+    def retry_after_seconds(self) -> int:
+        return max(1, math.ceil(max(self._queue_wait_ewma_ms, self.max_queue_wait_ms) / 1000))
+
+    def count_rate_limited(self) -> None:
+        with self._lock:
+            self._counters["rate_limited"] += 1
+
+    def stats(self) -> dict[str, float | int]:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "queue_length": len(self._waiters),
+                "queue_wait_ewma_ms": round(self._queue_wait_ewma_ms, 3),
+                **{f"{name}_total": value for name, value in self._counters.items()},
+            }
+
+    @staticmethod
+    def _wake(future: asyncio.Future[None]) -> None:
+        if not future.done():
+            future.set_result(None)
+
+    def _observe_wait(self, wait_ms: float) -> None:
+        self._queue_wait_ewma_ms += self.EWMA_ALPHA * (wait_ms - self._queue_wait_ewma_ms)
+
+    def _count(self, admission: Admission) -> Admission:
+        self._counters[admission.value] += 1
+        return admission
+
+
+class RedisTokenBucket:
+    """Per-caller rate limit shared by every container through Redis."""
+
+    def __init__(self, rate_per_second: float, burst: int) -> None:
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+
+    def consume(self, caller_id: str) -> int:
+        """Takes one token; returns 0 when allowed or the ms to wait otherwise."""
+        return int(RedisConnection.get_client().eval(
+            TOKEN_BUCKET_SCRIPT, 1, f"rate-limit:{caller_id}", self.rate_per_second, self.burst
+        ))
@@ -0,0 +1,117 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Any
+
+from loguru import logger
+
+from shared.metrics import event_loop_blocked, event_loop_lag
+
+
+class BlockingCallError(RuntimeError):
+    """Blocking I/O attempted on the event loop thread (strict mode)."""
+
+
+def ensure_not_on_event_loop(operation: str) -> None:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    raise BlockingCallError(f"{operation} called on the event loop thread, wrap the call in run_in_threadpool")
+
+
+def find_route(frame: FrameType | None) -> str:
+    """Route of the request whose call stack contains `frame`, from the ASGI `scope` local."""
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            route = scope.get("route")
+            path: str = getattr(route, "path", None) or scope.get("path", "unknown")
+            return path
+        frame = frame.f_back
+    return "unknown"
+
+
+class LoopMonitor:
+    """
+    Samples event-loop lag with a ticker task and, from a watchdog thread,
+    reports callbacks holding the loop longer than `block_threshold_ms`
+    with the loop thread's stack and route. Checks only run while requests
+    are in flight: under Lambda the loop is stopped between invocations.
+    """
+
+    def __init__(self, interval_ms: int, block_threshold_ms: int) -> None:
+        self.interval = interval_ms / 1000
+        self.block_threshold = block_threshold_ms / 1000
+        self.active = 0
+        self.blocked = 0
+        self.max_lag = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._last_tick = time.monotonic()
+        self._reported_tick = 0.0
+
+    def enter(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._loop_thread_id = threading.get_ident()
+            self._task = loop.create_task(self._tick())
+        if self._watchdog is None:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        if not self.active:
+            self._last_tick = time.monotonic()
+        self.active += 1
+
+    def exit(self) -> None:
+        self.active -= 1
+        if not self.active:
+            # Close the open interval, the ticker skips samples while idle
+            self._sample(time.monotonic())
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            # Idle time of a stopped loop (between invocations) is not lag
+            if self.active:
+                self._sample(time.monotonic())
+
+    def _sample(self, now: float) -> None:
+        lag = max(now - self._last_tick - self.interval, 0.0)
+        self._last_tick = now
+        self.max_lag = max(self.max_lag, lag)
+        event_loop_lag.observe(lag)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval):
+            last_tick = self._last_tick
+            held = time.monotonic() - last_tick - self.interval
+            if not self.active or held < self.block_threshold or last_tick == self._reported_tick:
+                continue
+            self._reported_tick = last_tick
+            frame = sys._current_frames().get(self._loop_thread_id) if self._loop_thread_id is not None else None
+            route = find_route(frame)
+            self.blocked += 1
+            event_loop_blocked.inc(route)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            logger.warning(f"Event loop blocked for {held * 1000:.0f}ms+ on {route}:\n{stack}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "active_requests": self.active,
+            "blocked": self.blocked,
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+        }
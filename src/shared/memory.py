@@ -0,0 +1,124 @@
+import os
+import resource
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any
+
+from loguru import logger
+
+MB = 1024 * 1024
+
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak rather than current RSS, the best available outside Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass
+class RouteAllocations:
+    requests: int = 0
+    retained_bytes: int = 0
+    max_retained_bytes: int = 0
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "requests": self.requests,
+            "avg_retained_kb": round(self.retained_bytes / self.requests / 1024, 3) if self.requests else 0,
+            "max_retained_kb": round(self.max_retained_bytes / 1024, 3),
+        }
+
+
+class MemoryTracker:
+    """
+    Tracks RSS and tracemalloc across requests (one request per invocation
+    under Lambda). Every `diff_every` requests it logs the top allocators
+    since the previous report and warns when RSS grew more than
+    `growth_warning_mb` over the first report. Per-route numbers are the
+    traced memory still held after each request; with concurrent requests
+    they include whatever else ran meanwhile.
+    """
+
+    def __init__(self, diff_every: int, top_n: int, growth_warning_mb: float, tracemalloc_frames: int) -> None:
+        self.diff_every = diff_every
+        self.top_n = top_n
+        self.growth_warning_mb = growth_warning_mb
+        self.tracemalloc_frames = tracemalloc_frames
+        self.requests = 0
+        self.routes: dict[str, RouteAllocations] = {}
+        self.last_report: dict[str, Any] = {}
+        self._baseline_rss: int | None = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+        self._baseline_rss = current_rss_bytes()
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self._snapshot = None
+
+    def begin(self) -> int:
+        if self._snapshot is None:
+            self.start()
+        return tracemalloc.get_traced_memory()[0]
+
+    def end(self, route: str, started_bytes: int) -> None:
+        retained = tracemalloc.get_traced_memory()[0] - started_bytes
+        allocations = self.routes.get(route)
+        if allocations is None:
+            allocations = self.routes[route] = RouteAllocations()
+        allocations.requests += 1
+        allocations.retained_bytes += retained
+        allocations.max_retained_bytes = max(allocations.max_retained_bytes, retained)
+        self.requests += 1
+        if self.requests % self.diff_every == 0:
+            self.report()
+
+    def report(self) -> dict[str, Any]:
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        top = snapshot.compare_to(self._snapshot, "lineno")[: self.top_n] if self._snapshot else []
+        self._snapshot = snapshot
+
+        rss = current_rss_bytes()
+        growth_mb = (rss - (self._baseline_rss or rss)) / MB
+        traced, peak = tracemalloc.get_traced_memory()
+        self.last_report = {
+            "requests": self.requests,
+            "rss_mb": round(rss / MB, 2),
+            "rss_growth_mb": round(growth_mb, 2),
+            "traced_mb": round(traced / MB, 2),
+            "traced_peak_mb": round(peak / MB, 2),
+            "top_allocators": [
+                {"location": str(stat.traceback[0]), "size_diff_kb": round(stat.size_diff / 1024, 1), "count_diff": stat.count_diff}
+                for stat in top
+            ],
+            "routes": {route: allocations.to_dict() for route, allocations in self.routes.items()},
+        }
+        logger.info(f"Memory report: {self.last_report}")
+        if growth_mb > self.growth_warning_mb:
+            logger.warning(
+                f"RSS grew {growth_mb:.1f}MB over {self.requests} requests "
+                f"(threshold {self.growth_warning_mb}MB), top allocators: {self.last_report['top_allocators']}"
+            )
+        return self.last_report
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "requests": self.requests,
+            "rss_mb": round(current_rss_bytes() / MB, 2),
+            "last_report": self.last_report,
+        }
@@ -0,0 +1,240 @@
+import bisect
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Shard:
+    """Values recorded by one thread; only that thread ever writes to it."""
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self) -> None:
+        self.counters: defaultdict[tuple[str, tuple[str, ...]], float] = defaultdict(float)
+        # (name, labels) -> [bucket counts..., +Inf count, sum]
+        self.histograms: dict[tuple[str, tuple[str, ...]], list[float]] = {}
+
+
+class _Metric:
+    type: str
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, labels: tuple[str, ...]) -> None:
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *label_values: str, value: float = 1) -> None:
+        self.registry._shard().counters[(self.name, label_values)] += value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, labels: tuple[str, ...], buckets: tuple[float, ...]) -> None:
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *label_values: str) -> None:
+        histograms = self.registry._shard().histograms
+        key = (self.name, label_values)
+        series = histograms.get(key)
+        if series is None:
+            series = histograms[key] = [0.0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics with per-thread shards: recording touches only the
+    calling thread's dicts, so the request path takes no locks. Readers sum
+    the shards; a value recorded concurrently shows up on the next read.
+    Shards of finished threads are folded into one retired shard, so thread
+    churn does not grow the registry.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._shards: dict[threading.Thread, _Shard] = {}
+        self._shards_lock = threading.Lock()
+        self._local = threading.local()
+        self._retired = _Shard()
+        self._last_emitted: dict[tuple[str, tuple[str, ...]], Any] = {}
+
+    def _shard(self) -> _Shard:
+        try:
+            shard: _Shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._retire_finished_shards()
+                self._shards[threading.current_thread()] = shard
+        return shard
+
+    def _retire_finished_shards(self) -> None:
+        alive = {}
+        for thread, shard in self._shards.items():
+            if thread.is_alive():
+                alive[thread] = shard
+                continue
+            for key, value in shard.counters.items():
+                self._retired.counters[key] += value
+            for key, series in shard.histograms.items():
+                total = self._retired.histograms.setdefault(key, [0.0] * len(series))
+                for index, value in enumerate(series):
+                    total[index] += value
+        self._shards = alive
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = self._metrics[name] = Counter(self, name, help_text, labels)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = self._metrics[name] = Histogram(self, name, help_text, labels, buckets)
+        return metric
+
+    def snapshot(self) -> tuple[dict[tuple[str, tuple[str, ...]], float], dict[tuple[str, tuple[str, ...]], list[float]]]:
+        counters: defaultdict[tuple[str, tuple[str, ...]], float] = defaultdict(float)
+        histograms: dict[tuple[str, tuple[str, ...]], list[float]] = {}
+        with self._shards_lock:
+            shards = list(self._shards.values())
+            retired = _Shard()
+            retired.counters.update(self._retired.counters)
+            retired.histograms.update({key: list(series) for key, series in self._retired.histograms.items()})
+        for shard in (retired, *shards):
+            for key, value in list(shard.counters.items()):
+                counters[key] += value
+            for key, series in list(shard.histograms.items()):
+                total = histograms.setdefault(key, [0.0] * len(series))
+                for index, value in enumerate(list(series)):
+                    total[index] += value
+        return dict(counters), histograms
+
+    def render_prometheus(self) -> str:
+        counters, histograms = self.snapshot()
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            if isinstance(metric, Histogram):
+                for (name, label_values), series in sorted(histograms.items()):
+                    if name != metric.name:
+                        continue
+                    labels = _format_labels(metric.labels, label_values)
+                    cumulative = 0.0
+                    for bound, count in zip((*metric.buckets, "+Inf"), series[:-1]):
+                        cumulative += count
+                        bucket_labels = _format_labels((*metric.labels, "le"), (*label_values, str(bound)))
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative:g}")
+                    lines.append(f"{name}_sum{labels} {series[-1]:g}")
+                    lines.append(f"{name}_count{labels} {cumulative:g}")
+            else:
+                for (name, label_values), value in sorted(counters.items()):
+                    if name == metric.name:
+                        lines.append(f"{name}{_format_labels(metric.labels, label_values)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def emf_records(self, namespace: str) -> list[dict[str, Any]]:
+        """
+        CloudWatch Embedded Metric Format records with what was recorded since
+        the previous call, one record per label set.
+        """
+        counters, histograms = self.snapshot()
+        records: dict[tuple[str, ...], dict[str, Any]] = {}
+
+        def record_for(metric: _Metric, label_values: tuple[str, ...]) -> dict[str, Any]:
+            key = (*metric.labels, *label_values)
+            record = records.get(key)
+            if record is None:
+                record = records[key] = {
+                    "_aws": {
+                        "Timestamp": int(time.time() * 1000),
+                        "CloudWatchMetrics": [
+                            {"Namespace": namespace, "Dimensions": [list(metric.labels)], "Metrics": []}
+                        ],
+                    },
+                    **dict(zip(metric.labels, label_values)),
+                }
+            return record
+
+        for key, value in counters.items():
+            delta = value - self._last_emitted.get(key, 0)
+            self._last_emitted[key] = value
+            metric = self._metrics[key[0]]
+            if delta:
+                record = record_for(metric, key[1])
+                record["_aws"]["CloudWatchMetrics"][0]["Metrics"].append({"Name": metric.name, "Unit": "Count"})
+                record[metric.name] = delta
+
+        for key, series in histograms.items():
+            previous = self._last_emitted.get(key, [0.0] * len(series))
+            self._last_emitted[key] = list(series)
+            metric = self._metrics[key[0]]
+            if not isinstance(metric, Histogram):
+                continue
+            counts = [now - before for now, before in zip(series[:-1], previous[:-1])]
+            if not any(counts):
+                continue
+            # Buckets are reported by their upper bound (the last one by the largest bound)
+            values = [*metric.buckets, metric.buckets[-1]]
+            record = record_for(metric, key[1])
+            record["_aws"]["CloudWatchMetrics"][0]["Metrics"].append({"Name": metric.name, "Unit": "Seconds"})
+            record[metric.name] = {
+                "Values": [value for value, count in zip(values, counts) if count],
+                "Counts": [count for count in counts if count],
+            }
+        return list(records.values())
+
+    def emit_emf(self, namespace: str) -> None:
+        for record in self.emf_records(namespace):
+            # EMF is picked up from stdout by the Lambda log agent
+            print(json.dumps(record), flush=True)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+db_statement_duration = metrics.histogram(
+    "db_statement_duration_seconds", "Time spent in PostgreSQL statements", ("operation",)
+)
+cache_requests = metrics.counter(
+    "cache_requests_total", "Cache lookups by cache and result", ("cache", "result")
+)
+api_errors = metrics.counter(
+    "api_errors_total", "Error responses by internal code", ("code", "status")
+)
+event_loop_lag = metrics.histogram(
+    "event_loop_lag_seconds", "Delay of the event loop ticker over its interval",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+event_loop_blocked = metrics.counter(
+    "event_loop_blocked_total", "Callbacks holding the event loop past the threshold", ("route",)
+)
+background_task_overflow = metrics.counter(
+    "background_task_overflow_total", "Tasks the full in-process queue turned away, by outcome", ("outcome",)
+)
@@ -1,4 +1,24 @@
+from .caller import CallerMiddleware
 from .catcher_exceptions import CatcherExceptions
 from .catcher_pydantic_errors import CatcherExceptionsPydantic
+from .deadline import DeadlineMiddleware
+from .idempotency import IdempotencyMiddleware
+from .load_shedding import LoadSheddingMiddleware
+from .loop_monitor import LoopMonitorMiddleware
+from .memory import MemoryMiddleware
+from .metrics import MetricsMiddleware
+from .profiler import ProfilerMiddleware, profiling_enabled
 
-__all__ = ["CatcherExceptions", "CatcherExceptionsPydantic"]
+__all__ = [
+    "CallerMiddleware",
+    "CatcherExceptions",
+    "CatcherExceptionsPydantic",
+    "DeadlineMiddleware",
+    "IdempotencyMiddleware",
+    "LoadSheddingMiddleware",
+    "LoopMonitorMiddleware",
+    "MemoryMiddleware",
+    "MetricsMiddleware",
+    "ProfilerMiddleware",
+    "profiling_enabled",
+]
@@ -0,0 +1,24 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from shared.base_contextvars import ctx_caller_id
+from shared.caller import caller_id
+
+
+class CallerMiddleware:
+    """
+    Sets `ctx_caller_id` for the request, so per-caller limits and keys
+    see the authenticated subject rather than only the client address.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = ctx_caller_id.set(caller_id(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ctx_caller_id.reset(token)
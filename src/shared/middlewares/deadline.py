@@ -0,0 +1,41 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.settings import settings
+from shared.deadline import reset_deadline, set_deadline
+
+
+class DeadlineMiddleware:
+    """
+    Sets the request deadline used to bound Postgres statement_timeout
+    and Mongo maxTimeMS. Under Lambda it is the invocation's remaining
+    time (Mangum exposes the context as `aws.context`) minus a safety
+    margin; otherwise the budget of the longest matching path prefix.
+    Paths in TIMEOUTS.DEADLINE_EXEMPT_PATHS run without a deadline.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.exempt_paths = frozenset(settings.TIMEOUTS.DEADLINE_EXEMPT_PATHS)
+        self.route_budgets = sorted(
+            settings.TIMEOUTS.ROUTE_BUDGETS_MS.items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+        token = set_deadline(self._budget_ms(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_deadline(token)
+
+    def _budget_ms(self, scope: Scope) -> float:
+        aws_context = scope.get("aws.context")
+        if aws_context is not None:
+            remaining: float = aws_context.get_remaining_time_in_millis()
+            return remaining - settings.TIMEOUTS.LAMBDA_SAFETY_MARGIN_MS
+        for prefix, budget_ms in self.route_budgets:
+            if scope["path"].startswith(prefix):
+                return budget_ms
+        return settings.TIMEOUTS.REQUEST_BUDGET_MS
@@ -0,0 +1,122 @@
+import hashlib
+
+from fastapi import Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from redis.exceptions import RedisError
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from core.settings import settings
+from shared.base_contextvars import ctx_caller_id
+from shared.base_internal_codes import CommonInternalCode
+from shared.base_responses import create_response_for_fast_api
+from shared.caller import caller_id
+from shared.idempotency import IdempotencyStore, StoredResponse
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """
+    Replays the stored response of a request already executed with the
+    same Idempotency-Key by the same caller, so client retries do not run
+    the write again and one caller can never replay another's response.
+    Concurrent duplicates wait for the one holding the lock. 5xx responses
+    are not stored so they can be retried. If Redis is unreachable the
+    request runs without idempotency protection.
+    """
+
+    store = IdempotencyStore(
+        ttl_seconds=settings.IDEMPOTENCY.TTL_SECONDS,
+        lock_ttl_seconds=settings.IDEMPOTENCY.LOCK_TTL_SECONDS,
+        poll_interval_ms=settings.IDEMPOTENCY.POLL_INTERVAL_MS,
+    )
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if (
+            not settings.IDEMPOTENCY.ENABLED
+            or not idempotency_key
+            or request.method not in settings.IDEMPOTENCY.METHODS
+        ):
+            return await call_next(request)
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            return create_response_for_fast_api(
+                status_code_http=status.HTTP_400_BAD_REQUEST,
+                data={"detail": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"},
+            )
+
+        body = await request.body()
+        caller = ctx_caller_id.get() or caller_id(request.scope)
+        key = f"{caller}:{request.method}:{request.url.path}:{idempotency_key}"
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        try:
+            stored = await run_in_threadpool(self.store.get, key)
+            token = None if stored else await run_in_threadpool(self.store.acquire, key)
+            if stored is None and token is None:
+                stored = await run_in_threadpool(
+                    self.store.wait, key, settings.IDEMPOTENCY.WAIT_TIMEOUT_SECONDS
+                )
+                if stored is None:
+                    token = await run_in_threadpool(self.store.acquire, key)
+        except RedisError as exc:
+            logger.warning(f"Idempotency store unavailable, executing request without it: {exc}")
+            return await call_next(request)
+
+        if stored is not None:
+            return self._replay(stored, fingerprint)
+        if token is None:
+            return create_response_for_fast_api(
+                status_code_http=status.HTTP_409_CONFLICT,
+                error_code=CommonInternalCode.IDEMPOTENCY_KEY_IN_PROGRESS,
+            )
+
+        try:
+            response = await call_next(request)
+            # call_next always returns a streaming response
+            response_body = b"".join([chunk async for chunk in response.body_iterator])  # type: ignore[attr-defined]
+            headers = [(name, value) for name, value in response.headers.items() if name != "content-length"]
+            if response.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR:
+                await self._save(key, StoredResponse(
+                    fingerprint=fingerprint,
+                    status_code=response.status_code,
+                    headers=headers,
+                    body=response_body,
+                ))
+        finally:
+            await self._release(key, token)
+
+        return _rebuild(response_body, response.status_code, headers)
+
+    async def _save(self, key: str, response: StoredResponse) -> None:
+        try:
+            await run_in_threadpool(self.store.save, key, response)
+        except RedisError as exc:
+            logger.warning(f"Could not store idempotent response for {key}: {exc}")
+
+    async def _release(self, key: str, token: str) -> None:
+        try:
+            await run_in_threadpool(self.store.release, key, token)
+        except RedisError as exc:
+            logger.warning(f"Could not release idempotency lock for {key}: {exc}")
+
+    @staticmethod
+    def _replay(stored: StoredResponse, fingerprint: str) -> Response:
+        if stored.fingerprint != fingerprint:
+            return create_response_for_fast_api(
+                status_code_http=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                error_code=CommonInternalCode.IDEMPOTENCY_KEY_REUSED,
+            )
+        return _rebuild(stored.body, stored.status_code, [*stored.headers, (REPLAYED_HEADER, "true")])
+
+
+def _rebuild(body: bytes, status_code: int, headers: list[tuple[str, str]]) -> Response:
+    """Response with `headers` appended one by one, so repeated ones (Set-Cookie) are all kept."""
+    response = Response(content=body, status_code=status_code)
+    for name, value in headers:
+        response.headers.append(name, value)
+    return response
@@ -0,0 +1,83 @@
+from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from redis.exceptions import RedisError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.settings import settings
+from shared.base_contextvars import ctx_caller_id
+from shared.base_internal_codes import CommonInternalCode
+from shared.base_responses import create_response_for_fast_api
+from shared.caller import caller_id
+from shared.load_shedding import Admission, LoadShedder, RedisTokenBucket
+
+load_shedder = LoadShedder(
+    max_in_flight=settings.LOAD_SHEDDING.MAX_IN_FLIGHT,
+    max_queue=settings.LOAD_SHEDDING.MAX_QUEUE,
+    max_queue_wait_ms=settings.LOAD_SHEDDING.MAX_QUEUE_WAIT_MS,
+    target_queue_wait_ms=settings.LOAD_SHEDDING.TARGET_QUEUE_WAIT_MS,
+)
+rate_limiter = RedisTokenBucket(
+    rate_per_second=settings.LOAD_SHEDDING.RATE_LIMIT_PER_SECOND,
+    burst=settings.LOAD_SHEDDING.RATE_LIMIT_BURST,
+)
+
+
+class LoadSheddingMiddleware:
+    """
+    Limits concurrent DB-bound requests per process and sheds the excess
+    with 503 + Retry-After instead of letting every request open its own
+    Postgres connection. Optionally enforces a per-caller Redis token bucket,
+    keyed by the authenticated subject or, without one, the client address.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.path_prefixes = tuple(settings.LOAD_SHEDDING.PATH_PREFIXES)
+        self.excluded_paths = frozenset(settings.LOAD_SHEDDING.EXCLUDED_PATHS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.LOAD_SHEDDING.ENABLED
+            or not scope["path"].startswith(self.path_prefixes)
+            or scope["path"] in self.excluded_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if settings.LOAD_SHEDDING.RATE_LIMIT_ENABLED:
+            retry_after_ms = await self._consume_token(scope)
+            if retry_after_ms:
+                load_shedder.count_rate_limited()
+                response = create_response_for_fast_api(
+                    status_code_http=status.HTTP_429_TOO_MANY_REQUESTS,
+                    error_code=CommonInternalCode.RATE_LIMITED,
+                )
+                response.headers["Retry-After"] = str(max(1, -(-retry_after_ms // 1000)))
+                await response(scope, receive, send)
+                return
+
+        admission = await load_shedder.acquire()
+        if admission is not Admission.ADMITTED:
+            response = create_response_for_fast_api(
+                status_code_http=status.HTTP_503_SERVICE_UNAVAILABLE,
+                error_code=CommonInternalCode.SERVICE_OVERLOADED,
+                data={"reason": admission.value},
+            )
+            response.headers["Retry-After"] = str(load_shedder.retry_after_seconds())
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            load_shedder.release()
+
+    @staticmethod
+    async def _consume_token(scope: Scope) -> int:
+        try:
+            return await run_in_threadpool(rate_limiter.consume, ctx_caller_id.get() or caller_id(scope))
+        except RedisError as exc:
+            logger.warning(f"Rate limiter unavailable, allowing request: {exc}")
+            return 0
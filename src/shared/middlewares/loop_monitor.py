@@ -0,0 +1,27 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.settings import settings
+from shared.loop_monitor import LoopMonitor
+
+loop_monitor = LoopMonitor(
+    interval_ms=settings.LOOP_MONITOR.INTERVAL_MS,
+    block_threshold_ms=settings.LOOP_MONITOR.BLOCK_THRESHOLD_MS,
+)
+
+
+class LoopMonitorMiddleware:
+    """Attaches LoopMonitor to the running loop; installed only when LOOP_MONITOR.ENABLED."""
+
+    def __init__(self, app: ASGIApp, monitor: LoopMonitor = loop_monitor) -> None:
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.monitor.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.exit()
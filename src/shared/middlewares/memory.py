@@ -0,0 +1,29 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.settings import settings
+from shared.memory import MemoryTracker
+
+memory_tracker = MemoryTracker(
+    diff_every=settings.MEMORY.DIFF_EVERY,
+    top_n=settings.MEMORY.TOP_N,
+    growth_warning_mb=settings.MEMORY.GROWTH_WARNING_MB,
+    tracemalloc_frames=settings.MEMORY.TRACEMALLOC_FRAMES,
+)
+
+
+class MemoryMiddleware:
+    """Feeds MemoryTracker; installed only when MEMORY.TRACKING_ENABLED (tracemalloc is not free)."""
+
+    def __init__(self, app: ASGIApp, tracker: MemoryTracker = memory_tracker) -> None:
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = self.tracker.begin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.tracker.end(getattr(scope.get("route"), "path", "unmatched"), started)
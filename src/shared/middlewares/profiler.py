@@ -0,0 +1,67 @@
+import random
+import re
+import threading
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.settings import settings
+from shared.profiler import SamplingProfiler, verify_profile_token
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+
+
+def profiling_enabled() -> bool:
+    return settings.LOG.PROFILE_SAMPLE_RATE > 0 or bool(settings.LOG.PROFILE_SECRET)
+
+
+class ProfilerMiddleware:
+    """
+    Profiles a request when it carries a valid X-Profile-Token or falls in
+    LOG.PROFILE_SAMPLE_RATE. Only one profile runs at a time. The file name
+    is returned in X-Profile-File and logged.
+    Only installed when profiling_enabled(), so it costs nothing otherwise.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._busy = threading.Lock()
+
+    def _should_profile(self, scope: Scope) -> bool:
+        token = Headers(scope=scope).get(PROFILE_TOKEN_HEADER)
+        if token and settings.LOG.PROFILE_SECRET:
+            return verify_profile_token(settings.LOG.PROFILE_SECRET, scope["path"], token)
+        return random.random() < settings.LOG.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{scope['method']}{scope['path']}")[:100]
+        file_name = f"{int(time.time() * 1000)}-{name}.collapsed"
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-file", file_name.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler(
+            interval_ms=settings.LOG.PROFILE_INTERVAL_MS,
+            max_seconds=settings.LOG.PROFILE_MAX_SECONDS,
+            max_samples=settings.LOG.PROFILE_MAX_SAMPLES,
+        )
+        try:
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # Joining the sampler and writing the file must not block the event loop
+                await run_in_threadpool(profiler.stop)
+        finally:
+            self._busy.release()
+        path = await run_in_threadpool(profiler.write, settings.LOG.PROFILE_DIR, file_name, settings.LOG.PROFILE_MAX_FILES)
+        logger.info(f"Profile of {scope['method']} {scope['path']} written to {path} ({profiler.samples} samples)")
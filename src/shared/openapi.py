@@ -0,0 +1,116 @@
+import gzip
+import hashlib
+import inspect
+import json
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from fastapi import APIRouter, Request, Response
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
+from fastapi.responses import HTMLResponse
+from fastapi.routing import APIRoute
+from loguru import logger
+from starlette.routing import BaseRoute
+
+OPENAPI_URL = "/openapi.json"
+OAUTH2_REDIRECT_URL = "/docs/oauth2-redirect"
+ROUTE_TABLE_KEY = "x-route-table"
+
+
+def encode_schema(schema: dict[str, Any]) -> bytes:
+    """Canonical encoding shared by the build command and the runtime fallback."""
+    return json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def route_table_hash(routes: Iterable[BaseRoute]) -> str:
+    """
+    Fingerprint of the documented routes (path, methods, endpoint and its
+    signature), cheap to compute at startup unlike the schema itself.
+    """
+    table = sorted(
+        (
+            route.path,
+            ",".join(sorted(route.methods)),
+            f"{route.endpoint.__module__}.{route.endpoint.__qualname__}{inspect.signature(route.endpoint)}",
+        )
+        for route in routes
+        if isinstance(route, APIRoute) and route.include_in_schema
+    )
+    return hashlib.sha256(json.dumps(table).encode()).hexdigest()[:32]
+
+
+class OpenAPIDocument:
+    """OpenAPI schema pre-encoded as plain and gzip bytes, with a strong ETag."""
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.schema: dict[str, Any] = json.loads(body)
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    @classmethod
+    def from_schema(cls, schema: dict[str, Any]) -> "OpenAPIDocument":
+        return cls(encode_schema(schema))
+
+    @classmethod
+    def from_file(cls, path: Path, expected: dict[str, Any]) -> "OpenAPIDocument | None":
+        """
+        Loads a schema written by `commands.build_openapi`. Returns None when
+        the file is missing or was built for other `info`/`servers` values
+        or another route table.
+        """
+        if not path.exists():
+            return None
+        document = cls(path.read_bytes())
+        mismatched = [key for key, value in expected.items() if document.schema.get(key) != value]
+        if mismatched:
+            logger.warning(f"Ignoring {path}, built with different {', '.join(mismatched)}")
+            return None
+        return document
+
+    def response(self, request: Request) -> Response:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": "public, max-age=0, must-revalidate",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(
+                self.gzip_body,
+                media_type="application/json",
+                headers={**headers, "Content-Encoding": "gzip"},
+            )
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+def create_docs_router(title: str, get_document: Callable[[], OpenAPIDocument]) -> APIRouter:
+    """Same routes FastAPI registers for `openapi_url`, serving the cached document."""
+    router = APIRouter(include_in_schema=False)
+
+    @router.get(OPENAPI_URL)
+    async def openapi(request: Request) -> Response:
+        return get_document().response(request)
+
+    @router.get("/docs")
+    async def swagger_ui_html(request: Request) -> HTMLResponse:
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        return get_swagger_ui_html(
+            openapi_url=root_path + OPENAPI_URL,
+            title=f"{title} - Swagger UI",
+            oauth2_redirect_url=root_path + OAUTH2_REDIRECT_URL,
+        )
+
+    @router.get(OAUTH2_REDIRECT_URL)
+    async def swagger_ui_redirect() -> HTMLResponse:
+        return get_swagger_ui_oauth2_redirect_html()
+
+    @router.get("/redoc")
+    async def redoc_html(request: Request) -> HTMLResponse:
+        root_path = request.scope.get("root_path", "").rstrip("/")
+        return get_redoc_html(openapi_url=root_path + OPENAPI_URL, title=f"{title} - ReDoc")
+
+    return router
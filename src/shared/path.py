@@ -9,6 +9,9 @@ from .environment import AppEnvironment
 BASE_DIR = Path(__file__).resolve().parent.parent
 logger.debug(f"BASE_DIR resolved to: {BASE_DIR}")
 
+# OpenAPI document written at build time by `python -m commands.build_openapi`
+OPENAPI_SCHEMA_PATH = BASE_DIR / "openapi.json"
+
 # Load extra paths
 # ----------------------------------------------------------------
 LIST_PATH_TO_ADD: list[str] = [
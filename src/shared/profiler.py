@@ -0,0 +1,107 @@
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+# Leaf frames of threads that are only waiting; they are left out of the profile
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("base_events.py", "_run_once"),
+}
+
+
+def sign_profile_token(secret: str, path: str, ttl_seconds: int = 300) -> str:
+    """Builds an X-Profile-Token value that allows profiling `path` until it expires."""
+    expires = int(time.time()) + ttl_seconds
+    signature = hmac.new(secret.encode(), f"{expires}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}:{signature}"
+
+
+def verify_profile_token(secret: str, path: str, token: str) -> bool:
+    expires, _, signature = token.partition(":")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), f"{expires}:{path}".encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a daemon thread snapshots every thread's stack each
+    `interval_ms` and counts them as collapsed stacks (the format read by
+    flamegraph.pl and speedscope). Sampling stops by itself after
+    `max_seconds` or `max_samples`, which bounds its overhead and output.
+    Other requests running at the same time show up in the same profile.
+    """
+
+    def __init__(self, interval_ms: float, max_seconds: float, max_samples: int) -> None:
+        self.interval = max(interval_ms, 1) / 1000
+        self.max_seconds = max_seconds
+        self.max_samples = max_samples
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling; blocks until the sampler thread finishes its pass."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval):
+            if self.samples >= self.max_samples or time.monotonic() > deadline:
+                return
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+                if leaf in IDLE_FRAMES:
+                    continue
+                stack = []
+                current: FrameType | None = frame
+                while current is not None:
+                    stack.append(_frame_label(current))
+                    current = current.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write(self, directory: str, file_name: str, max_files: int) -> Path:
+        """Writes the collapsed stacks and keeps only the newest `max_files` profiles."""
+        folder = Path(directory)
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / file_name
+        path.write_text(self.collapsed())
+        profiles = sorted(folder.glob("*.collapsed"), key=lambda item: item.stat().st_mtime)
+        for old in profiles[:-max_files]:
+            old.unlink(missing_ok=True)
+        return path
@@ -0,0 +1,181 @@
+import threading
+import time
+import uuid
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+from loguru import logger
+from redis.exceptions import RedisError
+
+from db.redis import RedisConnection
+
+T = TypeVar("T")
+
+# Deletes the lock only if it still belongs to the caller
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+    The first caller (leader) runs `fn`; callers arriving while it is in
+    flight wait and receive the same result or exception.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            result: T = call.result
+            return result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+class RedisSingleFlight:
+    """
+    Coalesces cache misses across containers. The container that wins
+    the Redis lock runs `fn` and publishes the serialized result for
+    `result_ttl_ms`; the others poll for it until `wait_timeout_ms`.
+    Any Redis failure degrades to calling `fn` directly.
+    Published results are tracked in an index set so writers can drop
+    them all with `invalidate`.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        lock_ttl_ms: int,
+        result_ttl_ms: int,
+        wait_timeout_ms: int,
+        poll_interval_ms: int,
+    ) -> None:
+        self.namespace = namespace
+        self.lock_ttl_ms = lock_ttl_ms
+        self.result_ttl_ms = result_ttl_ms
+        self.wait_timeout_ms = wait_timeout_ms
+        self.poll_interval_ms = poll_interval_ms
+        self.index_key = f"single-flight:{namespace}:index"
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], T],
+        dumps: Callable[[T], str],
+        loads: Callable[[str], T],
+    ) -> T:
+        value_key = f"single-flight:{self.namespace}:value:{key}"
+        lock_key = f"single-flight:{self.namespace}:lock:{key}"
+        try:
+            client = RedisConnection.get_client()
+            cached = client.get(value_key)
+            if cached is not None:
+                return loads(cached)
+            token = uuid.uuid4().hex
+            acquired = client.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+            # A leader may have published and released between the two calls
+            cached = client.get(value_key) if acquired else None
+        except RedisError as exc:
+            logger.warning(f"Redis single-flight unavailable for {key}: {exc}")
+            return fn()
+
+        if cached is not None:
+            self._release(lock_key, token)
+            return loads(cached)
+        if acquired:
+            try:
+                result = fn()
+                self._publish(value_key, dumps(result))
+                return result
+            finally:
+                self._release(lock_key, token)
+
+        return self._wait(key, value_key, lock_key, fn, loads)
+
+    def _wait(
+        self,
+        key: str,
+        value_key: str,
+        lock_key: str,
+        fn: Callable[[], T],
+        loads: Callable[[str], T],
+    ) -> T:
+        client = RedisConnection.get_client()
+        deadline = time.monotonic() + self.wait_timeout_ms / 1000
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval_ms / 1000)
+                cached = client.get(value_key)
+                if cached is not None:
+                    return loads(cached)
+                if not client.exists(lock_key):
+                    # The leader may have published right before releasing
+                    cached = client.get(value_key)
+                    if cached is not None:
+                        return loads(cached)
+                    break  # leader failed without publishing a result
+        except RedisError as exc:
+            logger.warning(f"Redis single-flight wait failed for {key}: {exc}")
+        return fn()
+
+    def invalidate(self) -> None:
+        try:
+            client = RedisConnection.get_client()
+            value_keys = client.smembers(self.index_key)
+            client.delete(self.index_key, *value_keys)
+        except RedisError as exc:
+            logger.warning(f"Could not invalidate single-flight namespace {self.namespace}: {exc}")
+
+    def _publish(self, value_key: str, value: str) -> None:
+        try:
+            pipeline = RedisConnection.get_client().pipeline(transaction=False)
+            pipeline.set(value_key, value, px=self.result_ttl_ms)
+            pipeline.sadd(self.index_key, value_key)
+            pipeline.pexpire(self.index_key, self.lock_ttl_ms + self.result_ttl_ms)
+            pipeline.execute()
+        except RedisError as exc:
+            logger.warning(f"Could not publish single-flight result {value_key}: {exc}")
+
+    @staticmethod
+    def _release(lock_key: str, token: str) -> None:
+        try:
+            RedisConnection.get_client().eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except RedisError as exc:
+            logger.warning(f"Could not release single-flight lock {lock_key}: {exc}")
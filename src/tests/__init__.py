@@ -1,15 +1,12 @@
 from loguru import logger
 
 from core.settings import settings
-from db.posgresql.models.public import (  # import all models for create tables for database testing
-    Book
-)
 from shared.environment import AppEnvironment
-from tests.utils.create_databases import prepare_database
+from tests.utils.create_databases import use_worker_databases
 
 logger.info(f"Check if ENVIRONMENT=testing: {settings.ENVIRONMENT} in {AppEnvironment.TESTING.value} or {AppEnvironment.TESTING_DOCKER.value}")
 if settings.ENVIRONMENT in [AppEnvironment.TESTING.value, AppEnvironment.TESTING_DOCKER.value]:
-    logger.info("Preparing database for tests")
-    prepare_database(
+    logger.info("Preparing worker databases for tests")
+    use_worker_databases(
         schemas_to_create=["public"],
-    )
\ No newline at end of file
+    )
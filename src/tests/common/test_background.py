@@ -0,0 +1,109 @@
+import threading
+import uuid
+from unittest import TestCase
+
+from db.redis import RedisConnection
+from shared.background import BackgroundTaskQueue, RedisTaskStream, background_task
+
+calls: list[str] = []
+failures_left = {"count": 0}
+release = threading.Event()
+
+
+@background_task("tests.record")
+def record(value: str) -> None:
+    calls.append(value)
+
+
+@background_task("tests.flaky")
+def flaky(value: str) -> None:
+    if failures_left["count"] > 0:
+        failures_left["count"] -= 1
+        raise RuntimeError("transient")
+    calls.append(value)
+
+
+@background_task("tests.blocking")
+def blocking() -> None:
+    release.wait(2)
+
+
+class TestBackgroundTaskQueue(TestCase):
+
+    def setUp(self) -> None:
+        calls.clear()
+        release.clear()
+        self.tasks = BackgroundTaskQueue(mode="thread", workers=1, max_queue=1, max_retries=2, retry_backoff_ms=1)
+
+    def test_runs_after_enqueue_and_drains(self) -> None:
+        self.tasks.enqueue(record, value="a")
+        self.assertTrue(self.tasks.drain(2))
+        self.assertEqual(calls, ["a"])
+        self.assertEqual(self.tasks.stats()["completed"], 1)
+
+    def test_retries_then_gives_up(self) -> None:
+        failures_left["count"] = 2
+        self.tasks.enqueue("tests.flaky", value="ok")
+        self.tasks.drain(2)
+        self.assertEqual(calls, ["ok"])
+        self.assertEqual(self.tasks.stats()["retried"], 2)
+
+        failures_left["count"] = 10
+        self.tasks.enqueue("tests.flaky", value="never")
+        self.tasks.drain(2)
+        self.assertEqual(self.tasks.stats()["failed"], 1)
+        failures_left["count"] = 0
+
+    def fill(self, tasks: BackgroundTaskQueue) -> None:
+        tasks.enqueue(blocking)
+        while tasks.stats()["queue_depth"]:
+            pass
+        tasks.enqueue(record, value="queued")
+
+    def test_full_queue_drops_without_dead_letter_stream(self) -> None:
+        self.fill(self.tasks)
+        self.tasks.enqueue(record, value="overflow")
+        self.assertEqual(calls, [])
+        self.assertFalse(self.tasks.drain(0.05))
+
+        release.set()
+        self.assertTrue(self.tasks.drain(2))
+        self.assertEqual(calls, ["queued"])
+        self.assertEqual(self.tasks.stats()["overflow_dropped"], 1)
+
+    def test_full_queue_dead_letters_overflow(self) -> None:
+        stream = RedisTaskStream(stream=f"tests:background:{uuid.uuid4().hex}", group="workers", maxlen=100, max_retries=0)
+        tasks = BackgroundTaskQueue(mode="thread", workers=1, max_queue=1, max_retries=0, retry_backoff_ms=1, stream=stream)
+        client = RedisConnection.get_client()
+        try:
+            self.fill(tasks)
+            tasks.enqueue(record, value="overflow")
+            release.set()
+            self.assertTrue(tasks.drain(2))
+
+            self.assertEqual(calls, ["queued"])
+            [(_, fields)] = client.xrange(stream.dead_stream)
+            self.assertEqual((fields["name"], fields["kwargs"]), ("tests.record", '{"value": "overflow"}'))
+            self.assertEqual(tasks.stats()["overflow_dead_lettered"], 1)
+        finally:
+            client.delete(stream.dead_stream)
+
+    def test_redis_stream_worker(self) -> None:
+        name = f"tests:background:{uuid.uuid4().hex}"
+        stream = RedisTaskStream(stream=name, group="workers", maxlen=100, max_retries=0)
+        tasks = BackgroundTaskQueue(mode="redis", workers=1, max_queue=1, max_retries=0, retry_backoff_ms=1, stream=stream)
+        client = RedisConnection.get_client()
+        stream.ensure_group(client)
+        try:
+            tasks.enqueue(record, value="streamed")
+            failures_left["count"] = 1
+            tasks.enqueue(flaky, value="dead")
+            self.assertEqual(calls, [])
+
+            self.assertEqual(stream.consume(client, "test", block_ms=100), 2)
+            self.assertEqual(calls, ["streamed"])
+            self.assertEqual(client.xlen(stream.dead_stream), 1)
+            self.assertEqual(client.xpending(name, "workers")["pending"], 0)
+        finally:
+            failures_left["count"] = 0
+            client.delete(name, stream.dead_stream)
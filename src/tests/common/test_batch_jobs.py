@@ -0,0 +1,170 @@
+import unittest
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+import api.v1.books.jobs  # noqa: F401  registers books.copy_to_mongo
+from api.v1.books.services import BookCreateService, BookDeleteService
+from db.mongo.models.public import BookMongoRepository
+from db.posgresql import get_db_context
+from db.posgresql.models.public import BatchJobChunk, Book
+from shared.batch_jobs import BatchJobRunner, Throttle, batch_job, get_batch_job, run_chunk
+from tests.v1.test_books.utils import DBMixin
+
+
+@batch_job("tests.mark_titles", table=Book.__table__, columns=("title",))
+def mark_titles(session: Session, rows: list[dict[str, Any]]) -> None:
+    for row in rows:
+        if row["title"].startswith("boom"):
+            raise ValueError("bad row")
+        session.execute(update(Book).where(Book.id == row["id"]).values(title=row["title"] + "!"))
+
+
+setup_calls: list[str] = []
+
+
+@batch_job("tests.touch_books", table=Book.__table__, columns=(), setup=lambda: setup_calls.append("setup"))
+def touch_books(session: Session, rows: list[dict[str, Any]]) -> None:
+    pass
+
+
+class TestBatchJobRunner(DBMixin, unittest.TestCase):
+    # Chunks run in worker processes, with their own connections
+    committing = True
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.runner = BatchJobRunner(
+            job=get_batch_job("tests.mark_titles"),
+            run_id="tests",
+            chunk_size=10,
+            page_size=4,
+            workers=2,
+            throttle=Throttle(),
+            progress_interval_seconds=0.1,
+        )
+        self.runner.reset()
+
+    def tearDown(self) -> None:
+        self.runner.reset()
+        super().tearDown()
+
+    def create_books(self, count: int, prefix: str = "Book") -> None:
+        for number in range(count):
+            BookCreateService.create(self.create_schema(title=f"{prefix} {number:02d}"))
+
+    def titles(self) -> list[str]:
+        with get_db_context() as session:
+            return sorted(session.scalars(select(Book.title)))
+
+    def test_chunks_cover_the_table_once(self) -> None:
+        self.create_books(25)
+
+        progress = self.runner.run()
+
+        self.assertEqual(progress["chunks"], 3)
+        self.assertEqual((progress["done"], progress["failed"], progress["rows"]), (3, 0, 25))
+        self.assertTrue(all(title.endswith("!") and not title.endswith("!!") for title in self.titles()))
+
+    def test_rerun_resumes_from_the_checkpoints(self) -> None:
+        self.create_books(25)
+        self.runner.plan()
+        run_chunk("tests.mark_titles", "tests", 0, 4, Throttle())
+        # Chunk 1 was interrupted after its first page
+        with get_db_context() as session:
+            chunk = session.get(BatchJobChunk, ("tests", 1))
+            first_page = session.scalars(
+                select(Book.id).where(Book.id >= chunk.start_id).order_by(Book.id).limit(4)
+            ).all()
+            session.execute(update(Book).where(Book.id.in_(first_page)).values(title=Book.title + "!"))
+            session.execute(
+                update(BatchJobChunk)
+                .where(BatchJobChunk.run_id == "tests", BatchJobChunk.chunk == 1)
+                .values(status="running", last_id=first_page[-1], rows=4)
+            )
+            session.commit()
+
+        progress = self.runner.run()
+
+        self.assertEqual((progress["done"], progress["rows"]), (3, 25))
+        self.assertTrue(all(title.endswith("!") and not title.endswith("!!") for title in self.titles()))
+
+    def test_failed_chunk_does_not_stop_the_others(self) -> None:
+        self.create_books(20)
+        self.create_books(1, prefix="boom")
+
+        progress = self.runner.run()
+
+        self.assertEqual((progress["done"], progress["failed"]), (2, 1))
+        with get_db_context() as session:
+            error = session.scalar(select(BatchJobChunk.error).where(BatchJobChunk.status == "failed"))
+        self.assertIn("bad row", error)
+
+    def test_setup_runs_once_per_process(self) -> None:
+        self.create_books(25)
+        runner = BatchJobRunner(
+            job=get_batch_job("tests.touch_books"), run_id="tests.setup", chunk_size=10,
+            page_size=4, workers=1, throttle=Throttle(),
+        )
+        self.addCleanup(runner.reset)
+        # Three chunks of several pages each, all in this process
+        for chunk in range(runner.plan()):
+            run_chunk("tests.touch_books", "tests.setup", chunk, 4, Throttle())
+
+        self.assertEqual(setup_calls, ["setup"])
+        self.assertEqual(runner.progress()["rows"], 25)
+
+
+class TestCopyBooksToMongodb(DBMixin, unittest.TestCase):
+    committing = True
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.collection = BookMongoRepository().collection
+        self.collection.delete_many({})
+        self.runner = BatchJobRunner(
+            job=get_batch_job("books.copy_to_mongo"),
+            run_id="tests",
+            chunk_size=10,
+            page_size=2,
+            workers=1,
+            throttle=Throttle(),
+            progress_interval_seconds=0.1,
+        )
+        self.runner.reset()
+
+    def tearDown(self) -> None:
+        self.runner.reset()
+        self.collection.delete_many({})
+        super().tearDown()
+
+    def test_copies_live_books_and_tombstones(self) -> None:
+        books = [BookCreateService.create(self.create_schema(title=f"Book {number}")) for number in range(5)]
+        BookDeleteService.delete(books[0].id)
+
+        progress = self.runner.run()
+
+        self.assertEqual((progress["done"], progress["failed"], progress["rows"]), (1, 0, 5))
+        documents = {document["id"]: document for document in self.collection.find({}, {"_id": 0})}
+        self.assertEqual(set(documents), {str(book.id) for book in books})
+        self.assertEqual(documents[str(books[1].id)]["title"], "Book 1")
+        self.assertIsNotNone(documents[str(books[0].id)]["deleted_at"])
+        self.assertTrue(all(documents[str(book.id)]["deleted_at"] is None for book in books[1:]))
+
+    def test_rerun_upserts_without_duplicates(self) -> None:
+        book = BookCreateService.create(self.create_schema(title="Before"))
+        self.runner.run()
+        with get_db_context() as session:
+            session.execute(update(Book).where(Book.id == book.id).values(title="After"))
+            session.commit()
+        self.runner.reset()
+
+        self.runner.run()
+
+        self.assertEqual(self.collection.count_documents({}), 1)
+        self.assertEqual(self.collection.find_one({"id": str(book.id)})["title"], "After")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from benchmarks.common import LatencyRecorder, find_regressions, percentile
+from benchmarks.events import LambdaContext, http_api_v2_event
+from main import handler
+
+
+class TestBenchmarkHelpers(TestCase):
+
+    def test_nearest_rank_percentiles(self) -> None:
+        samples = [float(n) for n in range(1, 101)]
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 95), 95)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([], 99), 0)
+
+    def test_regressions_above_threshold(self) -> None:
+        recorder = LatencyRecorder("GET /v1/books")
+        for elapsed in (10, 10, 10, 10):
+            recorder.record(elapsed)
+        baseline = {recorder.name: recorder.result().to_dict()}
+
+        slower = {recorder.name: {**baseline[recorder.name], "p95_ms": 11.5}}
+        self.assertEqual(find_regressions(slower, baseline, threshold=0.2), [])
+        slower[recorder.name]["p95_ms"] = 13
+        self.assertEqual(len(find_regressions(slower, baseline, threshold=0.2)), 1)
+
+    def test_synthetic_event_goes_through_mangum(self) -> None:
+        response = handler(http_api_v2_event("GET", "/"), LambdaContext())
+        self.assertEqual(response["statusCode"], 200)
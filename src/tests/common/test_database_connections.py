@@ -1,9 +1,16 @@
 from unittest import TestCase
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import DBAPIError
 from pymongo import MongoClient
 from redis import Redis
 import os
+import uuid
 from core.settings import settings
+from db.posgresql import get_db_context
+from db.posgresql.models.public import BatchJobChunk, Book, BookType
+from tests.utils.create_databases import WORKER_DATABASE_ENV
+from tests.utils.transactions import rollback_after
+from tests.v1.test_books.utils import DBMixin
 
 class TestDatabaseConnections(TestCase):
 
@@ -16,6 +23,11 @@ class TestDatabaseConnections(TestCase):
             self.assertTrue(result.fetchone()[0] == 1) # type: ignore
         engine.dispose()
 
+    def test_sessions_run_in_utc(self) -> None:
+        # The catalog compares naive created_at values as UTC
+        with get_db_context() as session:
+            self.assertEqual(session.execute(text("SHOW TimeZone")).scalar(), "UTC")
+
     def test_mongodb_connection(self) -> None:
         client = MongoClient(settings.MONGO_URL.unicode_string()) # type: ignore
         server_info = client.server_info()
@@ -25,4 +37,43 @@ class TestDatabaseConnections(TestCase):
     def test_redis_connection(self) -> None:
         redis = Redis.from_url(settings.REDIS_URL.unicode_string())
         self.assertTrue(redis.ping())
-        redis.close()
\ No newline at end of file
+        redis.close()
+
+class TestWorkerDatabases(TestCase):
+
+    def count_titled(self, title: str) -> int:
+        with get_db_context() as session:
+            return session.scalar(select(func.count()).select_from(Book).where(Book.title == title))
+
+    def test_runs_on_its_own_clone(self) -> None:
+        with get_db_context() as session:
+            database = session.execute(text("SELECT current_database()")).scalar()
+        self.assertEqual(database, os.environ[WORKER_DATABASE_ENV])
+        self.assertRegex(database, r"_(main|gw\d+)$")
+
+    def test_commits_inside_rollback_after_are_undone(self) -> None:
+        title = f"rollback {uuid.uuid4()}"
+        with rollback_after():
+            with get_db_context() as session:
+                session.add(Book(title=title, author="Ada", year=1843, type=BookType.ONLINE))
+                session.commit()
+            with get_db_context() as session:
+                session.add(Book(title=title, author="Ada", year=2**40, type=BookType.ONLINE))
+                with self.assertRaises(DBAPIError):
+                    session.commit()
+            # The failed commit only rolled back its own savepoint
+            self.assertEqual(self.count_titled(title), 1)
+
+        self.assertEqual(self.count_titled(title), 0)
+
+    def test_committing_cleanup_empties_every_model_table(self) -> None:
+        with get_db_context() as session:
+            session.add(Book(title="left over", author="Ada", year=1843, type=BookType.ONLINE))
+            session.add(BatchJobChunk(run_id="left-over", chunk=0, job="tests", status="pending"))
+            session.commit()
+
+        DBMixin._truncate_tables()
+
+        with get_db_context() as session:
+            self.assertEqual(session.scalar(select(func.count()).select_from(Book)), 0)
+            self.assertEqual(session.scalar(select(func.count()).select_from(BatchJobChunk)), 0)
@@ -0,0 +1,99 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from shared.base_exceptions import DeadlineExceededException
+from shared.deadline import remaining_ms, reset_deadline, set_deadline
+from shared.group_commit import GroupCommitter
+
+
+class TestGroupCommitter(TestCase):
+
+    def test_concurrent_submits_share_batches_and_keep_their_results(self) -> None:
+        batches: list[list[int]] = []
+        release = threading.Event()
+
+        def execute(items: list[int]) -> list[int]:
+            release.wait(1)
+            batches.append(items)
+            return [item * 10 for item in items]
+
+        committer: GroupCommitter[int, int] = GroupCommitter("test", execute, window_ms=20, max_batch=8)
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            futures = [pool.submit(committer.submit, item) for item in range(20)]
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, [item * 10 for item in range(20)])
+        self.assertLess(len(batches), 20)
+        self.assertLessEqual(max(len(batch) for batch in batches), 8)
+
+    def test_failing_item_only_fails_its_caller(self) -> None:
+        def execute(items: list[int]) -> list[int]:
+            if 3 in items:
+                raise ValueError("bad item")
+            return items
+
+        committer: GroupCommitter[int, int] = GroupCommitter("test", execute, window_ms=20, max_batch=10)
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            futures = {item: pool.submit(committer.submit, item) for item in range(6)}
+
+        for item, future in futures.items():
+            if item == 3:
+                self.assertIsInstance(future.exception(), ValueError)
+            else:
+                self.assertEqual(future.result(), item)
+
+    @staticmethod
+    def submit_with_deadline(committer: GroupCommitter[int, int], item: int, budget_ms: float) -> int:
+        token = set_deadline(budget_ms)
+        try:
+            return committer.submit(item)
+        finally:
+            reset_deadline(token)
+
+    def test_caller_stops_waiting_at_its_deadline(self) -> None:
+        def execute(items: list[int]) -> list[int]:
+            time.sleep(0.5)
+            return items
+
+        committer: GroupCommitter[int, int] = GroupCommitter("test", execute, window_ms=1, max_batch=10)
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceededException):
+            self.submit_with_deadline(committer, 1, 50)
+        self.assertLess(time.monotonic() - started, 0.4)
+
+    def test_batch_runs_under_the_callers_deadline(self) -> None:
+        seen: list[float | None] = []
+
+        def execute(items: list[int]) -> list[int]:
+            seen.append(remaining_ms())
+            return items
+
+        committer: GroupCommitter[int, int] = GroupCommitter("test", execute, window_ms=1, max_batch=10)
+        self.assertEqual(self.submit_with_deadline(committer, 1, 1000), 1)
+        self.assertEqual(committer.submit(2), 2)
+        self.assertLessEqual(seen[0], 1000)
+        self.assertIsNone(seen[1])
+
+    def test_items_without_a_result_fail(self) -> None:
+        committer: GroupCommitter[int, int] = GroupCommitter("test", lambda items: items[:1], window_ms=200, max_batch=2)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(committer.submit, item) for item in range(2)]
+
+        errors = [future.exception() for future in futures]
+        self.assertEqual(sum(isinstance(error, RuntimeError) for error in errors), 1)
+        self.assertEqual(sum(error is None for error in errors), 1)
+
+    def test_writer_survives_unexpected_errors(self) -> None:
+        calls: list[list[int]] = []
+
+        def execute(items: list[int]) -> list[int]:
+            calls.append(items)
+            return None if len(calls) == 1 else items  # type: ignore[return-value]
+
+        committer: GroupCommitter[int, int] = GroupCommitter("test", execute, window_ms=1, max_batch=10)
+        with self.assertRaises(TypeError):
+            committer.submit(1)
+        self.assertEqual(committer.submit(2), 2)
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+from typing import Any
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from mangum import Mangum
+
+from benchmarks.events import LambdaContext
+from main import app
+from shared.lambda_adapter import STREAMING_PRELUDE_DELIMITER, LambdaAdapter
+from shared.lambda_runtime import RuntimeClient, run
+from tests.v1.test_books.utils import DBMixin
+
+SAMPLES_DIR = Path(__file__).resolve().parents[2] / "benchmarks" / "samples"
+
+
+def load_sample(name: str) -> dict[str, Any]:
+    event: dict[str, Any] = json.loads((SAMPLES_DIR / f"{name}.json").read_text())
+    return event
+
+
+class TestLambdaAdapter(DBMixin, TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.mangum = Mangum(app, lifespan="off")
+        self.adapter = LambdaAdapter(app, fallback=self.mangum)
+
+    def test_matches_mangum_response(self) -> None:
+        event = load_sample("http_api_v2_get_index")
+        expected = self.mangum(load_sample("http_api_v2_get_index"), LambdaContext())
+        response = self.adapter(event, LambdaContext())
+
+        self.assertEqual(response["statusCode"], expected["statusCode"])
+        self.assertEqual(json.loads(response["body"]), json.loads(expected["body"]))
+        self.assertEqual(response["headers"]["content-type"], expected["headers"]["content-type"])
+
+    def test_function_url_event_with_query_and_base64_body(self) -> None:
+        created = self.adapter(load_sample("http_api_v2_post_book"), LambdaContext())
+        self.assertEqual(created["statusCode"], 201)
+        book_id = json.loads(created["body"])["data"]["id"]
+
+        listed = self.adapter(load_sample("function_url_get_books"), LambdaContext())
+        self.assertEqual(listed["statusCode"], 200)
+        books = json.loads(listed["body"])["data"]
+        self.assertIn({"id": book_id, "title": "Dune"}, books)
+
+    def test_other_events_fall_back_to_mangum(self) -> None:
+        calls = []
+        adapter = LambdaAdapter(app, fallback=lambda event, context: calls.append(event) or {"statusCode": 204})
+        event = {"Records": [{"eventSource": "aws:sqs"}]}
+        self.assertEqual(adapter(event, LambdaContext()), {"statusCode": 204})
+        self.assertEqual(calls, [event])
+
+    def test_streams_chunks_after_prelude(self) -> None:
+        streaming_app = FastAPI()
+
+        @streaming_app.get("/export")
+        def export() -> StreamingResponse:
+            return StreamingResponse((f"{n}\n" for n in range(3)), media_type="application/x-ndjson")
+
+        event = load_sample("http_api_v2_get_index")
+        event["rawPath"] = "/export"
+        chunks: list[bytes] = []
+        LambdaAdapter(streaming_app, fallback=Mangum(streaming_app)).stream(event, LambdaContext(), chunks.append)
+
+        prelude, delimiter = chunks[0][: -len(STREAMING_PRELUDE_DELIMITER)], chunks[0][-8:]
+        self.assertEqual(delimiter, STREAMING_PRELUDE_DELIMITER)
+        self.assertEqual(json.loads(prelude)["statusCode"], 200)
+        self.assertEqual(chunks[1:], [b"0\n", b"1\n", b"2\n"])
+
+    def test_runtime_runs_the_finish_hook_after_streaming(self) -> None:
+        class Stop(Exception):
+            pass
+
+        invocations = [(load_sample("http_api_v2_get_index"), LambdaContext())]
+        finished: list[LambdaContext] = []
+
+        def next_invocation(_client: RuntimeClient) -> tuple[dict[str, Any], LambdaContext]:
+            if not invocations:
+                raise Stop
+            return invocations.pop()
+
+        def stream_response(
+            _client: RuntimeClient, request_id: str, adapter: LambdaAdapter, event: dict[str, Any], context: LambdaContext,
+        ) -> None:
+            raise ConnectionError("runtime API went away")
+
+        with (
+            patch.object(RuntimeClient, "next_invocation", next_invocation),
+            patch.object(RuntimeClient, "stream_response", stream_response),
+            patch.object(RuntimeClient, "post_error"),
+            self.assertRaises(Stop),
+        ):
+            run(self.adapter, handler=self.mangum, finish=finished.append, runtime_api="localhost:0")
+        self.assertEqual(len(finished), 1)
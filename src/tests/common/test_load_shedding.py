@@ -0,0 +1,73 @@
+import asyncio
+import uuid
+from unittest import TestCase
+from starlette.types import Receive, Scope, Send
+
+from shared.base_contextvars import ctx_caller_id
+from shared.load_shedding import Admission, LoadShedder, RedisTokenBucket
+from shared.middlewares import CallerMiddleware
+
+
+class TestLoadShedder(TestCase):
+
+    def test_queues_then_sheds_when_queue_is_full(self) -> None:
+        shedder = LoadShedder(max_in_flight=1, max_queue=1, max_queue_wait_ms=1000, target_queue_wait_ms=1000)
+
+        async def scenario() -> list[Admission]:
+            first = await shedder.acquire()
+            queued = asyncio.create_task(shedder.acquire())
+            await asyncio.sleep(0.01)
+            rejected = await shedder.acquire()
+            shedder.release()
+            return [first, await queued, rejected]
+
+        self.assertEqual(
+            asyncio.run(scenario()),
+            [Admission.ADMITTED, Admission.ADMITTED, Admission.QUEUE_FULL],
+        )
+        stats = shedder.stats()
+        self.assertEqual(stats["in_flight"], 1)
+        self.assertEqual(stats["queued_total"], 1)
+        self.assertEqual(stats["queue_full_total"], 1)
+
+    def test_sheds_after_bounded_wait(self) -> None:
+        shedder = LoadShedder(max_in_flight=1, max_queue=4, max_queue_wait_ms=20, target_queue_wait_ms=1000)
+
+        async def scenario() -> list[Admission]:
+            return [await shedder.acquire(), await shedder.acquire()]
+
+        self.assertEqual(asyncio.run(scenario()), [Admission.ADMITTED, Admission.QUEUE_TIMEOUT])
+        self.assertEqual(shedder.stats()["queue_length"], 0)
+        self.assertGreaterEqual(shedder.retry_after_seconds(), 1)
+
+    def test_sheds_immediately_above_latency_target(self) -> None:
+        shedder = LoadShedder(max_in_flight=1, max_queue=4, max_queue_wait_ms=50, target_queue_wait_ms=1)
+
+        async def scenario() -> list[Admission]:
+            return [await shedder.acquire(), await shedder.acquire(), await shedder.acquire()]
+
+        self.assertEqual(
+            asyncio.run(scenario()),
+            [Admission.ADMITTED, Admission.QUEUE_TIMEOUT, Admission.LATENCY_TARGET],
+        )
+
+    def test_redis_token_bucket(self) -> None:
+        bucket = RedisTokenBucket(rate_per_second=1, burst=2)
+        caller = uuid.uuid4().hex
+        self.assertEqual(bucket.consume(caller), 0)
+        self.assertEqual(bucket.consume(caller), 0)
+        self.assertGreater(bucket.consume(caller), 0)
+
+    def test_caller_middleware_sets_the_caller(self) -> None:
+        seen: list[str | None] = []
+
+        async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+            seen.append(ctx_caller_id.get())
+
+        middleware = CallerMiddleware(endpoint)
+        event = {"requestContext": {"authorizer": {"jwt": {"claims": {"sub": "user-1"}}}}}
+        asyncio.run(middleware({"type": "http", "client": ("10.0.0.1", 1), "aws.event": event}, None, None))
+        asyncio.run(middleware({"type": "http", "client": ("10.0.0.1", 1)}, None, None))
+
+        self.assertEqual(seen, ["sub:user-1", "ip:10.0.0.1"])
+        self.assertIsNone(ctx_caller_id.get())
@@ -0,0 +1,91 @@
+import time
+from unittest import TestCase
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+from loguru import logger
+from sqlalchemy import text
+
+from core.settings import settings
+from db.posgresql import get_db_context
+from shared.loop_monitor import BlockingCallError, LoopMonitor
+from shared.middlewares import LoopMonitorMiddleware
+
+
+def select_one() -> int:
+    with get_db_context() as session:
+        return session.execute(text("SELECT 1")).scalar_one()
+
+
+class TestStrictMode(TestCase):
+
+    def setUp(self) -> None:
+        app = FastAPI()
+
+        @app.get("/on-loop")
+        async def on_loop() -> dict[str, int]:
+            return {"value": select_one()}
+
+        @app.get("/in-threadpool")
+        async def in_threadpool() -> dict[str, int]:
+            return {"value": await run_in_threadpool(select_one)}
+
+        self.client = TestClient(app)
+
+    def test_testing_settings_enable_strict_mode(self) -> None:
+        self.assertTrue(settings.LOOP_MONITOR.STRICT)
+
+    def test_sync_db_io_on_the_loop_fails(self) -> None:
+        with self.assertRaises(BlockingCallError):
+            self.client.get("/on-loop")
+
+    def test_sync_db_io_in_threadpool_is_allowed(self) -> None:
+        response = self.client.get("/in-threadpool")
+        self.assertEqual(response.json(), {"value": 1})
+
+    def test_sync_code_outside_the_loop_is_allowed(self) -> None:
+        self.assertEqual(select_one(), 1)
+
+
+class TestLoopMonitor(TestCase):
+
+    def setUp(self) -> None:
+        self.monitor = LoopMonitor(interval_ms=10, block_threshold_ms=50)
+        app = FastAPI()
+
+        @app.get("/blocking/{seconds}")
+        async def blocking(seconds: float) -> dict[str, float]:
+            time.sleep(seconds)
+            return {"slept": seconds}
+
+        @app.get("/cooperative/{seconds}")
+        async def cooperative(seconds: float) -> dict[str, float]:
+            await run_in_threadpool(time.sleep, seconds)
+            return {"slept": seconds}
+
+        self.client = TestClient(LoopMonitorMiddleware(app, self.monitor))
+        self.messages: list[str] = []
+        self.sink = logger.add(self.messages.append, level="WARNING")
+
+    def tearDown(self) -> None:
+        logger.remove(self.sink)
+        self.monitor.stop()
+
+    def test_reports_blocking_callback_with_route_and_stack(self) -> None:
+        with self.client as client:
+            client.get("/blocking/0.3")
+
+        self.assertEqual(self.monitor.blocked, 1)
+        self.assertGreaterEqual(self.monitor.stats()["max_lag_ms"], 200)
+        self.assertEqual(len(self.messages), 1)
+        self.assertIn("/blocking/{seconds}", self.messages[0])
+        self.assertIn("time.sleep(seconds)", self.messages[0])
+
+    def test_threadpool_work_does_not_block(self) -> None:
+        with self.client as client:
+            client.get("/cooperative/0.3")
+
+        self.assertEqual(self.monitor.blocked, 0)
+        self.assertLess(self.monitor.stats()["max_lag_ms"], 50)
+        self.assertEqual(self.messages, [])
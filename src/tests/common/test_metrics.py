@@ -0,0 +1,62 @@
+import threading
+from unittest import TestCase
+
+from fastapi.testclient import TestClient
+
+from main import app
+from shared.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(TestCase):
+
+    def test_threads_record_into_their_own_shards(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs", ("kind",))
+
+        def work() -> None:
+            for _ in range(1000):
+                counter.inc("a")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIn('jobs_total{kind="a"} 4000', registry.render_prometheus())
+
+        # Registering the main thread's shard folds the finished ones away
+        counter.inc("a")
+        self.assertEqual(len(registry._shards), 1)
+        self.assertIn('jobs_total{kind="a"} 4001', registry.render_prometheus())
+
+    def test_histogram_buckets_and_emf_deltas(self) -> None:
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3):
+            latency.observe(value, "/books")
+
+        text = registry.render_prometheus()
+        self.assertIn('latency_seconds_bucket{route="/books",le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{route="/books",le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_count{route="/books"} 4', text)
+
+        [record] = registry.emf_records("Test")
+        self.assertEqual(record["route"], "/books")
+        self.assertEqual(record["_aws"]["CloudWatchMetrics"][0]["Dimensions"], [["route"]])
+        self.assertEqual(record["latency_seconds"], {"Values": [0.1, 1.0, 1.0], "Counts": [2, 1, 1]})
+        # Only new observations are emitted on the next flush
+        self.assertEqual(registry.emf_records("Test"), [])
+
+
+class TestMetricsEndpoint(TestCase):
+
+    def test_requests_db_time_and_error_codes_are_exposed(self) -> None:
+        client = TestClient(app)
+        client.get("/v1/books")
+        client.get("/v1/books", params={"fields": "unknown"})
+
+        text = client.get("/metrics").text
+        self.assertIn('http_requests_total{method="GET",route="/v1/books",status="200"}', text)
+        self.assertIn('db_statement_duration_seconds_count{operation="SELECT"}', text)
+        self.assertIn('api_errors_total{code="1002",status="400"}', text)
@@ -0,0 +1,74 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from fastapi.testclient import TestClient
+
+from commands.build_openapi import build
+from main import app, generate_openapi, get_openapi_document
+from shared.openapi import ROUTE_TABLE_KEY, OpenAPIDocument, encode_schema, route_table_hash
+from shared.path import OPENAPI_SCHEMA_PATH
+
+
+class TestOpenAPIDocument(TestCase):
+
+    def setUp(self) -> None:
+        self.client = TestClient(app)
+
+    def test_built_file_matches_live_app(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "openapi.json"
+            body = build(path)
+            document = get_openapi_document()
+            loaded = OpenAPIDocument.from_file(path, {"info": document.schema["info"], "servers": document.schema["servers"]})
+
+        self.assertIsNotNone(loaded)
+        self.assertEqual(body, encode_schema(generate_openapi()))
+        self.assertEqual(loaded.etag, document.etag)
+        self.assertEqual(self.client.get("/openapi.json").content, body)
+
+    def test_shipped_file_is_up_to_date(self) -> None:
+        if not OPENAPI_SCHEMA_PATH.exists():
+            self.skipTest("openapi.json is generated at image build time")
+        self.assertEqual(OPENAPI_SCHEMA_PATH.read_bytes(), encode_schema(generate_openapi()))
+
+    def test_stale_file_is_ignored(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "openapi.json"
+            path.write_bytes(encode_schema({**generate_openapi(), "servers": [{"url": "/other"}]}))
+            self.assertIsNone(OpenAPIDocument.from_file(path, {"servers": generate_openapi()["servers"]}))
+
+    def test_file_for_another_route_table_is_ignored(self) -> None:
+        expected = {ROUTE_TABLE_KEY: route_table_hash(app.routes)}
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "openapi.json"
+            path.write_bytes(encode_schema({**generate_openapi(), ROUTE_TABLE_KEY: "stale"}))
+            self.assertIsNone(OpenAPIDocument.from_file(path, expected))
+            build(path)
+            self.assertIsNotNone(OpenAPIDocument.from_file(path, expected))
+
+    def test_route_table_hash_follows_routes(self) -> None:
+        @app.get("/route-table-probe")
+        async def probe(limit: int = 10) -> None:
+            pass
+
+        try:
+            with_probe = route_table_hash(app.routes)
+        finally:
+            app.router.routes.pop()
+        self.assertNotEqual(with_probe, route_table_hash(app.routes))
+
+    def test_compressed_response_and_etag(self) -> None:
+        res = self.client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers["content-encoding"], "gzip")
+        self.assertEqual(json.loads(res.content)["openapi"], "3.0.3")
+
+        cached = self.client.get("/openapi.json", headers={"If-None-Match": res.headers["etag"]})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+
+    def test_docs_pages(self) -> None:
+        self.assertIn("/openapi.json", self.client.get("/docs").text)
+        self.assertEqual(self.client.get("/redoc").status_code, 200)
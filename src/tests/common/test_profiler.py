@@ -0,0 +1,74 @@
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.settings import settings
+from shared.middlewares import ProfilerMiddleware
+from shared.profiler import sign_profile_token, verify_profile_token
+
+SECRET = "test-secret"
+
+
+def busy_loop(seconds: float) -> int:
+    total = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        total += 1
+    return total
+
+
+class TestProfilerMiddleware(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.original = settings.LOG.model_copy()
+        settings.LOG.PROFILE_SECRET = SECRET
+        settings.LOG.PROFILE_DIR = self.directory.name
+        settings.LOG.PROFILE_INTERVAL_MS = 1
+        settings.LOG.PROFILE_MAX_FILES = 2
+
+        app = FastAPI()
+
+        @app.get("/slow")
+        async def slow() -> dict[str, int]:
+            return {"iterations": busy_loop(0.1)}
+
+        app.add_middleware(ProfilerMiddleware)
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        settings.LOG = self.original
+        self.directory.cleanup()
+
+    def test_tokens_are_bound_to_path_and_expire(self) -> None:
+        token = sign_profile_token(SECRET, "/slow")
+        self.assertTrue(verify_profile_token(SECRET, "/slow", token))
+        self.assertFalse(verify_profile_token(SECRET, "/other", token))
+        self.assertFalse(verify_profile_token("wrong", "/slow", token))
+        self.assertFalse(verify_profile_token(SECRET, "/slow", sign_profile_token(SECRET, "/slow", -1)))
+
+    def test_signed_request_writes_collapsed_stacks(self) -> None:
+        res = self.client.get("/slow", headers={"X-Profile-Token": sign_profile_token(SECRET, "/slow")})
+
+        profile = Path(self.directory.name) / res.headers["x-profile-file"]
+        lines = profile.read_text().splitlines()
+        self.assertTrue(lines)
+        # Other threads of the test runner (e.g. pytest-xdist's) are sampled too
+        samples = [
+            int(count) for stack, count in (line.rsplit(" ", 1) for line in lines)
+            if "busy_loop (test_profiler.py" in stack
+        ]
+        self.assertGreater(sum(samples), 10)
+
+    def test_unsigned_request_is_not_profiled_and_files_are_capped(self) -> None:
+        self.assertNotIn("x-profile-file", self.client.get("/slow").headers)
+
+        token = sign_profile_token(SECRET, "/slow")
+        for _ in range(3):
+            self.client.get("/slow", headers={"X-Profile-Token": token})
+            time.sleep(0.002)
+        self.assertEqual(len(list(Path(self.directory.name).glob("*.collapsed"))), 2)
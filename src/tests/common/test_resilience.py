@@ -0,0 +1,155 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+
+from fastapi.testclient import TestClient
+from pymongo.errors import ExecutionTimeout, NetworkTimeout, ServerSelectionTimeoutError, WTimeoutError
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from starlette.types import Receive, Scope, Send
+
+from db.mongo.connection import mongo_circuit_breaker
+from db.posgresql import get_db_context
+from db.posgresql.connection import is_connection_failure
+from main import app
+from shared.base_exceptions import DeadlineExceededException, DependencyUnavailableException
+from shared.circuit_breaker import CircuitBreaker, CircuitState
+from shared.deadline import remaining_ms, reset_deadline, set_deadline
+from shared.middlewares import DeadlineMiddleware
+
+
+class TestCircuitBreaker(TestCase):
+
+    def setUp(self) -> None:
+        self.breaker = CircuitBreaker(
+            name="test",
+            failure_exceptions=(ConnectionError,),
+            failure_threshold=2,
+            recovery_timeout_seconds=0.05,
+            enabled=True,
+        )
+
+    def fail(self) -> None:
+        with self.assertRaises(ConnectionError), self.breaker:
+            raise ConnectionError("down")
+
+    def test_opens_after_threshold_and_fails_fast(self) -> None:
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitState.OPEN)
+        with self.assertRaises(DependencyUnavailableException), self.breaker:
+            self.fail()
+
+    def test_half_open_trial_closes_circuit(self) -> None:
+        self.fail()
+        self.fail()
+        time.sleep(0.06)
+        with self.breaker:
+            self.assertEqual(self.breaker.state, CircuitState.HALF_OPEN)
+            # A second caller is rejected while the trial is in flight
+            with self.assertRaises(DependencyUnavailableException):
+                self.breaker.before_call()
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+    def test_application_errors_do_not_count(self) -> None:
+        for _ in range(3):
+            with self.assertRaises(ValueError), self.breaker:
+                raise ValueError("bad input")
+        self.assertEqual(self.breaker.state, CircuitState.CLOSED)
+
+
+class TestPostgresFailures(TestCase):
+
+    def operational_error(self, pgcode: str | None) -> OperationalError:
+        return OperationalError("SELECT 1", {}, SimpleNamespace(pgcode=pgcode))
+
+    def test_query_errors_do_not_open_the_circuit(self) -> None:
+        # statement_timeout/deadline (57014), deadlock, serialization failure
+        for pgcode in ("57014", "40P01", "40001"):
+            self.assertFalse(is_connection_failure(self.operational_error(pgcode)), pgcode)
+
+    def test_connection_errors_open_the_circuit(self) -> None:
+        for pgcode in (None, "08006", "57P01", "57P03"):
+            self.assertTrue(is_connection_failure(self.operational_error(pgcode)), pgcode)
+        invalidated = OperationalError("SELECT 1", {}, SimpleNamespace(pgcode="57014"), connection_invalidated=True)
+        self.assertTrue(is_connection_failure(invalidated))
+
+    def test_statement_timeouts_keep_the_circuit_closed(self) -> None:
+        breaker = CircuitBreaker(
+            name="test",
+            failure_exceptions=(OperationalError,),
+            failure_threshold=1,
+            enabled=True,
+            is_failure=is_connection_failure,
+        )
+        with self.assertRaises(OperationalError), breaker, get_db_context() as session:
+            session.execute(text("SET LOCAL statement_timeout = 10"))
+            session.execute(text("SELECT pg_sleep(1)"))
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+
+class TestMongoFailures(TestCase):
+
+    def breaker(self) -> CircuitBreaker:
+        return CircuitBreaker(
+            name="test",
+            failure_exceptions=mongo_circuit_breaker.failure_exceptions,
+            failure_threshold=1,
+            enabled=True,
+        )
+
+    def test_query_errors_do_not_open_the_circuit(self) -> None:
+        for error in (ExecutionTimeout("operation exceeded time limit"), WTimeoutError("waiting for replication")):
+            breaker = self.breaker()
+            with self.assertRaises(type(error)), breaker:
+                raise error
+            self.assertEqual(breaker.state, CircuitState.CLOSED, type(error).__name__)
+
+    def test_connection_errors_open_the_circuit(self) -> None:
+        for error in (NetworkTimeout("timed out"), ServerSelectionTimeoutError("no servers")):
+            breaker = self.breaker()
+            with self.assertRaises(type(error)), breaker:
+                raise error
+            self.assertEqual(breaker.state, CircuitState.OPEN, type(error).__name__)
+
+
+class TestDeadline(TestCase):
+
+    def test_statement_timeout_follows_deadline(self) -> None:
+        token = set_deadline(200)
+        try:
+            started = time.monotonic()
+            with self.assertRaises(OperationalError), get_db_context() as session:
+                session.execute(text("SELECT pg_sleep(2)"))
+            self.assertLess(time.monotonic() - started, 1.5)
+        finally:
+            reset_deadline(token)
+
+    def test_expired_deadline_fails_before_connecting(self) -> None:
+        token = set_deadline(-1)
+        try:
+            with self.assertRaises(DeadlineExceededException), get_db_context():
+                pass
+        finally:
+            reset_deadline(token)
+
+    def test_lambda_remaining_time_sets_deadline(self) -> None:
+        seen: list[float | None] = []
+
+        async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+            seen.append(remaining_ms())
+
+        middleware = DeadlineMiddleware(endpoint)
+        context = SimpleNamespace(get_remaining_time_in_millis=lambda: 3000)
+        asyncio.run(middleware({"type": "http", "path": "/v1/books", "aws.context": context}, None, None))
+
+        self.assertIsNotNone(seen[0])
+        self.assertLessEqual(seen[0], 3000)
+        self.assertGreater(seen[0], 2000)
+
+    def test_circuit_breakers_endpoint(self) -> None:
+        res = TestClient(app).get("/health/circuit-breakers")
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("postgresql", res.json())
@@ -0,0 +1,96 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from unittest import TestCase, mock
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestServeOptions(TestCase):
+    def test_forwarded_headers_are_only_trusted_from_localhost(self) -> None:
+        from commands import serve
+
+        with mock.patch.object(serve.uvicorn, "run") as run:
+            serve.main([])
+
+        options = run.call_args.kwargs
+        self.assertTrue(options["proxy_headers"])
+        self.assertEqual(options["forwarded_allow_ips"], "127.0.0.1")
+
+
+class TestGracefulRestart(TestCase):
+    """Runs commands.serve with two workers and restarts it under load."""
+
+    def setUp(self) -> None:
+        self.port = free_port()
+        self.log = tempfile.NamedTemporaryFile("w+", suffix=".log")  # noqa: SIM115
+        self.server = subprocess.Popen(
+            [
+                sys.executable, "-m", "commands.serve",
+                "--app", "tests.utils.server_app:app", "--host", "127.0.0.1",
+                "--port", str(self.port), "--workers", "2",
+            ],
+            cwd=SRC_DIR,
+            env={**os.environ, "SERVER__GRACEFUL_SHUTDOWN_SECONDS": "10"},
+            stdout=self.log,
+            stderr=subprocess.STDOUT,
+        )
+        self.wait_until_ready()
+
+    def tearDown(self) -> None:
+        if self.server.poll() is None:
+            self.server.kill()
+            self.server.wait()
+        self.log.close()
+
+    def get(self, path: str) -> int:
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{path}", timeout=20) as response:
+            return response.status
+
+    def wait_until_ready(self) -> None:
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            try:
+                if self.get("/") == 200:
+                    return
+            except OSError:
+                time.sleep(0.2)
+        self.fail(f"Server did not start:\n{Path(self.log.name).read_text()}")
+
+    def output(self) -> str:
+        return Path(self.log.name).read_text()
+
+    def test_rolling_restart_and_shutdown_finish_in_flight_requests(self) -> None:
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            slow = [pool.submit(self.get, "/_test/slow?seconds=1.5") for _ in range(6)]
+            time.sleep(0.3)
+            # Workers are replaced one at a time while requests keep arriving
+            self.server.send_signal(signal.SIGHUP)
+            quick: list[Future[int]] = []
+            for _ in range(40):
+                quick.append(pool.submit(self.get, "/"))
+                time.sleep(0.05)
+            self.assertEqual([future.result() for future in slow + quick], [200] * 46)
+
+            slow = [pool.submit(self.get, "/_test/slow?seconds=1.5") for _ in range(6)]
+            time.sleep(0.3)
+            self.server.send_signal(signal.SIGTERM)
+            self.assertEqual([future.result() for future in slow], [200] * 6)
+
+        self.assertEqual(self.server.wait(timeout=30), 0)
+        output = self.output()
+        self.assertIn("Received SIGHUP", output)
+        self.assertEqual(output.count("Shutdown finished"), 4, output[-3000:])
@@ -0,0 +1,70 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from shared.single_flight import SingleFlight, RedisSingleFlight
+
+
+class TestSingleFlight(TestCase):
+
+    def test_concurrent_calls_share_one_execution(self) -> None:
+        flight = SingleFlight()
+        calls = 0
+        started = threading.Event()
+
+        def slow() -> int:
+            nonlocal calls
+            calls += 1
+            started.set()
+            time.sleep(0.2)
+            return 42
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(flight.do, "book", slow)]
+            started.wait()
+            futures += [pool.submit(flight.do, "book", slow) for _ in range(7)]
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(calls, 1)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_error_is_shared_and_key_released(self) -> None:
+        flight = SingleFlight()
+
+        def fail() -> None:
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("book", fail)
+        self.assertEqual(flight.do("book", lambda: 1), 1)
+
+    def test_redis_variant_coalesces_across_instances(self) -> None:
+        key = uuid.uuid4().hex
+        calls = 0
+
+        def slow() -> str:
+            nonlocal calls
+            calls += 1
+            time.sleep(0.2)
+            return "value"
+
+        # Separate instances stand in for separate containers
+        flights = [
+            RedisSingleFlight(
+                namespace="tests",
+                lock_ttl_ms=2000,
+                result_ttl_ms=1000,
+                wait_timeout_ms=2000,
+                poll_interval_ms=5,
+            )
+            for _ in range(4)
+        ]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(flight.do, key, slow, str, str) for flight in flights]
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, ["value"] * 4)
+        self.assertEqual(calls, 1)
@@ -0,0 +1,23 @@
+import datetime
+import uuid
+from unittest import TestCase
+
+from shared.uuid7 import uuid7, uuid7_datetime
+
+
+class TestUUID7(TestCase):
+
+    def test_ids_are_version_7_and_sort_by_creation(self) -> None:
+        ids = [uuid7() for _ in range(5000)]
+
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(value.version == 7 for value in ids))
+        self.assertEqual(ids[0].variant, uuid.RFC_4122)
+
+    def test_embedded_timestamp(self) -> None:
+        before = datetime.datetime.now(datetime.UTC)
+        created = uuid7_datetime(uuid7())
+
+        self.assertLess(abs((created - before).total_seconds()), 1)
+        self.assertIsNone(uuid7_datetime(uuid.uuid4()))
@@ -1,9 +1,22 @@
-from sqlalchemy import create_engine, text
+import hashlib
+import os
+from urllib.parse import urlsplit
+
+from pydantic import MongoDsn, PostgresDsn, RedisDsn
+from sqlalchemy import MetaData, create_engine, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateIndex, CreateTable
 
-from db.posgresql import Base
 from core.settings import settings
 
+# Marca que el proceso padre de tests ya eligió (y clonó) la base de datos del worker;
+# los subprocesos que lanzan los tests (servidor, pools) la heredan y no vuelven a clonar
+WORKER_DATABASE_ENV = "TESTS_WORKER_DATABASE"
+# Redis tiene 16 bases por defecto; la 0 queda para las ejecuciones en serie
+REDIS_DATABASES = 16
+
 
 def create_schema(engine, schema_name):
     schema_format = "CREATE SCHEMA IF NOT EXISTS {}"
@@ -17,7 +30,96 @@ def create_schemas(engine, schemas_to_create: list[str]):
         create_schema(engine, schema)
 
 
-def prepare_database(schemas_to_create: list[str]):
-    engine = create_engine(settings.POSTGRESQL_URL.unicode_string(), poolclass=NullPool)
+def models_metadata() -> MetaData:
+    # Importados aquí, con la URL del worker ya fijada: db.posgresql crea su engine al importarse
+    from db.posgresql import Base
+    import db.posgresql.models.public  # noqa: F401  registra todas las tablas
+
+    return Base.metadata
+
+
+def prepare_database(schemas_to_create: list[str], url: str | None = None):
+    engine = create_engine(url or settings.POSTGRESQL_URL.unicode_string(), poolclass=NullPool)
     create_schemas(engine, schemas_to_create)
-    Base.metadata.create_all(engine)
\ No newline at end of file
+    models_metadata().create_all(engine)
+    engine.dispose()
+
+
+def schema_fingerprint(schemas_to_create: list[str]) -> str:
+    """Hash del DDL de los modelos: la plantilla se reconstruye cuando cambian."""
+    dialect = postgresql.dialect()
+    ddl = [*schemas_to_create]
+    for table in models_metadata().sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes)
+    return hashlib.sha1("\n".join(ddl).encode()).hexdigest()[:12]
+
+
+def clone_database(source_url: URL, database: str, schemas_to_create: list[str]) -> None:
+    """
+    Crea `database` como copia de una plantilla con el esquema ya creado
+    (CREATE DATABASE ... TEMPLATE copia ficheros, no ejecuta DDL). La plantilla
+    se construye una sola vez por versión del esquema; un advisory lock
+    serializa a los workers que arrancan a la vez.
+    """
+    template = f"{source_url.database}_template_{schema_fingerprint(schemas_to_create)}"
+    admin = create_engine(source_url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(hashtext('tests_template_database'))"))
+        try:
+            exists = conn.execute(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": template})
+            if exists.scalar() is None:
+                stale = conn.execute(
+                    text("SELECT datname FROM pg_database WHERE datname LIKE :pattern"),
+                    {"pattern": f"{source_url.database}\\_template\\_%"},
+                ).scalars().all()
+                for name in stale:
+                    conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+                # Se construye con otro nombre: una plantilla a medias nunca queda visible
+                building = f"{template}_building"
+                conn.execute(text(f'DROP DATABASE IF EXISTS "{building}" WITH (FORCE)'))
+                conn.execute(text(f'CREATE DATABASE "{building}"'))
+                prepare_database(schemas_to_create, source_url.set(database=building).render_as_string(hide_password=False))
+                conn.execute(text(f'ALTER DATABASE "{building}" RENAME TO "{template}"'))
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{database}" WITH (FORCE)'))
+            conn.execute(text(f'CREATE DATABASE "{database}" TEMPLATE "{template}"'))
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(hashtext('tests_template_database'))"))
+    admin.dispose()
+
+
+def use_worker_databases(schemas_to_create: list[str]) -> None:
+    """
+    Da a este proceso de tests su propia base de PostgreSQL, clonada de la
+    plantilla, y bajo pytest-xdist su propia base de Redis y de Mongo, para
+    que los workers corran en paralelo sin pisarse. Debe llamarse antes de
+    importar db.posgresql, cuyo engine usa settings.POSTGRESQL_URL.
+    """
+    if os.environ.get(WORKER_DATABASE_ENV):
+        return
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    source_url = make_url(settings.POSTGRESQL_URL.unicode_string())
+    database = f"{source_url.database}_{worker or 'main'}"
+    settings.POSTGRESQL_URL = PostgresDsn(source_url.set(database=database).render_as_string(hide_password=False))
+
+    if worker is not None:
+        number = int(worker.removeprefix("gw"))
+        redis_url = urlsplit(settings.REDIS_URL.unicode_string())
+        redis_url = redis_url._replace(path=f"/{number % (REDIS_DATABASES - 1) + 1}")
+        settings.REDIS_URL = RedisDsn(redis_url.geturl())
+        mongo_url = urlsplit(settings.MONGO_URL.unicode_string())
+        mongo_url = mongo_url._replace(path=f"{mongo_url.path}_{worker}")
+        settings.MONGO_URL = MongoDsn(mongo_url.geturl())
+        # Los canales pub/sub son globales en Redis, no por base
+        settings.CHANGE_FEED.CHANNEL = f"{settings.CHANGE_FEED.CHANNEL}:{worker}"
+
+    clone_database(source_url, database, schemas_to_create)
+    os.environ.update(
+        {
+            "POSTGRESQL_URL": settings.POSTGRESQL_URL.unicode_string(),
+            "REDIS_URL": settings.REDIS_URL.unicode_string(),
+            "MONGO_URL": settings.MONGO_URL.unicode_string(),
+            "CHANGE_FEED__CHANNEL": settings.CHANGE_FEED.CHANNEL,
+            WORKER_DATABASE_ENV: database,
+        }
+    )
@@ -0,0 +1,10 @@
+import asyncio
+
+from main import app
+
+
+# Ruta lenta para simular peticiones en vuelo durante un reinicio
+@app.get("/_test/slow", include_in_schema=False)
+async def slow(seconds: float = 1.0) -> dict[str, float]:
+    await asyncio.sleep(seconds)
+    return {"slept": seconds}
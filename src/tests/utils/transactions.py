@@ -0,0 +1,25 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import Connection
+
+from db.posgresql.connection import SessionLocal, engine
+
+
+@contextmanager
+def rollback_after() -> Iterator[Connection]:
+    """
+    Ata todas las sesiones de get_db_context a una conexión con una
+    transacción abierta: cada commit de la aplicación libera un SAVEPOINT y al
+    salir se revierte todo, sin TRUNCATE. La conexión es una sola, así que sólo
+    sirve para escrituras hechas desde un hilo a la vez.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield connection
+    finally:
+        SessionLocal.configure(bind=engine, join_transaction_mode="conditional_savepoint")
+        transaction.rollback()
+        connection.close()
@@ -0,0 +1,89 @@
+import unittest
+from typing import Any
+from uuid import UUID
+
+from api.v1.books.repositories import BookRepository
+from api.v1.books.services import BookCountersService, BookRetrieveService, book_catalog, book_counters
+from core.settings import settings
+from db.redis import RedisConnection
+from .utils import DBMixin
+
+
+class TestBookCatalog(DBMixin, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.original = settings.BOOK_CATALOG.model_copy()
+        settings.BOOK_CATALOG.ENABLED = True
+        settings.BOOK_CATALOG.MAX_STALENESS_SECONDS = 60
+        book_catalog.load()
+
+    def tearDown(self) -> None:
+        settings.BOOK_CATALOG = self.original
+        super().tearDown()
+
+    def list_titles(self, **params: Any) -> list[str]:
+        data = self.client.get("/v1/books", params=params).json()["data"] or []
+        return sorted(book["title"] for book in data)
+
+    def test_writes_elsewhere_show_up_within_the_staleness_bound(self) -> None:
+        # Written behind the service's back, as another container would
+        success, book = BookRepository.create(self.create_schema(title="Elsewhere"))
+        self.assertTrue(success)
+        self.assertEqual(self.list_titles(), [])
+
+        settings.BOOK_CATALOG.MAX_STALENESS_SECONDS = 0
+        self.assertEqual(self.list_titles(), ["Elsewhere"])
+        self.assertEqual(book_catalog.get(book.id).title, "Elsewhere")
+
+        BookRepository.delete(book.id)
+        self.assertEqual(self.list_titles(), [])
+        self.assertIsNone(book_catalog.get(book.id))
+
+    def test_local_writes_are_read_back(self) -> None:
+        book_id = self.client.post("/v1/books", json=self.payload(title="Mine")).json()["data"]["id"]
+        self.assertEqual(self.client.get(f"/v1/books/{book_id}").json()["data"]["title"], "Mine")
+
+        self.client.put(f"/v1/books/{book_id}", json=self.payload(title="Renamed", author="Someone"))
+        self.assertEqual(self.list_titles(author="Someone"), ["Renamed"])
+        self.assertEqual(self.list_titles(author="Robert C. Martin"), [])
+
+    def test_author_and_type_indexes(self) -> None:
+        for title, author, book_type in (
+            ("A1", "Ada", "online"), ("A2", "Ada", "both"), ("L1", "Linus", "online"),
+        ):
+            self.client.post("/v1/books", json=self.payload(title=title, author=author, type=book_type))
+
+        self.assertEqual(self.list_titles(author="Ada"), ["A1", "A2"])
+        self.assertEqual(self.list_titles(type="online"), ["A1", "L1"])
+        self.assertEqual(self.list_titles(author="Ada", type="online"), ["A1"])
+        self.assertEqual(self.list_titles(author="Nobody"), [])
+        self.assertEqual(
+            self.list_titles(fields="id,title", author="Linus"), ["L1"],
+        )
+        self.assertEqual(book_catalog.stats()["books"], 3)
+
+        # Same answers from Postgres
+        settings.BOOK_CATALOG.ENABLED = False
+        self.assertEqual(self.list_titles(author="Ada", type="online"), ["A1"])
+
+    def test_flushed_counters_reach_the_catalog(self) -> None:
+        settings.BOOK_COUNTERS.ENABLED = True
+        self.addCleanup(setattr, settings.BOOK_COUNTERS, "ENABLED", False)
+        redis = RedisConnection.get_client()
+        keys = list(redis.scan_iter(match=f"{book_counters.key}*"))
+        if keys:
+            redis.delete(*keys)
+        book_id = UUID(self.client.post("/v1/books", json=self.payload()).json()["data"]["id"])
+        self.assertEqual(BookRetrieveService.retrieve(book_id).view_count, 0)
+        self.client.post(f"/v1/books/{book_id}/counters/views")
+        self.client.post(f"/v1/books/{book_id}/counters/views")
+        BookCountersService.flush()
+
+        # The flush leaves updated_at alone; the catalog finds it through the flush record
+        settings.BOOK_CATALOG.MAX_STALENESS_SECONDS = 0
+        self.assertEqual(BookRetrieveService.retrieve(book_id).view_count, 2)
+        self.assertEqual(book_catalog.get(book_id).view_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
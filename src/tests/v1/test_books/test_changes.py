@@ -0,0 +1,96 @@
+import asyncio
+import json
+import unittest
+from collections.abc import AsyncIterator
+
+from api.v1.books.services import BookChangesService, BookCreateService, BookDeleteService, book_changes
+from core.settings import settings
+from db.redis import RedisConnection
+from .utils import DBMixin
+
+
+class TestBookChangeFeed(DBMixin, unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        settings.CHANGE_FEED.ENABLED = True
+        self.redis = RedisConnection.get_client()
+        self.redis.delete(book_changes.stream)
+        self.buffer_size = book_changes.buffer_size
+
+    def tearDown(self) -> None:
+        settings.CHANGE_FEED.ENABLED = False
+        book_changes.buffer_size = self.buffer_size
+        self.redis.delete(book_changes.stream)
+        super().tearDown()
+
+    async def create(self, title: str) -> str:
+        book = await asyncio.to_thread(BookCreateService.create, self.create_schema(title=title))
+        return str(book.id)
+
+    async def next_event(self, stream: AsyncIterator[str]) -> dict[str, str]:
+        """Next `event:` block as {"id", "event", "data"}, skipping retry hints and keepalives."""
+        while True:
+            chunk = await asyncio.wait_for(anext(stream), 5)
+            fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines() if not line.startswith(":"))
+            if "event" in fields:
+                return {"id": fields.get("id"), "event": fields["event"], "data": json.loads(fields["data"])}
+
+    async def connect(self, last_event_id: str | None = None) -> AsyncIterator[str]:
+        stream = BookChangesService.events(last_event_id)
+        self.assertTrue((await anext(stream)).startswith("retry:"))
+        self.addAsyncCleanup(stream.aclose)
+        return stream
+
+    async def test_live_events_follow_the_writes(self) -> None:
+        stream = await self.connect()
+        book_id = await self.create("Live")
+        await asyncio.to_thread(BookDeleteService.delete, book_id)
+
+        created = await self.next_event(stream)
+        self.assertEqual(created["event"], "create")
+        self.assertEqual(created["data"]["book_id"], book_id)
+        self.assertEqual(created["data"]["data"]["title"], "Live")
+        deleted = await self.next_event(stream)
+        self.assertEqual((deleted["event"], deleted["data"]["book_id"]), ("delete", book_id))
+        self.assertGreater(deleted["id"], created["id"])
+
+    async def test_resume_after_last_event_id(self) -> None:
+        for title in ("One", "Two", "Three"):
+            await self.create(title)
+        first_id = self.redis.xrange(book_changes.stream, count=1)[0][0]
+
+        stream = await self.connect(first_id)
+        replayed = [await self.next_event(stream) for _ in range(2)]
+        self.assertEqual([event["data"]["data"]["title"] for event in replayed], ["Two", "Three"])
+
+        await self.create("Four")
+        self.assertEqual((await self.next_event(stream))["data"]["data"]["title"], "Four")
+
+    async def test_slow_connection_catches_up_from_the_stream(self) -> None:
+        book_changes.buffer_size = 2
+        stream = await self.connect()
+        titles = [f"Book {n}" for n in range(6)]
+        for title in titles:
+            await self.create(title)
+        await asyncio.sleep(0.1)
+
+        events = [await self.next_event(stream) for _ in titles]
+        self.assertEqual([event["data"]["data"]["title"] for event in events], titles)
+        self.assertEqual(len({event["id"] for event in events}), len(titles))
+
+    async def test_trimmed_history_asks_the_client_to_reload(self) -> None:
+        await self.create("Kept")
+        stream = await self.connect("1-0")
+        self.assertEqual((await self.next_event(stream))["event"], "reset")
+        self.assertEqual((await self.next_event(stream))["data"]["data"]["title"], "Kept")
+
+    def test_endpoint_rejects_bad_requests(self) -> None:
+        response = self.client.get("/v1/books/changes", headers={"Last-Event-ID": "not-an-id"})
+        self.assertEqual(response.status_code, 400)
+        settings.CHANGE_FEED.ENABLED = False
+        self.assertEqual(self.client.get("/v1/books/changes").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import patch
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from api.v1.books.repositories import BookRepository
+from api.v1.books.services import BookCountersService, book_counters
+from core.settings import settings
+from db.redis import RedisConnection
+from .utils import DBMixin
+
+
+class TestBookCounters(DBMixin, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        settings.BOOK_COUNTERS.ENABLED = True
+        self.redis = RedisConnection.get_client()
+        self._clear_redis()
+        book_counters._buffer.clear()
+        book_counters._in_flight.clear()
+
+    def tearDown(self) -> None:
+        settings.BOOK_COUNTERS.ENABLED = False
+        self._clear_redis()
+        super().tearDown()
+
+    def _clear_redis(self) -> None:
+        keys = list(self.redis.scan_iter(match=f"{book_counters.key}*"))
+        if keys:
+            self.redis.delete(*keys)
+
+    def create(self) -> str:
+        book_id: str = self.client.post("/v1/books", json=self.payload()).json()["data"]["id"]
+        return book_id
+
+    def hit(self, book_id: str, counter: str, times: int = 1) -> None:
+        for _ in range(times):
+            response = self.client.post(f"/v1/books/{book_id}/counters/{counter}")
+            self.assertEqual(response.status_code, 202)
+
+    def stored(self, book_id: str) -> tuple[int, int, object]:
+        _, book = BookRepository.get_by_id(book_id)
+        return book.view_count, book.download_count, book.updated_at
+
+    def test_reads_include_the_unflushed_delta(self) -> None:
+        book_id = self.create()
+        self.hit(book_id, "views", 3)
+        self.hit(book_id, "downloads")
+
+        # Still in the process buffer, then in Redis after the push
+        book = self.client.get(f"/v1/books/{book_id}").json()["data"]
+        self.assertEqual((book["view_count"], book["download_count"]), (3, 1))
+        book_counters.push()
+        self.assertEqual(self.redis.hget(book_counters.key, f"{book_id}:views"), "3")
+        [listed] = self.client.get("/v1/books").json()["data"]
+        self.assertEqual((listed["view_count"], listed["download_count"]), (3, 1))
+        self.assertEqual(self.stored(book_id)[:2], (0, 0))
+
+    def test_projected_read_counts_its_view(self) -> None:
+        book_id = self.create()
+        self.addCleanup(setattr, settings.BOOK_COUNTERS, "COUNT_VIEWS_ON_READ", False)
+        settings.BOOK_COUNTERS.COUNT_VIEWS_ON_READ = True
+
+        response = self.client.get(f"/v1/books/{book_id}", params={"fields": "title"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"], {"title": "Clean Code"})
+        book = self.client.get(f"/v1/books/{book_id}", params={"fields": "id,view_count"}).json()["data"]
+        self.assertEqual(book["view_count"], 2)
+
+    def test_flush_moves_counts_to_postgres_without_touching_updated_at(self) -> None:
+        first, second = self.create(), self.create()
+        updated_at = self.stored(first)[2]
+        self.hit(first, "views", 2)
+        self.hit(second, "downloads", 4)
+
+        self.assertEqual(BookCountersService.flush(), 2)
+        self.assertEqual(self.stored(first), (2, 0, updated_at))
+        self.assertEqual(self.stored(second)[:2], (0, 4))
+        self.assertEqual(self.redis.exists(book_counters.key), 0)
+        self.assertEqual(BookCountersService.flush(), 0)
+
+        # No double counting once the delta is in Postgres
+        book = self.client.get(f"/v1/books/{first}").json()["data"]
+        self.assertEqual(book["view_count"], 2)
+
+    def test_batch_interrupted_after_commit_is_not_applied_twice(self) -> None:
+        book_id = self.create()
+        self.hit(book_id, "views", 5)
+
+        with patch.object(book_counters, "complete_batch", side_effect=RedisConnectionError("lost")):
+            with self.assertRaises(RedisConnectionError):
+                BookCountersService.flush()
+        self.assertEqual(self.stored(book_id)[:2], (5, 0))
+
+        # The leftover batch is retried first and recognised as applied
+        self.hit(book_id, "views")
+        BookCountersService.flush()
+        self.assertEqual(self.stored(book_id)[:2], (5, 0))
+        BookCountersService.flush()
+        self.assertEqual(self.stored(book_id)[:2], (6, 0))
+
+    def test_push_keeps_the_buffer_when_redis_fails(self) -> None:
+        book_id = self.create()
+        self.hit(book_id, "downloads", 2)
+        with patch.object(RedisConnection, "get_client", side_effect=RedisConnectionError("down")):
+            self.assertEqual(book_counters.push(), 0)
+        book_counters.push()
+        self.assertEqual(self.redis.hget(book_counters.key, f"{book_id}:downloads"), "2")
+
+    def test_batches_being_flushed_still_count(self) -> None:
+        book_id = self.create()
+        self.hit(book_id, "views", 2)
+        book_counters.push()
+        batch_id, _ = book_counters.take_batch()
+        self.hit(book_id, "views")
+
+        # Neither in the live hash nor in Postgres yet
+        book = self.client.get(f"/v1/books/{book_id}").json()["data"]
+        self.assertEqual(book["view_count"], 3)
+        book_counters.complete_batch(batch_id)
+        self.assertEqual(self.redis.scard(book_counters.batches_key), 0)
+
+    def test_disabled_counters_stay_off_the_read_path(self) -> None:
+        book_id = self.create()
+        settings.BOOK_COUNTERS.ENABLED = False
+        self.assertFalse(self.client.post(f"/v1/books/{book_id}/counters/views").json()["success"])
+        with patch.object(book_counters, "pending", side_effect=AssertionError("Redis read")):
+            self.assertEqual(self.client.get(f"/v1/books/{book_id}").json()["data"]["view_count"], 0)
+            self.assertEqual(self.client.get("/v1/books").json()["data"][0]["view_count"], 0)
+
+    def test_unknown_counter_is_rejected(self) -> None:
+        response = self.client.post(f"/v1/books/{self.create()}/counters/likes")
+        self.assertNotEqual(response.status_code, 202)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import json
+import unittest
+
+from mangum import Mangum
+
+from benchmarks.events import LambdaContext
+from core.settings import settings
+from main import app
+from shared.lambda_adapter import LambdaAdapter
+from tests.common.test_lambda_adapter import load_sample
+from .utils import DBMixin
+
+
+class TestBooksExport(DBMixin, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.addCleanup(setattr, settings.BOOK_EXPORT, "PAGE_SIZE", settings.BOOK_EXPORT.PAGE_SIZE)
+        settings.BOOK_EXPORT.PAGE_SIZE = 2
+
+    def create_books(self, count: int) -> list[str]:
+        return [
+            self.client.post("/v1/books", json=self.payload(title=f"Book {n}")).json()["data"]["id"]
+            for n in range(count)
+        ]
+
+    def test_exports_live_books_as_ndjson(self) -> None:
+        ids = self.create_books(5)
+        self.client.delete(f"/v1/books/{ids[0]}")
+
+        response = self.client.get("/v1/books/export", params={"fields": "id,title"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        books = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([book["id"] for book in books], sorted(ids[1:]))
+        self.assertEqual(set(books[0]), {"id", "title"})
+
+    def test_export_outlives_the_request_budget(self) -> None:
+        self.create_books(5)
+        self.addCleanup(setattr, settings.TIMEOUTS, "REQUEST_BUDGET_MS", settings.TIMEOUTS.REQUEST_BUDGET_MS)
+        # Already expired: any page read under the deadline would fail
+        settings.TIMEOUTS.REQUEST_BUDGET_MS = -1
+
+        response = self.client.get("/v1/books/export")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.text.splitlines()), 5)
+
+    def test_streams_one_chunk_per_page_through_the_adapter(self) -> None:
+        self.create_books(5)
+        event = load_sample("http_api_v2_get_index")
+        event["rawPath"] = "/v1/books/export"
+        chunks: list[bytes] = []
+
+        LambdaAdapter(app, fallback=Mangum(app, lifespan="off")).stream(event, LambdaContext(), chunks.append)
+
+        pages = [chunk for chunk in chunks[1:] if chunk]
+        self.assertEqual([page.count(b"\n") for page in pages], [2, 2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
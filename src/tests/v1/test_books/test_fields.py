@@ -0,0 +1,43 @@
+import unittest
+from api.v1.books.schema import BookSchema, get_book_projection_schema
+from api.v1.books.services import BookFieldsService
+from core.exceptions import BookException
+from .utils import DBMixin
+
+# ─────────────────────────  TESTS SPARSE FIELDSETS  ────────────────────────── #
+
+class TestBooksFields(DBMixin, unittest.TestCase):
+
+    def test_parse_normalizes_order(self) -> None:
+        self.assertEqual(BookFieldsService.parse("title, id"), ("id", "title"))
+        self.assertEqual(BookFieldsService.parse(None), tuple(BookSchema.model_fields))
+
+    def test_parse_invalid_field(self) -> None:
+        with self.assertRaises(BookException):
+            BookFieldsService.parse("id,created_at")
+
+    def test_projection_schema_is_cached(self) -> None:
+        fields = BookFieldsService.parse("id,title")
+        self.assertIs(get_book_projection_schema(fields), get_book_projection_schema(fields))
+
+    def test_list_books_with_fields(self) -> None:
+        self.client.post("/v1/books", json=self.payload())
+        res = self.client.get("/v1/books", params={"fields": "title,id"})
+        self.assertEqual(res.status_code, 200)
+        book = res.json()["data"][0]
+        self.assertSetEqual(set(book.keys()), {"id", "title"})
+
+    def test_get_book_with_fields(self) -> None:
+        book_id = self.client.post("/v1/books", json=self.payload()) \
+                             .json()["data"]["id"]
+
+        res = self.client.get(f"/v1/books/{book_id}", params={"fields": "author"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["data"], {"author": "Robert C. Martin"})
+
+    def test_list_books_invalid_fields(self) -> None:
+        res = self.client.get("/v1/books", params={"fields": "id,deleted_at"})
+        self.assertEqual(res.status_code, 400)
+        env = res.json()
+        self.assertFalse(env["success"])
+        self.assertEqual(env["data"]["details"]["payload"]["invalid_fields"], ["deleted_at"])
@@ -0,0 +1,57 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+
+from api.v1.books.repositories import BookStatsRepository
+from api.v1.books.services import BookCreateService, book_creates
+from core.settings import settings
+from db.posgresql import get_db_context
+from db.posgresql.models.public import Book
+from .utils import DBMixin
+
+
+class TestGroupCommitCreates(DBMixin, unittest.TestCase):
+    # Creates are written by the group commit thread
+    committing = True
+
+    def setUp(self) -> None:
+        super().setUp()
+        settings.GROUP_COMMIT.ENABLED = True
+
+    def tearDown(self) -> None:
+        settings.GROUP_COMMIT.ENABLED = False
+        super().tearDown()
+
+    def test_concurrent_creates_are_committed_together(self) -> None:
+        batches_before = book_creates.batches
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            created = list(pool.map(
+                lambda n: BookCreateService.create(self.create_schema(title=f"Book {n}")), range(32)
+            ))
+
+        self.assertEqual(sorted(book.title for book in created), sorted(f"Book {n}" for n in range(32)))
+        self.assertEqual(len({book.id for book in created}), 32)
+        self.assertLess(book_creates.batches - batches_before, 32)
+        with get_db_context() as session:
+            self.assertEqual(session.scalar(select(func.count()).select_from(Book)), 32)
+        self.assertEqual(BookStatsRepository.summary(10)["total"], 32)
+
+    def test_each_caller_gets_its_own_error(self) -> None:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [
+                pool.submit(BookCreateService.create, self.create_schema(year=2**40 if n == 0 else 2000))
+                for n in range(8)
+            ]
+        self.assertIsInstance(futures[0].exception(), DBAPIError)
+        self.assertTrue(all(future.exception() is None for future in futures[1:]))
+
+    def test_endpoint_returns_the_created_row(self) -> None:
+        response = self.client.post("/v1/books", json=self.payload(title="Grouped"))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["data"]["title"], "Grouped")
+
+
+if __name__ == "__main__":
+    unittest.main()
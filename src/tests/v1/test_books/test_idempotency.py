@@ -0,0 +1,100 @@
+import uuid
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from main import app
+from shared.caller import caller_id
+from shared.middlewares import IdempotencyMiddleware
+from .utils import DBMixin, committing
+
+# ─────────────────────────  TESTS IDEMPOTENCY-KEY  ────────────────────────── #
+
+class TestBooksIdempotency(DBMixin, unittest.TestCase):
+
+    def post(self, key: str, client: TestClient | None = None, **overrides: Any) -> Response:
+        return (client or self.client).post(
+            "/v1/books", json=self.payload(**overrides), headers={"Idempotency-Key": key}
+        )
+
+    def count_books(self) -> int:
+        return len(self.client.get("/v1/books").json()["data"] or [])
+
+    def test_retry_returns_stored_response(self) -> None:
+        key = uuid.uuid4().hex
+        first = self.post(key)
+        retry = self.post(key)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json()["data"]["id"], first.json()["data"]["id"])
+        self.assertEqual(retry.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(self.count_books(), 1)
+
+    def test_replay_keeps_repeated_headers(self) -> None:
+        cookies_app = FastAPI()
+        cookies_app.add_middleware(IdempotencyMiddleware)
+
+        @cookies_app.post("/login")
+        def login() -> JSONResponse:
+            response = JSONResponse({"ok": True})
+            response.set_cookie("session", "abc")
+            response.set_cookie("csrf", "xyz")
+            return response
+
+        client = TestClient(cookies_app)
+        key = uuid.uuid4().hex
+        first = client.post("/login", headers={"Idempotency-Key": key})
+        retry = client.post("/login", headers={"Idempotency-Key": key})
+
+        self.assertEqual(retry.headers["Idempotent-Replayed"], "true")
+        for response in (first, retry):
+            cookies = sorted(cookie.split(";")[0] for cookie in response.headers.get_list("set-cookie"))
+            self.assertEqual(cookies, ["csrf=xyz", "session=abc"])
+            self.assertEqual(response.json(), {"ok": True})
+
+    def test_key_reused_with_different_body(self) -> None:
+        key = uuid.uuid4().hex
+        self.post(key)
+        res = self.post(key, title="Another book")
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(self.count_books(), 1)
+
+    @committing
+    def test_concurrent_duplicates_execute_once(self) -> None:
+        key = uuid.uuid4().hex
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            responses = list(pool.map(lambda _: self.post(key, TestClient(app)), range(5)))
+
+        ids = {res.json()["data"]["id"] for res in responses}
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(self.count_books(), 1)
+
+    def test_key_is_scoped_to_the_caller(self) -> None:
+        key = uuid.uuid4().hex
+        first = self.post(key, TestClient(app, client=("10.0.0.1", 50000)))
+        other = self.post(key, TestClient(app, client=("10.0.0.2", 50000)))
+
+        self.assertNotEqual(other.json()["data"]["id"], first.json()["data"]["id"])
+        self.assertNotIn("Idempotent-Replayed", other.headers)
+        self.assertEqual(self.count_books(), 2)
+
+    def test_caller_is_the_authenticated_subject(self) -> None:
+        def scope(request_context: dict[str, Any]) -> dict[str, Any]:
+            return {"client": ("10.0.0.1", 50000), "aws.event": {"requestContext": request_context}}
+
+        self.assertEqual(caller_id(scope({"authorizer": {"jwt": {"claims": {"sub": "user-1"}}}})), "sub:user-1")
+        self.assertEqual(caller_id(scope({"authorizer": {"claims": {"sub": "user-2"}}})), "sub:user-2")
+        self.assertEqual(caller_id(scope({"authorizer": {"principalId": "user-3"}})), "sub:user-3")
+        self.assertEqual(caller_id(scope({"identity": {"apiKeyId": "key-4"}})), "sub:key-4")
+        self.assertEqual(caller_id(scope({})), "ip:10.0.0.1")
+
+    def test_without_key_is_not_deduplicated(self) -> None:
+        self.client.post("/v1/books", json=self.payload())
+        self.client.post("/v1/books", json=self.payload())
+        self.assertEqual(self.count_books(), 2)
@@ -0,0 +1,69 @@
+import tracemalloc
+import unittest
+
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from main import app
+from shared.memory import MB, MemoryTracker
+from shared.middlewares import MemoryMiddleware
+from .utils import DBMixin
+
+WARMUP_REQUESTS = 300
+REQUESTS = 3000
+# Allowed tracemalloc growth after warm-up, a leak of ~350 bytes/request fails
+MAX_GROWTH_BYTES = 1 * MB
+
+
+class TestMemoryTracking(DBMixin, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.tracker = MemoryTracker(diff_every=1000, top_n=5, growth_warning_mb=512, tracemalloc_frames=1)
+        self.client = TestClient(MemoryMiddleware(app, self.tracker))
+        self.book_id = self.client.post("/v1/books", json=self.payload()).json()["data"]["id"]
+
+    def tearDown(self) -> None:
+        self.tracker.stop()
+        super().tearDown()
+
+    def run_requests(self, count: int) -> None:
+        for index in range(count):
+            if index % 3:
+                response = self.client.get("/")
+            else:
+                response = self.client.get(f"/v1/books/{self.book_id}", params={"fields": "id,title"})
+            self.assertEqual(response.status_code, 200)
+
+    def test_memory_is_bounded_across_requests(self) -> None:
+        self.run_requests(WARMUP_REQUESTS)
+        before = tracemalloc.get_traced_memory()[0]
+
+        self.run_requests(REQUESTS)
+        growth = tracemalloc.get_traced_memory()[0] - before
+
+        self.assertLess(growth, MAX_GROWTH_BYTES, self.tracker.last_report.get("top_allocators"))
+        report = self.tracker.last_report
+        self.assertEqual(report["requests"], 3000)
+        self.assertLessEqual(len(report["top_allocators"]), 5)
+        self.assertEqual(
+            sum(route["requests"] for route in report["routes"].values()), 3000
+        )
+        self.assertGreater(report["routes"]["/v1/books/{book_id}"]["requests"], 900)
+
+    def test_warns_when_rss_grows_past_threshold(self) -> None:
+        tracker = MemoryTracker(diff_every=2, top_n=3, growth_warning_mb=1, tracemalloc_frames=1)
+        messages: list[str] = []
+        sink = logger.add(messages.append, level="WARNING")
+        try:
+            tracker.end("/", tracker.begin())
+            retained = bytearray(8 * MB)
+            retained[::4096] = b"x" * len(retained[::4096])  # touch every page so RSS grows
+            tracker.end("/", tracker.begin())
+        finally:
+            logger.remove(sink)
+
+        self.assertEqual(len(messages), 1)
+        self.assertIn("RSS grew", messages[0])
+        self.assertGreater(tracker.last_report["rss_growth_mb"], 1)
+        del retained
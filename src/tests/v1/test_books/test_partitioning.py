@@ -0,0 +1,131 @@
+import datetime
+import unittest
+import uuid
+
+from sqlalchemy import Connection, text
+
+from api.v1.books.repositories import BookRepository
+from api.v1.books.schema import BookWriteAction, BookWriteMessage
+from core.settings import settings
+from db.posgresql import get_db_context
+from db.posgresql.connection import engine
+from db.posgresql.partitions import is_partitioned, list_partitions, maintain_partitions
+from db.posgresql.models.public import Book
+from shared.uuid7 import uuid7, uuid7_datetime
+from .utils import DBMixin
+
+SCHEMA = "partitioning_test"
+PARENT = f"{SCHEMA}.books"
+ARCHIVE_SCHEMA = "partitioning_test_archive"
+
+
+class TestPartitionMaintenance(unittest.TestCase):
+
+    def setUp(self) -> None:
+        with engine.begin() as connection:
+            connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            connection.execute(
+                text(
+                    f"CREATE TABLE {PARENT} (id uuid, created_at timestamp NOT NULL, PRIMARY KEY (id, created_at)) "
+                    "PARTITION BY RANGE (created_at)"
+                )
+            )
+
+    def tearDown(self) -> None:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {ARCHIVE_SCHEMA} CASCADE"))
+
+    def maintain(self, connection: Connection, today: datetime.date, retention_months: int | None = None) -> dict[str, list[str]]:
+        return maintain_partitions(
+            connection,
+            today=today,
+            premake_months=2,
+            retention_months=retention_months,
+            retire_mode="archive",
+            archive_schema=ARCHIVE_SCHEMA,
+            parent=PARENT,
+        )
+
+    def test_creates_upcoming_partitions_idempotently(self) -> None:
+        with engine.begin() as connection:
+            first = self.maintain(connection, datetime.date(2026, 11, 20))
+            second = self.maintain(connection, datetime.date(2026, 11, 25))
+
+            self.assertTrue(is_partitioned(connection, PARENT))
+            self.assertFalse(is_partitioned(connection, "public.books_archive"))
+            self.assertEqual(first["created"], ["books_p2026_11", "books_p2026_12", "books_p2027_01"])
+            self.assertEqual(second["created"], [])
+
+    def test_queries_on_the_partition_key_are_pruned(self) -> None:
+        with engine.begin() as connection:
+            self.maintain(connection, datetime.date(2026, 11, 20))
+            plan = "\n".join(
+                connection.execute(
+                    text(
+                        f"EXPLAIN SELECT * FROM {PARENT} "
+                        "WHERE created_at >= '2026-12-03' AND created_at < '2026-12-04'"
+                    )
+                ).scalars()
+            )
+
+        self.assertIn("books_p2026_12", plan)
+        self.assertNotIn("books_p2026_11", plan)
+        self.assertNotIn("books_default", plan)
+
+    def test_retires_expired_partitions_to_the_archive_schema(self) -> None:
+        with engine.begin() as connection:
+            self.maintain(connection, datetime.date(2026, 10, 5))
+            connection.execute(text(f"INSERT INTO {PARENT} VALUES (gen_random_uuid(), '2026-10-10')"))
+            result = self.maintain(connection, datetime.date(2027, 1, 15), retention_months=2)
+
+            self.assertEqual(result["retired"], ["books_p2026_10"])
+            self.assertEqual([p.name for p in list_partitions(connection, PARENT)][0], "books_p2026_11")
+            archived = connection.execute(text(f"SELECT count(*) FROM {ARCHIVE_SCHEMA}.books_p2026_10")).scalar()
+            self.assertEqual(archived, 1)
+
+
+class TestPartitionKeyInQueries(DBMixin, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        settings.PARTITIONING.ENABLED = True
+
+    def tearDown(self) -> None:
+        settings.PARTITIONING.ENABLED = False
+        super().tearDown()
+
+    def test_id_lookups_are_bounded_by_the_uuid7_time(self) -> None:
+        book_id = uuid7()
+        statement = str(
+            BookRepository._by_id(book_id)[1].compile(compile_kwargs={"literal_binds": True})
+        )
+        self.assertIn("books.created_at BETWEEN", statement)
+        self.assertEqual(len(BookRepository._by_id(uuid.uuid4())), 1)
+
+    def test_crud_by_id_with_partition_window(self) -> None:
+        created = self.client.post("/v1/books", json=self.payload()).json()["data"]
+        self.assertEqual(uuid.UUID(created["id"]).version, 7)
+
+        self.assertEqual(self.client.get(f"/v1/books/{created['id']}").json()["data"]["id"], created["id"])
+        self.assertEqual(self.client.put(f"/v1/books/{created['id']}", json=self.payload(year=2020)).status_code, 200)
+        self.assertEqual(self.client.delete(f"/v1/books/{created['id']}").status_code, 204)
+
+    def test_list_filters_on_created_at(self) -> None:
+        self.client.post("/v1/books", json=self.payload())
+        now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+        recent = self.client.get("/v1/books", params={"created_after": (now - datetime.timedelta(hours=1)).isoformat()})
+        future = self.client.get("/v1/books", params={"created_after": (now + datetime.timedelta(hours=1)).isoformat()})
+
+        self.assertEqual(len(recent.json()["data"]), 1)
+        self.assertIsNone(future.json()["data"])
+
+    def test_producer_uuid7_sets_created_at(self) -> None:
+        book_id = uuid7()
+        write = BookWriteMessage(action=BookWriteAction.CREATE, book_id=book_id, data=self.create_schema())
+
+        self.assertEqual(BookRepository.apply_writes([write]), [None])
+        with get_db_context() as session:
+            created_at = session.get(Book, book_id).created_at
+        self.assertEqual(created_at, uuid7_datetime(book_id).replace(tzinfo=None))
@@ -0,0 +1,100 @@
+import unittest
+from datetime import timedelta
+from typing import Any
+
+from httpx import Response
+from sqlalchemy import text
+
+from api.v1.books.services import BookPurgeService
+from commands.purge_deleted_books import main as purge_command
+from db.posgresql import get_db_context
+from shared.utils_dates import get_app_current_time
+from .utils import DBMixin
+
+
+class TestBooksSoftDelete(DBMixin, unittest.TestCase):
+
+    def create_book(self, **overrides: Any) -> str:
+        book_id: str = self.client.post("/v1/books", json=self.payload(**overrides)).json()["data"]["id"]
+        return book_id
+
+    def assertNotFound(self, response: Response) -> None:  # noqa: N802
+        self.assertFalse(response.json()["success"])
+        self.assertIn("not found", response.json()["message"])
+
+    def scalar(self, query: str, **params: Any) -> Any:
+        with get_db_context() as session:
+            return session.execute(text(query), params).scalar()
+
+    def age_tombstone(self, book_id: str, days: int) -> None:
+        with get_db_context() as session:
+            session.execute(
+                text("UPDATE public.books SET deleted_at = :deleted_at WHERE id = :id"),
+                {"id": book_id, "deleted_at": get_app_current_time() - timedelta(days=days)},
+            )
+            session.commit()
+
+    def test_delete_keeps_a_tombstone_hidden_from_reads(self) -> None:
+        kept = self.create_book(title="Kept")
+        deleted = self.create_book(title="Deleted")
+
+        self.assertEqual(self.client.delete(f"/v1/books/{deleted}").status_code, 204)
+
+        self.assertNotFound(self.client.get(f"/v1/books/{deleted}"))
+        self.assertNotFound(self.client.get(f"/v1/books/{deleted}?fields=id"))
+        self.assertEqual([book["id"] for book in self.client.get("/v1/books").json()["data"]], [kept])
+        self.assertIsNotNone(
+            self.scalar("SELECT deleted_at FROM public.books WHERE id = :id", id=deleted)
+        )
+
+    def test_deleted_book_cannot_be_updated_or_deleted_again(self) -> None:
+        book_id = self.create_book()
+        self.client.delete(f"/v1/books/{book_id}")
+
+        self.assertNotFound(self.client.put(f"/v1/books/{book_id}", json=self.payload()))
+        self.assertNotFound(self.client.delete(f"/v1/books/{book_id}"))
+
+    def test_purge_archives_old_tombstones_in_batches(self) -> None:
+        live = self.create_book(title="Live")
+        recent = self.create_book(title="Recently deleted")
+        old = [self.create_book(title=f"Old {index}") for index in range(3)]
+        for book_id in (recent, *old):
+            self.client.delete(f"/v1/books/{book_id}")
+        for book_id in old:
+            self.age_tombstone(book_id, days=40)
+
+        removed = BookPurgeService.purge(retention_days=30, batch_size=2)
+
+        self.assertEqual(removed, 3)
+        self.assertEqual(self.scalar("SELECT count(*) FROM public.books"), 2)
+        self.assertEqual(
+            self.scalar("SELECT count(*) FROM public.books_archive WHERE id = ANY(CAST(:ids AS uuid[]))", ids=old), 3
+        )
+        self.assertEqual(
+            self.scalar("SELECT title FROM public.books_archive WHERE id = :id", id=old[0]), "Old 0"
+        )
+        self.assertEqual(self.client.get(f"/v1/books/{live}").status_code, 200)
+
+    def test_purge_without_archive_and_batch_limit(self) -> None:
+        old = [self.create_book(title=f"Old {index}") for index in range(3)]
+        for book_id in old:
+            self.client.delete(f"/v1/books/{book_id}")
+            self.age_tombstone(book_id, days=40)
+
+        purge_command(["--batch-size", "1", "--max-batches", "2", "--pause-ms", "0", "--no-archive"])
+
+        self.assertEqual(self.scalar("SELECT count(*) FROM public.books"), 1)
+        self.assertEqual(self.scalar("SELECT count(*) FROM public.books_archive"), 0)
+
+    def test_indexes_only_cover_their_partition_of_rows(self) -> None:
+        definitions = dict(self.book_indexes())
+        self.assertIn("WHERE (deleted_at IS NULL)", definitions["ix_books_live_updated_at"])
+        self.assertIn("WHERE (deleted_at IS NOT NULL)", definitions["ix_books_tombstones_deleted_at"])
+
+    @staticmethod
+    def book_indexes() -> list[tuple[str, str]]:
+        with get_db_context() as session:
+            rows = session.execute(
+                text("SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = 'public' AND tablename = 'books'")
+            )
+            return [tuple(row) for row in rows]
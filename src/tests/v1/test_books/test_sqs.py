@@ -0,0 +1,51 @@
+import copy
+import json
+from pathlib import Path
+from typing import Any
+from unittest import TestCase
+
+from main import sqs_handler
+from tests.v1.test_books.utils import DBMixin
+
+EVENTS_DIR = Path(__file__).resolve().parent / "events"
+BOOK_ID = "0b9d4c5e-6f71-4a8b-9c0d-1e2f3a4b5c6d"
+
+
+def load_event(name: str) -> dict[str, Any]:
+    event: dict[str, Any] = json.loads((EVENTS_DIR / name).read_text())
+    return event
+
+
+class TestSQSBookWrites(DBMixin, TestCase):
+
+    def failed_ids(self, response: dict[str, Any]) -> list[str]:
+        return [failure["itemIdentifier"][-4:] for failure in response["batchItemFailures"]]
+
+    def test_partial_batch_failure(self) -> None:
+        response = sqs_handler(load_event("sqs_book_writes.json"), None)
+
+        # invalid year, update of a missing book, malformed JSON
+        self.assertEqual(self.failed_ids(response), ["0003", "0005", "0006"])
+        books = self.client.get("/v1/books", params={"fields": "id,title"}).json()["data"]
+        self.assertEqual(
+            sorted(book["title"] for book in books),
+            ["Children of Dune", "Dune (50th Anniversary)"],
+        )
+
+    def test_redelivered_batch_is_idempotent_for_known_ids(self) -> None:
+        event = load_event("sqs_book_writes.json")
+        event["Records"] = event["Records"][:1]
+        sqs_handler(event, None)
+        response = sqs_handler(copy.deepcopy(event), None)
+
+        self.assertEqual(response["batchItemFailures"], [])
+        self.assertEqual(len(self.client.get("/v1/books").json()["data"]), 1)
+
+    def test_fifo_stops_at_first_failure(self) -> None:
+        event = load_event("sqs_book_writes.json")
+        for record in event["Records"]:
+            record["eventSourceARN"] += ".fifo"
+        response = sqs_handler(event, None)
+
+        self.assertEqual(self.failed_ids(response), ["0003", "0004", "0005", "0006", "0007"])
+        self.assertEqual(len(self.client.get("/v1/books").json()["data"]), 2)
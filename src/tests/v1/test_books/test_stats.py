@@ -0,0 +1,102 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from sqlalchemy import text
+
+from api.v1.books.repositories import BookStatsRepository
+from api.v1.books.schema import BookWriteAction, BookWriteMessage
+from api.v1.books.services import BookBatchWriteService, BookCreateService, book_totals
+from db.posgresql import get_db_context
+from .utils import DBMixin, committing
+
+
+class TestBookStats(DBMixin, unittest.TestCase):
+
+    def stats(self, **params: Any) -> dict[str, Any]:
+        response = self.client.get("/v1/books/stats", params=params)
+        self.assertEqual(response.status_code, 200)
+        data: dict[str, Any] = response.json()["data"]
+        return data
+
+    def create(self, **overrides: Any) -> str:
+        book_id: str = self.client.post("/v1/books", json=self.payload(**overrides)).json()["data"]["id"]
+        return book_id
+
+    def test_counters_follow_creates_updates_and_deletes(self) -> None:
+        first = self.create(author="Ada", year=2001, type="online")
+        self.create(author="Ada", year=2002, type="both")
+        third = self.create(author="Linus", year=2001, type="online")
+
+        self.client.put(f"/v1/books/{first}", json=self.payload(author="Grace", year=2001, type="fisical"))
+        self.client.delete(f"/v1/books/{third}")
+
+        stats = self.stats()
+        self.assertEqual(stats["total"], 2)
+        self.assertEqual(stats["by_type"], {"both": 1, "fisical": 1})
+        self.assertEqual(stats["by_year"], {"2001": 1, "2002": 1})
+        self.assertEqual(stats["by_author"], {"Ada": 1, "Grace": 1})
+
+    def test_stats_route_is_not_taken_as_a_book_id(self) -> None:
+        stats = self.stats()
+        self.assertEqual(stats["total"], 0)
+        self.assertEqual(stats["by_type"], {})
+
+    def test_authors_limit_keeps_the_top_authors(self) -> None:
+        for author in ("Ada", "Ada", "Grace", "Linus", "Linus", "Linus"):
+            self.create(author=author)
+
+        self.assertEqual(self.stats(authors_limit=2)["by_author"], {"Linus": 3, "Ada": 2})
+
+    def test_batch_writes_and_rollbacks_keep_counters_exact(self) -> None:
+        book_id = self.create(author="Ada")
+        writes = [
+            BookWriteMessage(action=BookWriteAction.CREATE, data=self.create_schema(author="Grace")),
+            BookWriteMessage(action=BookWriteAction.UPDATE, book_id=book_id, data=self.create_schema(author="Linus")),
+            # Fails and rolls back its savepoint, counters included
+            BookWriteMessage(
+                action=BookWriteAction.UPDATE, book_id="00000000-0000-7000-8000-000000000000", data=self.create_schema()
+            ),
+        ]
+        BookBatchWriteService.apply(writes)
+
+        self.assertEqual(self.stats()["by_author"], {"Grace": 1, "Linus": 1})
+        self.assertEqual(self.stats()["total"], 2)
+
+    @committing
+    def test_concurrent_creates_are_all_counted(self) -> None:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: BookCreateService.create(self.create_schema()), range(40)))
+
+        self.assertEqual(self.stats()["total"], 40)
+
+    def test_rebuild_matches_incremental_counters(self) -> None:
+        for author in ("Ada", "Grace", "Grace"):
+            self.create(author=author)
+        incremental = self.stats()
+
+        self.assertEqual(BookStatsRepository.rebuild(), 3)
+        rebuilt = self.stats()
+        self.assertEqual(
+            {key: rebuilt[key] for key in ("total", "by_type", "by_year", "by_author")},
+            {key: incremental[key] for key in ("total", "by_type", "by_year", "by_author")},
+        )
+
+    def test_stats_expose_planner_estimate(self) -> None:
+        for _ in range(5):
+            self.create()
+        with get_db_context() as session:
+            session.execute(text("ANALYZE public.books"))
+            session.commit()
+
+        self.assertEqual(self.stats()["total_estimate"], 5)
+
+    def test_unfiltered_list_sends_live_total(self) -> None:
+        book_totals.clear()
+        self.addCleanup(book_totals.clear)
+        created = [self.create(author="Ada") for _ in range(3)]
+        self.client.delete(f"/v1/books/{created[0]}")
+
+        response = self.client.get("/v1/books")
+        self.assertEqual(response.headers["X-Total-Count-Estimate"], "2")
+        self.assertNotIn("X-Total-Count-Estimate", self.client.get("/v1/books", params={"author": "Ada"}).headers)
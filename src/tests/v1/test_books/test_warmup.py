@@ -0,0 +1,58 @@
+from unittest import TestCase
+from uuid import UUID
+
+from api.v1.books.services import BookRetrieveService, BookUpdateService, book_cache
+from api.v1.books.schema import BookCreateSchema
+from core.settings import settings
+from core.warmup import is_warmup_event
+from main import app, handler
+from tests.v1.test_books.utils import DBMixin
+
+SCHEDULED_EVENT = {
+    "version": "0",
+    "id": "53dc4d37-cffa-4f76-80c9-8b7d4a4d2eaa",
+    "detail-type": "Scheduled Event",
+    "source": "aws.events",
+    "account": "123456789012",
+    "time": "2024-05-27T17:00:00Z",
+    "region": "us-east-1",
+    "resources": ["arn:aws:events:us-east-1:123456789012:rule/keep-warm"],
+    "detail": {},
+}
+
+
+class TestWarmup(DBMixin, TestCase):
+
+    def tearDown(self) -> None:
+        settings.BOOK_CACHE.ENABLED = False
+        book_cache.clear()
+        super().tearDown()
+
+    def test_detects_warmup_events(self) -> None:
+        self.assertTrue(is_warmup_event(SCHEDULED_EVENT))
+        self.assertTrue(is_warmup_event({"warmup": True}))
+        self.assertFalse(is_warmup_event({"version": "2.0", "requestContext": {"http": {}}}))
+        self.assertFalse(is_warmup_event({**SCHEDULED_EVENT, "detail-type": "EC2 Instance State-change"}))
+
+    def test_warmup_event_skips_asgi_and_primes_app(self) -> None:
+        response = handler(SCHEDULED_EVENT, None)
+
+        self.assertTrue(response["warmup"])
+        self.assertTrue(response["steps"]["postgresql"].startswith("ok"))
+        self.assertTrue(response["steps"]["schemas"].startswith("ok"))
+        self.assertIsNotNone(app.openapi_schema)
+        self.assertIsNotNone(app.middleware_stack)
+
+    def test_preloaded_books_are_served_from_cache(self) -> None:
+        settings.BOOK_CACHE.ENABLED = True
+        created = self.client.post("/v1/books", json=self.payload()).json()["data"]
+        book_id = UUID(created["id"])
+
+        self.assertEqual(BookRetrieveService.preload(10), 1)
+        hits = book_cache.hits
+        book = BookRetrieveService.retrieve(book_id, ("id", "title"))
+        self.assertEqual(book.model_dump(mode="json"), {"id": created["id"], "title": "Clean Code"})
+        self.assertEqual(book_cache.hits, hits + 1)
+
+        BookUpdateService.update(book_id, BookCreateSchema(**self.payload(title="Refactoring")))
+        self.assertEqual(BookRetrieveService.retrieve(book_id).title, "Refactoring")
@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from typing import Any
 
 from fastapi.testclient import TestClient
@@ -7,24 +8,46 @@ from main import app
 from db.posgresql import get_db_context                  
 from db.posgresql.models.public import BookType
 from api.v1.books.schema import BookCreateSchema
+from tests.utils.create_databases import models_metadata
+from tests.utils.transactions import rollback_after
+
+
+def committing(test: Callable[..., Any]) -> Callable[..., Any]:
+    """Marca un test que escribe desde otros hilos o procesos: sus datos se confirman y se borran al terminar."""
+    test.committing = True
+    return test
+
 
 class DBMixin:
-    """Métodos auxiliares para limpiar la tabla `book` entre tests."""
+    """
+    Cada test corre dentro de una transacción que se revierte al terminar
+    (ver tests.utils.transactions). Los tests con `committing = True` o el
+    decorador `@committing` confirman de verdad y vacían todas las tablas
+    de los modelos con TRUNCATE.
+    """
+
+    committing = False
 
     @staticmethod
-    def _truncate_books() -> None:
+    def _truncate_tables() -> None:
+        tables = ", ".join(f'"{table.schema or "public"}"."{table.name}"' for table in models_metadata().sorted_tables)
         with get_db_context() as session:
-            session.execute(
-                text("TRUNCATE TABLE public.books RESTART IDENTITY CASCADE;")
-            )
+            session.execute(text(f"TRUNCATE TABLE {tables} RESTART IDENTITY CASCADE;"))
             session.commit()
 
+    def _is_committing(self) -> bool:
+        return self.committing or getattr(getattr(self, self._testMethodName), "committing", False)
+
     def setUp(self) -> None:     # se ejecuta antes de *cada* test
-        self._truncate_books()
+        if self._is_committing():
+            self._truncate_tables()
+        else:
+            self.enterContext(rollback_after())
         self.client = TestClient(app)
 
     def tearDown(self) -> None:  # limpieza final
-        self._truncate_books()
+        if self._is_committing():
+            self._truncate_tables()
 
     # ---------- datos de apoyo ---------- #
     @staticmethod